@@ -0,0 +1,61 @@
+"""add access path indexes
+
+Revision ID: 9c1e5b7d2a41
+Revises: 4af4f10aecc3
+Create Date: 2025-04-20 11:02:17.512384
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9c1e5b7d2a41"
+down_revision: Union[str, None] = "4af4f10aecc3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    (
+        "ix_incomingtransaction_user_id_date_id",
+        "incomingtransaction",
+        ["user_id", "date", "id"],
+    ),
+    ("ix_incomingtransaction_wallet_id", "incomingtransaction", ["wallet_id"]),
+    ("ix_incomingtransaction_category_id", "incomingtransaction", ["category_id"]),
+    (
+        "ix_outgoingtransaction_user_id_date_id",
+        "outgoingtransaction",
+        ["user_id", "date", "id"],
+    ),
+    ("ix_outgoingtransaction_wallet_id", "outgoingtransaction", ["wallet_id"]),
+    ("ix_outgoingtransaction_category_id", "outgoingtransaction", ["category_id"]),
+    ("ix_wallet_user_id", "wallet", ["user_id"]),
+    ("ix_refreshtoken_token", "refreshtoken", ["token"]),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
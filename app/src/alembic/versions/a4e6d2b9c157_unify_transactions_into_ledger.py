@@ -0,0 +1,252 @@
+"""unify transactions into ledger
+
+Revision ID: a4e6d2b9c157
+Revises: f2c9a4d7b318
+Create Date: 2025-05-18 10:21:04.530912
+
+Incoming and outgoing transactions are moved into one partitioned
+ledgerentry table with a direction column and a generated signed amount.
+The old table names stay available as read only views for reporting tools.
+
+The history is copied online: triggers mirror writes of the old tables into
+the ledger while the rows are copied in batches, each in its own
+transaction. Writes are blocked only for the final swap of the old tables
+for views. The downgrade copies everything back under a lock.
+"""
+
+from datetime import date, datetime, timezone
+from typing import Sequence, Union
+from uuid import UUID
+
+import sqlalchemy as sa
+from alembic import op
+from utils.dates import add_months
+
+# revision identifiers, used by Alembic.
+revision: str = "a4e6d2b9c157"
+down_revision: Union[str, None] = "f2c9a4d7b318"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = {
+    "incomingtransaction": ("incoming", "incomingcategory"),
+    "outgoingtransaction": ("outgoing", "outgoingcategory"),
+}
+COLUMNS = "id, amount, description, date, wallet_id, user_id, created_at, updated_at"
+LEDGER_INDEXES = {
+    "user_id_direction_date_id": "(user_id, direction, date, id)",
+    "user_id_date_id": "(user_id, date, id)",
+    "wallet_id_date_id": "(wallet_id, date, id) INCLUDE (signed_amount)",
+    "incoming_category_id_user_id_date_id": (
+        "(incoming_category_id, user_id, date, id)"
+    ),
+    "outgoing_category_id_user_id_date_id": (
+        "(outgoing_category_id, user_id, date, id)"
+    ),
+    "description_tsv": "USING gin (description_tsv)",
+    "description_trgm": "USING gin (description gin_trgm_ops)",
+    "date": "USING brin (date)",
+}
+TRANSACTION_INDEXES = {
+    "user_id_date_id": "(user_id, date, id)",
+    "category_id_user_id_date_id": "(category_id, user_id, date, id)",
+    "wallet_id_date_id": "(wallet_id, date, id)",
+    "description_tsv": "USING gin (description_tsv)",
+    "description_trgm": "USING gin (description gin_trgm_ops)",
+    "date": "USING brin (date)",
+}
+MONTHS_AHEAD = 3
+BATCH_SIZE = 10000
+
+
+def bound(month: date) -> str:
+    return f"{month.isoformat()} 00:00:00+00"
+
+
+def create_partitions(table: str, first: date) -> None:
+    """Default partition and monthly partitions from `first` to MONTHS_AHEAD."""
+    op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+    current = datetime.now(timezone.utc).date().replace(day=1)
+    month = min(first, current)
+    while month < add_months(current, MONTHS_AHEAD):
+        op.execute(
+            f"CREATE TABLE {table}_p{month:%Y_%m} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{bound(month)}') "
+            f"TO ('{bound(add_months(month, 1))}')"
+        )
+        month = add_months(month, 1)
+
+
+def first_month(tables) -> date:
+    dates = [
+        op.get_bind().exec_driver_sql(f"SELECT min(date) FROM {table}").scalar()
+        for table in tables
+    ]
+    dates = [value for value in dates if value is not None]
+    if not dates:
+        return datetime.now(timezone.utc).date().replace(day=1)
+    return min(dates).astimezone(timezone.utc).date().replace(day=1)
+
+
+def copy_batches(table: str, direction: str) -> None:
+    """Copies the rows of `table` into the ledger in primary key order."""
+    stmt = sa.text(
+        f"WITH batch AS (SELECT {COLUMNS}, category_id FROM {table} "
+        f"WHERE (id, date) > (:id, :date) "
+        f"ORDER BY id, date LIMIT {BATCH_SIZE} FOR SHARE), "
+        f"copied AS (INSERT INTO ledgerentry "
+        f"({COLUMNS}, direction, {direction}_category_id) "
+        f"SELECT {COLUMNS}, '{direction}', category_id FROM batch "
+        f"ON CONFLICT (id, date) DO NOTHING) "
+        f"SELECT id, date, count(*) OVER () FROM batch "
+        f"ORDER BY id DESC, date DESC LIMIT 1"
+    ).bindparams(
+        sa.bindparam("id", type_=sa.Uuid),
+        sa.bindparam("date", type_=sa.DateTime(timezone=True)),
+    )
+    key = {"id": UUID(int=0), "date": datetime.min.replace(tzinfo=timezone.utc)}
+    while True:
+        row = op.get_bind().execute(stmt, key).first()
+        if row is None or row[2] < BATCH_SIZE:
+            return
+        key = {"id": row[0], "date": row[1]}
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE TABLE ledgerentry (
+            id UUID NOT NULL,
+            direction transaction_type NOT NULL,
+            amount BIGINT NOT NULL,
+            signed_amount BIGINT GENERATED ALWAYS AS (
+                CASE WHEN direction = 'incoming' THEN amount ELSE -amount END
+            ) STORED NOT NULL,
+            description TEXT,
+            description_tsv TSVECTOR GENERATED ALWAYS AS (
+                to_tsvector('simple', coalesce(description, ''))
+            ) STORED NOT NULL,
+            date TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP NOT NULL,
+            incoming_category_id UUID
+                REFERENCES incomingcategory (id) ON DELETE SET NULL,
+            outgoing_category_id UUID
+                REFERENCES outgoingcategory (id) ON DELETE SET NULL,
+            wallet_id UUID NOT NULL REFERENCES wallet (id) ON DELETE SET NULL,
+            user_id UUID NOT NULL REFERENCES "user" (id),
+            created_at TIMESTAMP WITH TIME ZONE
+                DEFAULT CURRENT_TIMESTAMP NOT NULL,
+            updated_at TIMESTAMP WITH TIME ZONE
+                DEFAULT CURRENT_TIMESTAMP NOT NULL,
+            PRIMARY KEY (id, date),
+            CONSTRAINT ck_ledgerentry_incoming_category_id
+                CHECK (incoming_category_id IS NULL OR direction = 'incoming'),
+            CONSTRAINT ck_ledgerentry_outgoing_category_id
+                CHECK (outgoing_category_id IS NULL OR direction = 'outgoing')
+        ) PARTITION BY RANGE (date)
+        """
+    )
+
+    create_partitions("ledgerentry", first_month(TABLES))
+    # Built on the empty table, the copy below keeps them up to date
+    for suffix, definition in LEDGER_INDEXES.items():
+        op.execute(f"CREATE INDEX ix_ledgerentry_{suffix} ON ledgerentry {definition}")
+
+    op.execute(
+        f"""
+        CREATE FUNCTION ledgerentry_dual_write() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                DELETE FROM ledgerentry WHERE id = OLD.id AND date = OLD.date;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO ledgerentry
+                    ({COLUMNS}, direction, incoming_category_id,
+                     outgoing_category_id)
+                VALUES (
+                    NEW.id, NEW.amount, NEW.description, NEW.date,
+                    NEW.wallet_id, NEW.user_id, NEW.created_at, NEW.updated_at,
+                    TG_ARGV[0]::transaction_type,
+                    CASE WHEN TG_ARGV[0] = 'incoming' THEN NEW.category_id END,
+                    CASE WHEN TG_ARGV[0] = 'outgoing' THEN NEW.category_id END
+                )
+                ON CONFLICT (id, date) DO NOTHING;
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """
+    )
+    for table, (direction, _) in TABLES.items():
+        op.execute(
+            f"CREATE TRIGGER {table}_dual_write "
+            f"AFTER INSERT OR UPDATE OR DELETE ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION ledgerentry_dual_write('{direction}')"
+        )
+
+    # Every batch commits on its own. FOR SHARE makes a concurrent update or
+    # delete of a copied row wait for the batch, so its trigger sees the copy,
+    # rows changed before are read in their latest version
+    with op.get_context().autocommit_block():
+        for table, (direction, _) in TABLES.items():
+            copy_batches(table, direction)
+
+    # Writers of the old tables wait here until they are replaced by views
+    op.execute(f"LOCK TABLE {', '.join(TABLES)} IN ACCESS EXCLUSIVE MODE")
+    for table, (direction, _) in TABLES.items():
+        op.execute(f"DROP TABLE {table}")
+        op.execute(
+            f"CREATE VIEW {table} AS "
+            f"SELECT {COLUMNS}, {direction}_category_id AS category_id "
+            f"FROM ledgerentry WHERE direction = '{direction}'"
+        )
+    op.execute("DROP FUNCTION ledgerentry_dual_write()")
+
+    op.execute("ANALYZE ledgerentry")
+
+
+def downgrade() -> None:
+    # Rows of detached partitions are not brought back
+    op.execute("LOCK TABLE ledgerentry IN SHARE ROW EXCLUSIVE MODE")
+    first = first_month(["ledgerentry"])
+
+    for table, (direction, category_table) in TABLES.items():
+        op.execute(f"DROP VIEW {table}")
+        op.execute(
+            f"""
+            CREATE TABLE {table} (
+                id UUID NOT NULL,
+                amount BIGINT NOT NULL,
+                description TEXT,
+                description_tsv TSVECTOR GENERATED ALWAYS AS (
+                    to_tsvector('simple', coalesce(description, ''))
+                ) STORED NOT NULL,
+                date TIMESTAMP WITH TIME ZONE
+                    DEFAULT CURRENT_TIMESTAMP NOT NULL,
+                category_id UUID NOT NULL,
+                wallet_id UUID NOT NULL,
+                user_id UUID NOT NULL,
+                created_at TIMESTAMP WITH TIME ZONE
+                    DEFAULT CURRENT_TIMESTAMP NOT NULL,
+                updated_at TIMESTAMP WITH TIME ZONE
+                    DEFAULT CURRENT_TIMESTAMP NOT NULL,
+                PRIMARY KEY (id, date),
+                CONSTRAINT {table}_category_id_fkey FOREIGN KEY (category_id)
+                    REFERENCES {category_table} (id) ON DELETE SET NULL,
+                CONSTRAINT {table}_wallet_id_fkey FOREIGN KEY (wallet_id)
+                    REFERENCES wallet (id) ON DELETE SET NULL,
+                CONSTRAINT {table}_user_id_fkey FOREIGN KEY (user_id)
+                    REFERENCES "user" (id)
+            ) PARTITION BY RANGE (date)
+            """
+        )
+        create_partitions(table, first)
+        op.execute(
+            f"INSERT INTO {table} ({COLUMNS}, category_id) "
+            f"SELECT {COLUMNS}, {direction}_category_id FROM ledgerentry "
+            f"WHERE direction = '{direction}'"
+        )
+        for suffix, definition in TRANSACTION_INDEXES.items():
+            op.execute(f"CREATE INDEX ix_{table}_{suffix} ON {table} {definition}")
+
+    op.execute("DROP TABLE ledgerentry")
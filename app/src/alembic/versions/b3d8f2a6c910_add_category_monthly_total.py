@@ -0,0 +1,69 @@
+"""add category monthly total
+
+Revision ID: b3d8f2a6c910
+Revises: 9c1e5b7d2a41
+Create Date: 2025-04-27 16:48:03.218764
+
+The table is created empty, fill it with `python rebuild_rollup.py`.
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "b3d8f2a6c910"
+down_revision: Union[str, None] = "9c1e5b7d2a41"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "categorymonthlytotal",
+        sa.Column(
+            "transaction_type",
+            postgresql.ENUM("incoming", "outgoing", name="transaction_type"),
+            nullable=False,
+        ),
+        sa.Column("user_id", sa.UUID(), nullable=False),
+        sa.Column("wallet_id", sa.UUID(), nullable=True),
+        sa.Column("category_id", sa.UUID(), nullable=True),
+        sa.Column("month", sa.Date(), nullable=False),
+        sa.Column("amount", sa.BigInteger(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column(
+            "created_at",
+            postgresql.TIMESTAMP(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            postgresql.TIMESTAMP(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(
+            ["user_id"],
+            ["user.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "user_id",
+            "transaction_type",
+            "month",
+            "wallet_id",
+            "category_id",
+            name="uq_categorymonthlytotal_key",
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("categorymonthlytotal")
+    postgresql.ENUM(name="transaction_type").drop(op.get_bind(), checkfirst=True)
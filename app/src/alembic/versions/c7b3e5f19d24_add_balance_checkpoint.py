@@ -0,0 +1,59 @@
+"""add balance checkpoint
+
+Revision ID: c7b3e5f19d24
+Revises: a4e6d2b9c157
+Create Date: 2025-05-25 09:14:37.602115
+
+The table is created empty, the first `python reconcile.py` run takes the
+current wallet amounts as the initial checkpoints.
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "c7b3e5f19d24"
+down_revision: Union[str, None] = "a4e6d2b9c157"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "balancecheckpoint",
+        sa.Column("wallet_id", sa.UUID(), nullable=False),
+        sa.Column("date", postgresql.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("last_transaction_id", sa.UUID(), nullable=False),
+        sa.Column("amount", sa.BigInteger(), nullable=False),
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column(
+            "created_at",
+            postgresql.TIMESTAMP(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            postgresql.TIMESTAMP(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["wallet_id"], ["wallet.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_balancecheckpoint_wallet_id_date_last_transaction_id",
+        "balancecheckpoint",
+        ["wallet_id", "date", "last_transaction_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_balancecheckpoint_wallet_id_date_last_transaction_id",
+        table_name="balancecheckpoint",
+    )
+    op.drop_table("balancecheckpoint")
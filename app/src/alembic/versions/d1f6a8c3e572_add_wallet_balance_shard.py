@@ -0,0 +1,66 @@
+"""add wallet balance shard
+
+Revision ID: d1f6a8c3e572
+Revises: c7b3e5f19d24
+Create Date: 2025-06-01 11:42:19.204638
+
+Wallets keep their balance in the wallet row until sharding is turned on
+with `python balance_shards.py enable`.
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "d1f6a8c3e572"
+down_revision: Union[str, None] = "c7b3e5f19d24"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "wallet",
+        sa.Column("balance_shards", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.create_table(
+        "walletbalanceshard",
+        sa.Column("wallet_id", sa.UUID(), nullable=False),
+        sa.Column("shard", sa.Integer(), nullable=False),
+        sa.Column("amount", sa.BigInteger(), nullable=False),
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column(
+            "created_at",
+            postgresql.TIMESTAMP(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            postgresql.TIMESTAMP(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["wallet_id"], ["wallet.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("wallet_id", "shard", name="uq_walletbalanceshard_shard"),
+    )
+
+
+def downgrade() -> None:
+    # Shard amounts are moved back into the wallet rows before they are dropped
+    op.execute(
+        """
+        UPDATE wallet SET amount = wallet.amount + shards.amount
+        FROM (
+            SELECT wallet_id, sum(amount) AS amount
+            FROM walletbalanceshard GROUP BY wallet_id
+        ) AS shards
+        WHERE wallet.id = shards.wallet_id
+        """
+    )
+    op.drop_table("walletbalanceshard")
+    op.drop_column("wallet", "balance_shards")
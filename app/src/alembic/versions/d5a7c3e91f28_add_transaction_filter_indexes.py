@@ -0,0 +1,85 @@
+"""add transaction filter indexes
+
+Revision ID: d5a7c3e91f28
+Revises: b3d8f2a6c910
+Create Date: 2025-05-04 10:21:45.907113
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d5a7c3e91f28"
+down_revision: Union[str, None] = "b3d8f2a6c910"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The composite indexes lead with the foreign key column, so they also serve
+# ON DELETE SET NULL lookups and replace the single column indexes
+INDEXES = [
+    (
+        "ix_incomingtransaction_category_id_user_id_date_id",
+        "ix_incomingtransaction_category_id",
+        "incomingtransaction",
+        ["category_id", "user_id", "date", "id"],
+    ),
+    (
+        "ix_incomingtransaction_wallet_id_date_id",
+        "ix_incomingtransaction_wallet_id",
+        "incomingtransaction",
+        ["wallet_id", "date", "id"],
+    ),
+    (
+        "ix_outgoingtransaction_category_id_user_id_date_id",
+        "ix_outgoingtransaction_category_id",
+        "outgoingtransaction",
+        ["category_id", "user_id", "date", "id"],
+    ),
+    (
+        "ix_outgoingtransaction_wallet_id_date_id",
+        "ix_outgoingtransaction_wallet_id",
+        "outgoingtransaction",
+        ["wallet_id", "date", "id"],
+    ),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, replaced, table, columns in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+            op.drop_index(
+                replaced,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, replaced, table, columns in reversed(INDEXES):
+            op.create_index(
+                replaced,
+                table,
+                columns[:1],
+                unique=False,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
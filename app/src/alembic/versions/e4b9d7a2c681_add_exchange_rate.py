@@ -0,0 +1,54 @@
+"""add exchange rate
+
+Revision ID: e4b9d7a2c681
+Revises: d1f6a8c3e572
+Create Date: 2025-06-08 15:03:52.817446
+
+Rates are loaded with `python fx_rates.py load` or POST /api/v1/fx-rates/.
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "e4b9d7a2c681"
+down_revision: Union[str, None] = "d1f6a8c3e572"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "exchangerate",
+        sa.Column(
+            "currency",
+            postgresql.ENUM(
+                "USD", "EUR", "RUB", "BYN", "KZT", name="currency", create_type=False
+            ),
+            nullable=False,
+        ),
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("rate", sa.Numeric(precision=18, scale=8), nullable=False),
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column(
+            "created_at",
+            postgresql.TIMESTAMP(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            postgresql.TIMESTAMP(timezone=True),
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("currency", "date", name="uq_exchangerate_currency_date"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("exchangerate")
@@ -0,0 +1,84 @@
+"""add transaction description search
+
+Revision ID: e81f4b2c6a93
+Revises: d5a7c3e91f28
+Create Date: 2025-05-06 18:02:13.448120
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "e81f4b2c6a93"
+down_revision: Union[str, None] = "d5a7c3e91f28"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ["incomingtransaction", "outgoingtransaction"]
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Adding a stored generated column rewrites the table, run it in a
+    # maintenance window on large installations
+    for table in TABLES:
+        op.add_column(
+            table,
+            sa.Column(
+                "description_tsv",
+                postgresql.TSVECTOR(),
+                sa.Computed(
+                    "to_tsvector('simple', coalesce(description, ''))",
+                    persisted=True,
+                ),
+                nullable=True,
+            ),
+        )
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            op.create_index(
+                f"ix_{table}_description_tsv",
+                table,
+                ["description_tsv"],
+                unique=False,
+                postgresql_using="gin",
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+            op.create_index(
+                f"ix_{table}_description_trgm",
+                table,
+                ["description"],
+                unique=False,
+                postgresql_using="gin",
+                postgresql_ops={"description": "gin_trgm_ops"},
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            op.drop_index(
+                f"ix_{table}_description_trgm",
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+            op.drop_index(
+                f"ix_{table}_description_tsv",
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+
+    for table in TABLES:
+        op.drop_column(table, "description_tsv")
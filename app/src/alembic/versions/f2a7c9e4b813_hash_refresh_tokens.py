@@ -0,0 +1,57 @@
+"""hash refresh tokens
+
+Revision ID: f2a7c9e4b813
+Revises: e4b9d7a2c681
+Create Date: 2025-06-10 09:27:41.560213
+
+Refresh tokens are kept as their SHA-256 digest. Expired tokens are
+deleted with `python refresh_tokens.py purge`.
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f2a7c9e4b813"
+down_revision: Union[str, None] = "e4b9d7a2c681"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Expired tokens are not worth hashing
+    op.execute("DELETE FROM refreshtoken WHERE expires_at < now()")
+    op.add_column("refreshtoken", sa.Column("token_hash", sa.LargeBinary(length=32)))
+    op.execute("UPDATE refreshtoken SET token_hash = sha256(convert_to(token, 'UTF8'))")
+    # The old token column was not unique, keep the latest row of every token
+    op.execute(
+        "DELETE FROM refreshtoken AS duplicate USING refreshtoken AS kept "
+        "WHERE duplicate.token_hash = kept.token_hash "
+        "AND (duplicate.expires_at, duplicate.id) < (kept.expires_at, kept.id)"
+    )
+    op.alter_column("refreshtoken", "token_hash", nullable=False)
+    op.create_unique_constraint(
+        "uq_refreshtoken_token_hash", "refreshtoken", ["token_hash"]
+    )
+    op.drop_index("ix_refreshtoken_token", table_name="refreshtoken")
+    op.drop_column("refreshtoken", "token")
+    op.create_index(
+        "ix_refreshtoken_user_id_expires_at",
+        "refreshtoken",
+        ["user_id", "expires_at"],
+    )
+
+
+def downgrade() -> None:
+    # Tokens cannot be recovered from their digests, their users log in again
+    op.execute("DELETE FROM refreshtoken")
+    op.drop_index("ix_refreshtoken_user_id_expires_at", table_name="refreshtoken")
+    op.add_column(
+        "refreshtoken",
+        sa.Column("token", sa.String(length=255), nullable=False),
+    )
+    op.create_index("ix_refreshtoken_token", "refreshtoken", ["token"])
+    op.drop_constraint("uq_refreshtoken_token_hash", "refreshtoken", type_="unique")
+    op.drop_column("refreshtoken", "token_hash")
@@ -0,0 +1,141 @@
+"""partition transaction tables
+
+Revision ID: f2c9a4d7b318
+Revises: e81f4b2c6a93
+Create Date: 2025-05-11 12:37:50.126704
+
+The existing tables become the DEFAULT partitions of the new partitioned
+tables without copying any data. Move their history into monthly partitions
+with `python partitions.py migrate` and keep future partitions created with
+`python partitions.py create` run by cron.
+"""
+
+from datetime import date, datetime, timedelta, timezone
+from typing import Sequence, Union
+
+from alembic import op
+from utils.dates import add_months
+
+# revision identifiers, used by Alembic.
+revision: str = "f2c9a4d7b318"
+down_revision: Union[str, None] = "e81f4b2c6a93"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = {
+    "incomingtransaction": "incomingcategory",
+    "outgoingtransaction": "outgoingcategory",
+}
+COLUMNS = (
+    "id, amount, description, date, category_id, wallet_id, user_id, "
+    "created_at, updated_at"
+)
+INDEXES = {
+    "user_id_date_id": "(user_id, date, id)",
+    "category_id_user_id_date_id": "(category_id, user_id, date, id)",
+    "wallet_id_date_id": "(wallet_id, date, id)",
+    "description_tsv": "USING gin (description_tsv)",
+    "description_trgm": "USING gin (description gin_trgm_ops)",
+}
+MONTHS_AHEAD = 3
+
+
+def upgrade() -> None:
+    # A day of margin keeps the first partitioned month from starting while
+    # the migration runs, earlier rows stay in the DEFAULT partition
+    tomorrow = datetime.now(timezone.utc).date() + timedelta(days=1)
+    cutover = add_months(tomorrow.replace(day=1), 1)
+
+    # Indexes and constraints of the future DEFAULT partitions are prepared
+    # online, so the switch below is a catalog only change
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            op.execute(
+                f"CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS "
+                f"{table}_default_pkey ON {table} (id, date)"
+            )
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS "
+                f"{table}_default_date_idx ON {table} USING brin (date)"
+            )
+            # Lets new partitions skip scanning the DEFAULT partition
+            op.execute(
+                f"ALTER TABLE {table} ADD CONSTRAINT {table}_default_date_check "
+                f"CHECK (date < '{cutover.isoformat()} 00:00:00+00') NOT VALID"
+            )
+            op.execute(
+                f"ALTER TABLE {table} VALIDATE CONSTRAINT {table}_default_date_check"
+            )
+
+    for table, category_table in TABLES.items():
+        default = f"{table}_default"
+
+        op.execute(f"ALTER TABLE {table} RENAME TO {default}")
+        for suffix in INDEXES:
+            op.execute(
+                f"ALTER INDEX IF EXISTS ix_{table}_{suffix} "
+                f"RENAME TO {default}_{suffix}_idx"
+            )
+        op.execute(
+            f"ALTER TABLE {default} DROP CONSTRAINT {table}_pkey, "
+            f"ADD CONSTRAINT {default}_pkey PRIMARY KEY USING INDEX {default}_pkey"
+        )
+
+        op.execute(
+            f"CREATE TABLE {table} "
+            f"(LIKE {default} INCLUDING DEFAULTS INCLUDING GENERATED) "
+            f"PARTITION BY RANGE (date)"
+        )
+        op.execute(f"ALTER TABLE {table} ADD PRIMARY KEY (id, date)")
+        op.execute(
+            f"ALTER TABLE {table} ADD CONSTRAINT {table}_category_id_fkey "
+            f"FOREIGN KEY (category_id) REFERENCES {category_table} (id) "
+            f"ON DELETE SET NULL"
+        )
+        op.execute(
+            f"ALTER TABLE {table} ADD CONSTRAINT {table}_wallet_id_fkey "
+            f"FOREIGN KEY (wallet_id) REFERENCES wallet (id) ON DELETE SET NULL"
+        )
+        op.execute(
+            f"ALTER TABLE {table} ADD CONSTRAINT {table}_user_id_fkey "
+            f'FOREIGN KEY (user_id) REFERENCES "user" (id)'
+        )
+        for suffix, definition in INDEXES.items():
+            op.execute(f"CREATE INDEX ix_{table}_{suffix} ON {table} {definition}")
+        op.execute(f"CREATE INDEX ix_{table}_date ON {table} USING brin (date)")
+
+        # Matching indexes and foreign keys of the old table are reused
+        op.execute(f"ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT")
+
+        for offset in range(MONTHS_AHEAD):
+            month = add_months(cutover, offset)
+            op.execute(
+                f"CREATE TABLE {table}_p{month:%Y_%m} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') "
+                f"TO ('{add_months(month, 1).isoformat()} 00:00:00+00')"
+            )
+
+
+def downgrade() -> None:
+    # Rows of detached partitions are not brought back
+    for table in TABLES:
+        default = f"{table}_default"
+
+        op.execute(f"ALTER TABLE {table} DETACH PARTITION {default}")
+        op.execute(
+            f"ALTER TABLE {default} DROP CONSTRAINT IF EXISTS {table}_default_date_check"
+        )
+        op.execute(f"INSERT INTO {default} ({COLUMNS}) SELECT {COLUMNS} FROM {table}")
+        op.execute(f"DROP TABLE {table}")
+
+        op.execute(f"ALTER TABLE {default} RENAME TO {table}")
+        for suffix in INDEXES:
+            op.execute(
+                f"ALTER INDEX IF EXISTS {default}_{suffix}_idx "
+                f"RENAME TO ix_{table}_{suffix}"
+            )
+        op.execute(
+            f"ALTER TABLE {table} DROP CONSTRAINT {default}_pkey, "
+            f"ADD CONSTRAINT {table}_pkey PRIMARY KEY (id)"
+        )
+        op.execute(f"DROP INDEX {default}_date_idx")
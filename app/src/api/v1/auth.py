@@ -3,14 +3,16 @@ from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from schemas.auth import AuthOutputSchema, LoginInputSchema, RefreshInputSchema
+from schemas.auth import (AuthOutputSchema, LoginInputSchema,
+                          PasswordHashingStatsSchema, RefreshInputSchema)
 from schemas.user import CreateUserSchema
 from services.auth_service import AuthService, get_auth_service
 from services.exceptions import (ObjectAlreadyExistsException,
-                                 ObjectNotFoundError)
+                                 ObjectNotFoundError, ServiceBusyError)
+from services.password_service import PasswordHasher, get_password_hasher
 from services.role_service import RoleService, get_role_service
 from services.user_service import UserService, get_user_service
-from utils.auth import decode_token
+from utils.auth import AuthPayload, check_admin_access, decode_token
 
 router = APIRouter()
 
@@ -29,10 +31,16 @@ async def signup(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"User already exists",
         )
+    except ServiceBusyError as e:
+        raise HTTPException(
+            status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"},
+        )
 
     user_id = str(user.id)
 
-    user_roles = [role.title for role in await roles_service.get_user_roles(user_id)]
+    user_roles = await roles_service.get_user_role_titles(user_id)
 
     access_token = await auth_service.generate_access_token(user_id, user_roles)
     refresh_token = await auth_service.generate_refresh_token(user_id)
@@ -64,7 +72,7 @@ async def refresh(
 
     user_id = refresh_token_data["user_id"]
 
-    user_roles = [x.title for x in await roles_service.get_user_roles(user_id)]
+    user_roles = await roles_service.get_user_role_titles(user_id)
 
     refresh_token, access_token = await auth_service.update_refresh_token(
         user_id,
@@ -88,14 +96,14 @@ async def login(
     try:
         user = await user_service.get_user_by_login(login_data.login)
 
-        if not user.check_password(login_data.password):
+        if not await user_service.check_password(user, login_data.password):
             raise HTTPException(HTTPStatus.BAD_REQUEST, detail="invalid password")
 
         user_id = str(user.id)
 
         # await user_service.save_login_history(user_id) TODO
 
-        user_roles = [x.title for x in await roles_service.get_user_roles(user_id)]
+        user_roles = await roles_service.get_user_role_titles(user_id)
 
         access_token = await auth_service.generate_access_token(user_id, user_roles)
         refresh_token = await auth_service.generate_refresh_token(user_id)
@@ -103,6 +111,12 @@ async def login(
         return AuthOutputSchema(access_token=access_token, refresh_token=refresh_token)
     except ObjectNotFoundError:
         raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail="user not found")
+    except ServiceBusyError as e:
+        raise HTTPException(
+            status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"},
+        )
     except Exception as e:
         raise HTTPException(status_code=HTTPStatus.BAD_REQUEST, detail=e)
 
@@ -152,14 +166,14 @@ async def login(
     try:
         user = await user_service.get_user_by_login(form_data.username)
 
-        if not user.check_password(form_data.password):
+        if not await user_service.check_password(user, form_data.password):
             raise HTTPException(HTTPStatus.BAD_REQUEST, detail="invalid password")
 
         user_id = str(user.id)
 
         # await user_service.save_login_history(user_id) TODO
 
-        user_roles = [x.title for x in await roles_service.get_user_roles(user_id)]
+        user_roles = await roles_service.get_user_role_titles(user_id)
 
         access_token = await auth_service.generate_access_token(user_id, user_roles)
         refresh_token = await auth_service.generate_refresh_token(user_id)
@@ -167,5 +181,21 @@ async def login(
         return AuthOutputSchema(access_token=access_token, refresh_token=refresh_token)
     except ObjectNotFoundError:
         raise HTTPException(status_code=HTTPStatus.NOT_FOUND, detail="user not found")
+    except ServiceBusyError as e:
+        raise HTTPException(
+            status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"},
+        )
     except Exception as e:
         raise HTTPException(status_code=HTTPStatus.BAD_REQUEST, detail=e)
+
+
+@router.get("/password-hashing/stats", response_model=PasswordHashingStatsSchema)
+async def get_password_hashing_stats(
+    payload: AuthPayload,
+    password_hasher: PasswordHasher = Depends(get_password_hasher),
+) -> PasswordHashingStatsSchema:
+    check_admin_access(payload)
+
+    return password_hasher.stats()
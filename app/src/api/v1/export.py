@@ -0,0 +1,42 @@
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from models import TransactionTypeEnum
+from schemas.export import ExportFormat
+from services.export_service import (TransactionExportService,
+                                     get_transaction_export_service)
+from utils.auth import AuthPayload, check_user_access
+
+router = APIRouter()
+
+MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.csv: "text/csv",
+}
+
+
+@router.get("/users/{user_id}", response_class=StreamingResponse)
+async def export_user_transactions(
+    user_id: UUID,
+    payload: AuthPayload,
+    export_format: ExportFormat = Query(ExportFormat.ndjson, alias="format"),
+    transaction_type: TransactionTypeEnum | None = Query(None, alias="type"),
+    gzip: bool = False,
+    export_service: TransactionExportService = Depends(get_transaction_export_service),
+) -> StreamingResponse:
+    """Streams all transactions of the user as NDJSON or CSV."""
+    check_user_access(payload, str(user_id))
+
+    filename = f"transactions.{export_format.value}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+
+    return StreamingResponse(
+        export_service.export_user_transactions(
+            user_id, export_format, transaction_type, gzip
+        ),
+        media_type=MEDIA_TYPES[export_format],
+        headers=headers,
+    )
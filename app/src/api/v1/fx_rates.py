@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Depends
+from schemas.fx_rate import FxRateLoadResultSchema, FxRateSchema
+from services.fx_service import FxService, get_fx_service
+from utils.auth import AuthPayload, check_admin_access
+
+router = APIRouter()
+
+
+@router.post("/", response_model=FxRateLoadResultSchema)
+async def load_fx_rates(
+    rates: list[FxRateSchema],
+    payload: AuthPayload,
+    fx_service: FxService = Depends(get_fx_service),
+) -> FxRateLoadResultSchema:
+    check_admin_access(payload)
+
+    return FxRateLoadResultSchema(loaded=await fx_service.load_rates(rates))
@@ -1,6 +1,3 @@
-from http import HTTPStatus
-from typing import Annotated
-
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi_pagination import Page, paginate
 from schemas.incoming_category import (CreateIncomingCategorySchema,
@@ -9,8 +6,7 @@ from services.category_service import (IncomingCategoryService,
                                        get_incoming_category_service)
 from services.exceptions import (ConflictError, ObjectAlreadyExistsException,
                                  ObjectNotFoundError)
-from utils.auth import (check_admin_access, check_user_access, decode_token,
-                        oauth2_scheme)
+from utils.auth import AuthPayload, check_admin_access, check_user_access
 
 router = APIRouter()
 
@@ -53,19 +49,12 @@ async def create_categories(
 @router.patch("/", response_model=GetIncomingCategorySchema)
 async def update_category(
     category_id: str,
-    access_token: Annotated[str, Depends(oauth2_scheme)],
+    payload: AuthPayload,
     category: CreateIncomingCategorySchema,
     category_service: IncomingCategoryService = Depends(get_incoming_category_service),
 ) -> GetIncomingCategorySchema:
     try:
 
-        payload = decode_token(access_token)
-
-        if not payload:
-            raise HTTPException(
-                status_code=HTTPStatus.UNAUTHORIZED, detail="invalid token"
-            )
-
         check_admin_access(payload)
 
         updated_category = await category_service.update_category(category_id, category)
@@ -83,17 +72,10 @@ async def update_category(
 )
 async def delete_category(
     category_id: str,
-    access_token: Annotated[str, Depends(oauth2_scheme)],
+    payload: AuthPayload,
     category_service: IncomingCategoryService = Depends(get_incoming_category_service),
 ):
     try:
-        payload = decode_token(access_token)
-
-        if not payload:
-            raise HTTPException(
-                status_code=HTTPStatus.UNAUTHORIZED, detail="invalid token"
-            )
-
         check_admin_access(payload)
 
         await category_service.delete_category(category_id=category_id)
@@ -1,18 +1,23 @@
-from http import HTTPStatus
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi_pagination import Page, paginate
-from schemas.incoming_transaction import (CreateIncomingTransactionSchema,
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi_pagination import create_page
+from fastapi_pagination.cursor import CursorPage, CursorParams
+from schemas.batch import BatchResultSchema
+from schemas.incoming_transaction import (BatchCreateIncomingTransactionSchema,
+                                          CreateIncomingTransactionSchema,
                                           GetIncomingTransactionSchema,
                                           UpdateIncomingTransactionSchema)
+from schemas.transaction_filter import TransactionFilterSchema
 from services.exceptions import (ConflictError, ObjectAlreadyExistsException,
                                  ObjectNotFoundError)
 from services.transaction_service import (IncomingTransactionService,
                                           get_incoming_transaction_service)
 from services.wallet_service import WalletService, get_wallet_service
 from sqlalchemy.exc import DBAPIError
-from utils.auth import check_user_access, decode_token, oauth2_scheme
+from utils.auth import AuthPayload, check_user_access
+from utils.idempotency import Idempotency
+from utils.pagination import decode_keyset_cursor
 
 router = APIRouter()
 
@@ -20,27 +25,26 @@ router = APIRouter()
 @router.post("/", response_model=GetIncomingTransactionSchema)
 async def create_transaction(
     transaction: CreateIncomingTransactionSchema,
-    access_token: Annotated[str, Depends(oauth2_scheme)],
+    payload: AuthPayload,
     transaction_service: IncomingTransactionService = Depends(
         get_incoming_transaction_service
     ),
     wallet_service: WalletService = Depends(get_wallet_service),
+    idempotency: Idempotency = Depends(),
 ) -> GetIncomingTransactionSchema:
     try:
-        payload = decode_token(access_token)
 
-        if not payload:
-            raise HTTPException(
-                status_code=HTTPStatus.UNAUTHORIZED, detail="invalid token"
-            )
+        async def create():
+            wallet = await wallet_service.get_wallet_by_id(str(transaction.wallet_id))
+            check_user_access(payload, str(wallet.user_id))
 
-        wallet = await wallet_service.get_wallet_by_id(str(transaction.wallet_id))
-        check_user_access(payload, str(wallet.user_id))
+            transaction.user_id = wallet.user_id
 
-        transaction.user_id = wallet.user_id
+            return await transaction_service.create_transaction(transaction)
 
-        transaction = await transaction_service.create_transaction(transaction)
-        return transaction
+        return await idempotency.run(
+            payload["user_id"], transaction, create, GetIncomingTransactionSchema
+        )
     except ObjectAlreadyExistsException:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -48,10 +52,41 @@ async def create_transaction(
         )
 
 
+@router.post("/batch", response_model=BatchResultSchema)
+async def create_transactions(
+    data: BatchCreateIncomingTransactionSchema,
+    payload: AuthPayload,
+    transaction_service: IncomingTransactionService = Depends(
+        get_incoming_transaction_service
+    ),
+    wallet_service: WalletService = Depends(get_wallet_service),
+    idempotency: Idempotency = Depends(),
+) -> BatchResultSchema:
+    async def create():
+        wallet_ids = list({t.wallet_id for t in data.transactions})
+        wallets = {}
+        for wallet in await wallet_service.get_wallets_by_ids(wallet_ids):
+            try:
+                check_user_access(payload, str(wallet.user_id))
+            except HTTPException:
+                continue
+            wallets[wallet.id] = wallet.user_id
+
+        try:
+            items = await transaction_service.create_transactions(data, wallets)
+            return BatchResultSchema(items=items)
+        except ObjectNotFoundError as error:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail=str(error)
+            )
+
+    return await idempotency.run(payload["user_id"], data, create, BatchResultSchema)
+
+
 @router.patch("/{transaction_id}", response_model=GetIncomingTransactionSchema)
 async def update_transaction(
     transaction_id: str,
-    access_token: Annotated[str, Depends(oauth2_scheme)],
+    payload: AuthPayload,
     transaction: UpdateIncomingTransactionSchema,
     transaction_service: IncomingTransactionService = Depends(
         get_incoming_transaction_service
@@ -59,13 +94,9 @@ async def update_transaction(
     wallet_service: WalletService = Depends(get_wallet_service),
 ) -> GetIncomingTransactionSchema:
     try:
-        payload = decode_token(access_token)
-
-        if not payload:
-            raise HTTPException(
-                status_code=HTTPStatus.UNAUTHORIZED, detail="invalid token"
-            )
-
+        # Both the current owner and the owner of the target wallet
+        current = await transaction_service.get_transaction_by_id(transaction_id)
+        check_user_access(payload, str(current.user_id))
         wallet = await wallet_service.get_wallet_by_id(str(transaction.wallet_id))
         check_user_access(payload, str(wallet.user_id))
 
@@ -75,6 +106,11 @@ async def update_transaction(
             transaction_id, transaction
         )
         return updated_transaction
+    except (ObjectNotFoundError, DBAPIError):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Transaction is not found!",
+        )
     except ConflictError as error:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -85,22 +121,14 @@ async def update_transaction(
 @router.get("/{transaction_id}", response_model=GetIncomingTransactionSchema)
 async def get_transaction_by_id(
     transaction_id: str,
-    access_token: Annotated[str, Depends(oauth2_scheme)],
+    payload: AuthPayload,
     transaction_service: IncomingTransactionService = Depends(
         get_incoming_transaction_service
     ),
 ) -> GetIncomingTransactionSchema:
     try:
-        payload = decode_token(access_token)
-
-        if not payload:
-            raise HTTPException(
-                status_code=HTTPStatus.UNAUTHORIZED, detail="invalid token"
-            )
-
-        check_user_access(payload, str(payload["user_id"]))
-
         transaction = await transaction_service.get_transaction_by_id(transaction_id)
+        check_user_access(payload, str(transaction.user_id))
         return transaction
     except (ObjectNotFoundError, DBAPIError):
         raise HTTPException(
@@ -109,27 +137,66 @@ async def get_transaction_by_id(
         )
 
 
-@router.get("/users/{user_id}", response_model=Page[GetIncomingTransactionSchema])
+@router.get("/users/{user_id}", response_model=CursorPage[GetIncomingTransactionSchema])
 async def get_transactions_by_user_id(
     user_id: str,
-    access_token: Annotated[str, Depends(oauth2_scheme)],
+    payload: AuthPayload,
+    filters: Annotated[TransactionFilterSchema, Query()],
+    params: CursorParams = Depends(),
     transaction_service: IncomingTransactionService = Depends(
         get_incoming_transaction_service
     ),
-) -> Page[GetIncomingTransactionSchema]:
+) -> CursorPage[GetIncomingTransactionSchema]:
     try:
-        payload = decode_token(access_token)
+        check_user_access(payload, user_id)
 
-        if not payload:
-            raise HTTPException(
-                status_code=HTTPStatus.UNAUTHORIZED, detail="invalid token"
-            )
+        page = await transaction_service.get_user_transactions(
+            user_id,
+            params.size,
+            decode_keyset_cursor(params.to_raw_params().cursor),
+            filters,
+        )
+        return create_page(
+            page.items,
+            params=params,
+            next_=page.next_cursor,
+            previous=page.previous_cursor,
+        )
+    except (ObjectNotFoundError, DBAPIError):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Transactions is not found!",
+        )
 
+
+@router.get(
+    "/users/{user_id}/search", response_model=CursorPage[GetIncomingTransactionSchema]
+)
+async def search_transactions_by_user_id(
+    user_id: str,
+    payload: AuthPayload,
+    q: Annotated[str, Query(min_length=1, max_length=200)],
+    params: CursorParams = Depends(),
+    transaction_service: IncomingTransactionService = Depends(
+        get_incoming_transaction_service
+    ),
+) -> CursorPage[GetIncomingTransactionSchema]:
+    try:
         check_user_access(payload, user_id)
 
-        transactions = await transaction_service.get_user_transactions(user_id)
-        return paginate(transactions)
-    except (ObjectNotFoundError, DBAPIError):
+        page = await transaction_service.search_user_transactions(
+            user_id,
+            q,
+            params.size,
+            decode_keyset_cursor(params.to_raw_params().cursor),
+        )
+        return create_page(
+            page.items,
+            params=params,
+            next_=page.next_cursor,
+            previous=page.previous_cursor,
+        )
+    except DBAPIError:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Transactions is not found!",
@@ -142,22 +209,19 @@ async def get_transactions_by_user_id(
 )
 async def delete_transaction(
     transaction_id: str,
-    access_token: Annotated[str, Depends(oauth2_scheme)],
+    payload: AuthPayload,
     transaction_service: IncomingTransactionService = Depends(
         get_incoming_transaction_service
     ),
 ):
     try:
-        payload = decode_token(access_token)
-
-        if not payload:
-            raise HTTPException(
-                status_code=HTTPStatus.UNAUTHORIZED, detail="invalid token"
-            )
-
-        check_user_access(payload, str(payload["user_id"]))
+        transaction = await transaction_service.get_transaction_by_id(transaction_id)
+        check_user_access(payload, str(transaction.user_id))
 
         await transaction_service.delete_transaction(transaction_id)
         return {"detail": "success"}
-    except ObjectNotFoundError as error:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(error))
+    except (ObjectNotFoundError, DBAPIError):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Transaction is not found!",
+        )
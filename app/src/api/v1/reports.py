@@ -0,0 +1,121 @@
+from datetime import datetime, timezone
+from uuid import UUID
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from models import CurrencyEnum, TransactionTypeEnum
+from schemas.fx_rate import NetWorthSchema, TotalSpendSchema
+from schemas.report import (CategoryTotalSchema, PeriodTotalSchema,
+                            ReportPeriod, WalletTotalSchema)
+from services.exceptions import ConflictError
+from services.fx_service import FxService, get_fx_service
+from services.report_service import ReportService, get_report_service
+from utils.auth import AuthPayload, check_user_access
+
+router = APIRouter()
+
+
+class ReportParams:
+    def __init__(
+        self,
+        user_id: UUID,
+        payload: AuthPayload,
+        date_from: datetime,
+        date_to: datetime | None = None,
+        tz: str = "UTC",
+        transaction_type: TransactionTypeEnum | None = Query(None, alias="type"),
+    ):
+        check_user_access(payload, str(user_id))
+
+        try:
+            self.tz = ZoneInfo(tz)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown time zone {tz}",
+            )
+
+        # Naive dates are taken in the requested time zone
+        self.date_from = (
+            date_from if date_from.tzinfo else date_from.replace(tzinfo=self.tz)
+        )
+        if date_to is None:
+            self.date_to = datetime.now(timezone.utc)
+        else:
+            self.date_to = (
+                date_to if date_to.tzinfo else date_to.replace(tzinfo=self.tz)
+            )
+
+        if self.date_from >= self.date_to:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="date_from must be earlier than date_to",
+            )
+
+        self.user_id = user_id
+        self.transaction_type = transaction_type
+
+
+@router.get("/users/{user_id}/categories", response_model=list[CategoryTotalSchema])
+async def get_totals_by_category(
+    params: ReportParams = Depends(),
+    report_service: ReportService = Depends(get_report_service),
+) -> list[CategoryTotalSchema]:
+    return await report_service.get_totals_by_category(
+        params.user_id, params.date_from, params.date_to, params.transaction_type
+    )
+
+
+@router.get("/users/{user_id}/wallets", response_model=list[WalletTotalSchema])
+async def get_totals_by_wallet(
+    params: ReportParams = Depends(),
+    report_service: ReportService = Depends(get_report_service),
+) -> list[WalletTotalSchema]:
+    return await report_service.get_totals_by_wallet(
+        params.user_id, params.date_from, params.date_to, params.transaction_type
+    )
+
+
+@router.get("/users/{user_id}/periods", response_model=list[PeriodTotalSchema])
+async def get_totals_by_period(
+    period: ReportPeriod = ReportPeriod.month,
+    params: ReportParams = Depends(),
+    report_service: ReportService = Depends(get_report_service),
+) -> list[PeriodTotalSchema]:
+    return await report_service.get_totals_by_period(
+        params.user_id,
+        params.date_from,
+        params.date_to,
+        period,
+        params.tz,
+        params.transaction_type,
+    )
+
+
+@router.get("/users/{user_id}/net-worth", response_model=NetWorthSchema)
+async def get_net_worth(
+    user_id: UUID,
+    payload: AuthPayload,
+    currency: CurrencyEnum,
+    fx_service: FxService = Depends(get_fx_service),
+) -> NetWorthSchema:
+    check_user_access(payload, str(user_id))
+
+    try:
+        return await fx_service.get_net_worth(user_id, currency)
+    except ConflictError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get("/users/{user_id}/total-spend", response_model=TotalSpendSchema)
+async def get_total_spend(
+    currency: CurrencyEnum,
+    params: ReportParams = Depends(),
+    fx_service: FxService = Depends(get_fx_service),
+) -> TotalSpendSchema:
+    try:
+        return await fx_service.get_total_spend(
+            params.user_id, params.date_from, params.date_to, currency
+        )
+    except ConflictError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -1,6 +1,3 @@
-from http import HTTPStatus
-from typing import Annotated
-
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi_pagination import Page, paginate
 from schemas.role import CreateRoleSchema, GetRoleSchema
@@ -8,8 +5,7 @@ from services.exceptions import (ObjectAlreadyExistsException,
                                  ObjectNotFoundError)
 from services.role_service import RoleService, get_role_service
 from sqlalchemy.exc import DBAPIError
-from utils.auth import (check_admin_access, check_user_access, decode_token,
-                        oauth2_scheme)
+from utils.auth import AuthPayload, check_admin_access, check_user_access
 
 router = APIRouter()
 
@@ -17,17 +13,10 @@ router = APIRouter()
 @router.post("/", response_model=GetRoleSchema)
 async def create_role(
     role: CreateRoleSchema,
-    access_token: Annotated[str, Depends(oauth2_scheme)],
+    payload: AuthPayload,
     role_service: RoleService = Depends(get_role_service),
 ) -> GetRoleSchema:
     try:
-        payload = decode_token(access_token)
-
-        if not payload:
-            raise HTTPException(
-                status_code=HTTPStatus.UNAUTHORIZED, detail="invalid token"
-            )
-
         check_admin_access(payload)
 
         role = await role_service.create_role(role)
@@ -41,17 +30,10 @@ async def create_role(
 
 @router.get("/", response_model=Page[GetRoleSchema])
 async def get_all_roles(
-    access_token: Annotated[str, Depends(oauth2_scheme)],
+    payload: AuthPayload,
     role_service: RoleService = Depends(get_role_service),
 ) -> Page[GetRoleSchema]:
     try:
-        payload = decode_token(access_token)
-
-        if not payload:
-            raise HTTPException(
-                status_code=HTTPStatus.UNAUTHORIZED, detail="invalid token"
-            )
-
         check_admin_access(payload)
 
         roles = await role_service.get_all_roles()
@@ -66,17 +48,10 @@ async def get_all_roles(
 @router.get("/{role_id}", response_model=GetRoleSchema)
 async def get_role_by_id(
     role_id: str,
-    access_token: Annotated[str, Depends(oauth2_scheme)],
+    payload: AuthPayload,
     role_service: RoleService = Depends(get_role_service),
 ) -> GetRoleSchema:
     try:
-        payload = decode_token(access_token)
-
-        if not payload:
-            raise HTTPException(
-                status_code=HTTPStatus.UNAUTHORIZED, detail="invalid token"
-            )
-
         check_user_access(payload, str(payload["user_id"]))
 
         role = await role_service.get_role_by_id(role_id)
@@ -91,17 +66,10 @@ async def get_role_by_id(
 @router.get("/users/{user_id}", response_model=Page[GetRoleSchema])
 async def get_roles_by_user_id(
     user_id: str,
-    access_token: Annotated[str, Depends(oauth2_scheme)],
+    payload: AuthPayload,
     role_service: RoleService = Depends(get_role_service),
 ) -> Page[GetRoleSchema]:
     try:
-        payload = decode_token(access_token)
-
-        if not payload:
-            raise HTTPException(
-                status_code=HTTPStatus.UNAUTHORIZED, detail="invalid token"
-            )
-
         check_user_access(payload, user_id)
 
         roles = await role_service.get_user_roles(user_id)
@@ -119,17 +87,10 @@ async def get_roles_by_user_id(
 )
 async def delete_role(
     role_id: str,
-    access_token: Annotated[str, Depends(oauth2_scheme)],
+    payload: AuthPayload,
     role_service: RoleService = Depends(get_role_service),
 ):
     try:
-        payload = decode_token(access_token)
-
-        if not payload:
-            raise HTTPException(
-                status_code=HTTPStatus.UNAUTHORIZED, detail="invalid token"
-            )
-
         check_user_access(payload, str(payload["user_id"]))
 
         await role_service.delete_role(role_id)
@@ -145,17 +106,10 @@ async def delete_role(
 async def assign_role(
     role_id: str,
     user_id: str,
-    access_token: Annotated[str, Depends(oauth2_scheme)],
+    payload: AuthPayload,
     role_service: RoleService = Depends(get_role_service),
 ):
     try:
-        payload = decode_token(access_token)
-
-        if not payload:
-            raise HTTPException(
-                status_code=HTTPStatus.UNAUTHORIZED, detail="invalid token"
-            )
-
         check_admin_access(payload)
 
         await role_service.assign_role_to_user(user_id, role_id)
@@ -171,17 +125,10 @@ async def assign_role(
 async def remove_role(
     role_id: str,
     user_id: str,
-    access_token: Annotated[str, Depends(oauth2_scheme)],
+    payload: AuthPayload,
     role_service: RoleService = Depends(get_role_service),
 ):
     try:
-        payload = decode_token(access_token)
-
-        if not payload:
-            raise HTTPException(
-                status_code=HTTPStatus.UNAUTHORIZED, detail="invalid token"
-            )
-
         check_admin_access(payload)
 
         await role_service.remove_role_from_user(user_id, role_id)
@@ -0,0 +1,43 @@
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from schemas.statement_import import (ImportStatementResultSchema,
+                                      StatementFormat)
+from services.exceptions import ObjectNotFoundError, StatementFormatError
+from services.import_service import (StatementImportService,
+                                     get_statement_import_service)
+from services.statement_parsers import aiter_lines
+from services.wallet_service import WalletService, get_wallet_service
+from utils.auth import AuthPayload, check_user_access
+
+router = APIRouter()
+
+
+@router.post("/", response_model=ImportStatementResultSchema)
+async def import_statement(
+    request: Request,
+    wallet_id: UUID,
+    incoming_category_id: UUID,
+    outgoing_category_id: UUID,
+    payload: AuthPayload,
+    statement_format: StatementFormat = Query(StatementFormat.csv, alias="format"),
+    import_service: StatementImportService = Depends(get_statement_import_service),
+    wallet_service: WalletService = Depends(get_wallet_service),
+) -> ImportStatementResultSchema:
+    """Imports a statement file sent as the raw request body."""
+    try:
+        wallet = await wallet_service.get_wallet_by_id(str(wallet_id))
+        check_user_access(payload, str(wallet.user_id))
+
+        return await import_service.import_statement(
+            aiter_lines(request.stream()),
+            statement_format,
+            wallet.id,
+            wallet.user_id,
+            incoming_category_id,
+            outgoing_category_id,
+        )
+    except ObjectNotFoundError as error:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(error))
+    except StatementFormatError as error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(error))
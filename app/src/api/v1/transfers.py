@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from schemas.transfer import CreateTransferSchema, GetTransferSchema
+from services.exceptions import ConflictError, ObjectNotFoundError
+from services.transfer_service import TransferService, get_transfer_service
+from services.wallet_service import WalletService, get_wallet_service
+from utils.auth import AuthPayload, check_user_access
+from utils.idempotency import Idempotency
+
+router = APIRouter()
+
+
+@router.post("/", response_model=GetTransferSchema)
+async def create_transfer(
+    transfer: CreateTransferSchema,
+    payload: AuthPayload,
+    transfer_service: TransferService = Depends(get_transfer_service),
+    wallet_service: WalletService = Depends(get_wallet_service),
+    idempotency: Idempotency = Depends(),
+) -> GetTransferSchema:
+    """Moves money between two wallets as one outgoing and one incoming transaction."""
+
+    async def create():
+        wallets = await wallet_service.get_wallets_by_ids(
+            [transfer.from_wallet_id, transfer.to_wallet_id]
+        )
+        for wallet in wallets:
+            check_user_access(payload, str(wallet.user_id))
+
+        try:
+            return await transfer_service.create_transfer(transfer)
+        except ObjectNotFoundError as error:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail=str(error)
+            )
+        except ConflictError as error:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail=str(error)
+            )
+
+    return await idempotency.run(
+        payload["user_id"], transfer, create, GetTransferSchema
+    )
@@ -1,13 +1,10 @@
-from http import HTTPStatus
-from typing import Annotated
-
 from fastapi import APIRouter, Depends, HTTPException, status
 from models import User
 from schemas.user import CreateUserSchema, GetUserSchema
-from services.exceptions import ConflictError, ObjectNotFoundError
+from services.exceptions import (ConflictError, ObjectNotFoundError,
+                                 ServiceBusyError)
 from services.user_service import UserService, get_user_service
-from utils.auth import (check_admin_access, check_user_access, decode_token,
-                        oauth2_scheme)
+from utils.auth import AuthPayload, check_admin_access, check_user_access
 
 router = APIRouter()
 
@@ -15,17 +12,10 @@ router = APIRouter()
 @router.get("/{user_id}", response_model=GetUserSchema)
 async def get_user_by_id(
     user_id: str,
-    access_token: Annotated[str, Depends(oauth2_scheme)],
+    payload: AuthPayload,
     user_service: UserService = Depends(get_user_service),
 ) -> GetUserSchema:
     try:
-        payload = decode_token(access_token)
-
-        if not payload:
-            raise HTTPException(
-                status_code=HTTPStatus.UNAUTHORIZED, detail="invalid token"
-            )
-
         check_user_access(payload, user_id)
 
         user = await user_service.get_user_by_id(user_id)
@@ -37,17 +27,10 @@ async def get_user_by_id(
 @router.get("/logins/{user_login}", response_model=GetUserSchema)
 async def get_user_by_login(
     user_login: str,
-    access_token: Annotated[str, Depends(oauth2_scheme)],
+    payload: AuthPayload,
     user_service: UserService = Depends(get_user_service),
 ) -> User:
     try:
-        payload = decode_token(access_token)
-
-        if not payload:
-            raise HTTPException(
-                status_code=HTTPStatus.UNAUTHORIZED, detail="invalid token"
-            )
-
         check_admin_access(payload)
 
         user = await user_service.get_user_by_login(user_login)
@@ -59,18 +42,11 @@ async def get_user_by_login(
 @router.patch("/{user_id}", response_model=GetUserSchema)
 async def update_user(
     user_id: str,
-    access_token: Annotated[str, Depends(oauth2_scheme)],
+    payload: AuthPayload,
     user: CreateUserSchema,
     user_service: UserService = Depends(get_user_service),
 ) -> User:
     try:
-        payload = decode_token(access_token)
-
-        if not payload:
-            raise HTTPException(
-                status_code=HTTPStatus.UNAUTHORIZED, detail="invalid token"
-            )
-
         check_user_access(payload, user_id)
 
         updated_user = await user_service.update_user(user_id, user)
@@ -80,6 +56,12 @@ async def update_user(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=error,
         )
+    except ServiceBusyError as error:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(error),
+            headers={"Retry-After": "1"},
+        )
 
 
 @router.delete(
@@ -88,17 +70,10 @@ async def update_user(
 )
 async def delete_user(
     user_id: str,
-    access_token: Annotated[str, Depends(oauth2_scheme)],
+    payload: AuthPayload,
     user_service: UserService = Depends(get_user_service),
 ):
     try:
-        payload = decode_token(access_token)
-
-        if not payload:
-            raise HTTPException(
-                status_code=HTTPStatus.UNAUTHORIZED, detail="invalid token"
-            )
-
         check_user_access(payload, user_id)
 
         await user_service.delete_user(user_id=user_id)
@@ -1,15 +1,15 @@
-from http import HTTPStatus
-from typing import Annotated
-
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi_pagination import Page, paginate
-from schemas.wallet import (CreateWalletSchema, GetWalletSchema,
-                            UpdateWalletSchema)
+from schemas.wallet import (BalancePointSchema, CreateWalletSchema,
+                            GetWalletSchema, UpdateWalletSchema)
+from services.balance_history_service import (BalanceHistoryService,
+                                              get_balance_history_service)
 from services.exceptions import (ConflictError, ObjectAlreadyExistsException,
                                  ObjectNotFoundError)
 from services.wallet_service import WalletService, get_wallet_service
 from sqlalchemy.exc import DBAPIError
-from utils.auth import check_user_access, decode_token, oauth2_scheme
+from utils.auth import AuthPayload, check_user_access
+from utils.idempotency import Idempotency
 
 router = APIRouter()
 
@@ -17,21 +17,19 @@ router = APIRouter()
 @router.post("/", response_model=GetWalletSchema)
 async def create_wallet(
     wallet: CreateWalletSchema,
-    access_token: Annotated[str, Depends(oauth2_scheme)],
+    payload: AuthPayload,
     wallet_service: WalletService = Depends(get_wallet_service),
+    idempotency: Idempotency = Depends(),
 ) -> GetWalletSchema:
     try:
-        payload = decode_token(access_token)
-
-        if not payload:
-            raise HTTPException(
-                status_code=HTTPStatus.UNAUTHORIZED, detail="invalid token"
-            )
-
         check_user_access(payload, str(wallet.user_id))
 
-        wallet = await wallet_service.create_wallet(wallet)
-        return wallet
+        return await idempotency.run(
+            payload["user_id"],
+            wallet,
+            lambda: wallet_service.create_wallet(wallet),
+            GetWalletSchema,
+        )
     except ObjectAlreadyExistsException:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -42,18 +40,11 @@ async def create_wallet(
 @router.patch("/{wallet_id}", response_model=GetWalletSchema)
 async def update_wallet(
     wallet_id: str,
-    access_token: Annotated[str, Depends(oauth2_scheme)],
+    payload: AuthPayload,
     wallet: UpdateWalletSchema,
     wallet_service: WalletService = Depends(get_wallet_service),
 ) -> GetWalletSchema:
     try:
-        payload = decode_token(access_token)
-
-        if not payload:
-            raise HTTPException(
-                status_code=HTTPStatus.UNAUTHORIZED, detail="invalid token"
-            )
-
         check_user_access(payload, str(wallet.user_id))
 
         updated_wallet = await wallet_service.update_wallet(wallet_id, wallet)
@@ -68,17 +59,10 @@ async def update_wallet(
 @router.get("/{wallet_id}", response_model=GetWalletSchema)
 async def get_wallet_by_id(
     wallet_id: str,
-    access_token: Annotated[str, Depends(oauth2_scheme)],
+    payload: AuthPayload,
     wallet_service: WalletService = Depends(get_wallet_service),
 ) -> GetWalletSchema:
     try:
-        payload = decode_token(access_token)
-
-        if not payload:
-            raise HTTPException(
-                status_code=HTTPStatus.UNAUTHORIZED, detail="invalid token"
-            )
-
         check_user_access(payload, str(payload["user_id"]))
 
         wallet = await wallet_service.get_wallet_by_id(wallet_id)
@@ -90,20 +74,34 @@ async def get_wallet_by_id(
         )
 
 
+@router.get("/{wallet_id}/balance-history", response_model=list[BalancePointSchema])
+async def get_wallet_balance_history(
+    wallet_id: str,
+    payload: AuthPayload,
+    wallet_service: WalletService = Depends(get_wallet_service),
+    balance_history_service: BalanceHistoryService = Depends(
+        get_balance_history_service
+    ),
+) -> list[BalancePointSchema]:
+    try:
+        wallet = await wallet_service.get_wallet_by_id(wallet_id)
+        check_user_access(payload, str(wallet.user_id))
+
+        return await balance_history_service.get_balance_history(wallet)
+    except (ObjectNotFoundError, DBAPIError):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Wallet is not found!",
+        )
+
+
 @router.get("/users/{user_id}", response_model=Page[GetWalletSchema])
 async def get_wallet_by_user_id(
     user_id: str,
-    access_token: Annotated[str, Depends(oauth2_scheme)],
+    payload: AuthPayload,
     wallet_service: WalletService = Depends(get_wallet_service),
 ) -> Page[GetWalletSchema]:
     try:
-        payload = decode_token(access_token)
-
-        if not payload:
-            raise HTTPException(
-                status_code=HTTPStatus.UNAUTHORIZED, detail="invalid token"
-            )
-
         check_user_access(payload, user_id)
 
         wallets = await wallet_service.get_wallets_by_user_id(user_id)
@@ -121,17 +119,10 @@ async def get_wallet_by_user_id(
 )
 async def delete_wallet(
     wallet_id: str,
-    access_token: Annotated[str, Depends(oauth2_scheme)],
+    payload: AuthPayload,
     wallet_service: WalletService = Depends(get_wallet_service),
 ):
     try:
-        payload = decode_token(access_token)
-
-        if not payload:
-            raise HTTPException(
-                status_code=HTTPStatus.UNAUTHORIZED, detail="invalid token"
-            )
-
         check_user_access(payload, str(payload["user_id"]))
 
         await wallet_service.delete_wallet(wallet_id)
@@ -0,0 +1,43 @@
+import asyncio
+
+import typer
+from core.config import settings
+from db import postgres
+from services.wallet_service import WalletService
+from sqlalchemy.ext.asyncio import (AsyncSession, async_sessionmaker,
+                                    create_async_engine)
+
+app = typer.Typer()
+
+
+async def run(method: str, *args):
+    engine = create_async_engine(postgres.dsn, echo=settings.engine_echo, future=True)
+    async_session = async_sessionmaker(
+        bind=engine, expire_on_commit=False, class_=AsyncSession
+    )  # type: ignore[assignment]
+    try:
+        return await getattr(WalletService(async_session), method)(*args)
+    finally:
+        await engine.dispose()
+
+
+@app.command()
+def enable(wallet_id: str, shards: int = 8):
+    asyncio.run(run("set_balance_shards", wallet_id, shards))
+    typer.echo(f"Wallet {wallet_id} balance is spread over {shards} shards")
+
+
+@app.command()
+def disable(wallet_id: str):
+    asyncio.run(run("set_balance_shards", wallet_id, 0))
+    typer.echo(f"Wallet {wallet_id} balance is kept in the wallet row")
+
+
+@app.command()
+def fold(chunk_size: int = 500):
+    wallets = asyncio.run(run("fold_balance_shards", chunk_size))
+    typer.echo(f"Folded balance shards of {wallets} wallets")
+
+
+if __name__ == "__main__":
+    app()
@@ -17,11 +17,42 @@ class Settings(BaseSettings):
     engine_echo: bool = Field(False, alias="ENGINE_ECHO")
     jwt_secret_key: str = Field("my_secret_key", alias="JWT_SECRET_KEY")
     jwt_algorithm: str = Field("HS256", alias="JWT_ALGORITHM")
+    auth_token_cache_size: int = Field(10000, alias="AUTH_TOKEN_CACHE_SIZE")
+    auth_token_cache_ttl: int = Field(300, alias="AUTH_TOKEN_CACHE_TTL")
+    revocation_filter_capacity: int = Field(100000, alias="REVOCATION_FILTER_CAPACITY")
+    revocation_filter_error_rate: float = Field(
+        0.001, alias="REVOCATION_FILTER_ERROR_RATE"
+    )
+    revocation_filter_rebuild_seconds: int = Field(
+        3600, alias="REVOCATION_FILTER_REBUILD_SECONDS"
+    )
+    password_hash_workers: int = Field(2, alias="PASSWORD_HASH_WORKERS")
+    password_hash_max_concurrency: int = Field(4, alias="PASSWORD_HASH_MAX_CONCURRENCY")
+    password_hash_queue_timeout: float = Field(5, alias="PASSWORD_HASH_QUEUE_TIMEOUT")
+    role_cache_ttl: int = Field(300, alias="ROLE_CACHE_TTL")
+    role_cache_local_ttl: float = Field(5, alias="ROLE_CACHE_LOCAL_TTL")
+    role_cache_local_size: int = Field(10000, alias="ROLE_CACHE_LOCAL_SIZE")
     redis_port: str = Field("6379", alias="REDIS_PORT")
     redis_host: str = Field("redis", alias="REDIS_HOST")
     prepared_statement_cache_enabled: bool = Field(
         True, alias="PREPARED_STATEMENT_CACHE_ENABLED"
     )
+    import_chunk_size: int = Field(10000, alias="IMPORT_CHUNK_SIZE")
+    import_amount_scale: int = Field(100, alias="IMPORT_AMOUNT_SCALE")
+    export_chunk_size: int = Field(1000, alias="EXPORT_CHUNK_SIZE")
+    balance_history_daily_days: int = Field(90, alias="BALANCE_HISTORY_DAILY_DAYS")
+    balance_history_weekly_days: int = Field(365, alias="BALANCE_HISTORY_WEEKLY_DAYS")
+    balance_history_cache_ttl: int = Field(3600, alias="BALANCE_HISTORY_CACHE_TTL")
+    partition_months_ahead: int = Field(3, alias="PARTITION_MONTHS_AHEAD")
+    partition_lock_timeout: int = Field(5000, alias="PARTITION_LOCK_TIMEOUT")
+    partition_batch_size: int = Field(10000, alias="PARTITION_BATCH_SIZE")
+    idempotency_ttl: int = Field(86400, alias="IDEMPOTENCY_TTL")
+    idempotency_lock_timeout: int = Field(30, alias="IDEMPOTENCY_LOCK_TIMEOUT")
+    group_commit_enabled: bool = Field(False, alias="GROUP_COMMIT_ENABLED")
+    group_commit_window_ms: int = Field(5, alias="GROUP_COMMIT_WINDOW_MS")
+    group_commit_max_batch: int = Field(500, alias="GROUP_COMMIT_MAX_BATCH")
+    fx_base_currency: str = Field("USD", alias="FX_BASE_CURRENCY")
+    fx_rate_cache_ttl: int = Field(300, alias="FX_RATE_CACHE_TTL")
 
 
 settings = Settings()
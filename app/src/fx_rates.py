@@ -0,0 +1,37 @@
+import asyncio
+import csv
+from pathlib import Path
+
+import typer
+from core.config import settings
+from db import postgres
+from schemas.fx_rate import FxRateSchema
+from services.fx_service import FxService
+from sqlalchemy.ext.asyncio import (AsyncSession, async_sessionmaker,
+                                    create_async_engine)
+
+app = typer.Typer()
+
+
+async def run(method: str, *args):
+    engine = create_async_engine(postgres.dsn, echo=settings.engine_echo, future=True)
+    async_session = async_sessionmaker(
+        bind=engine, expire_on_commit=False, class_=AsyncSession
+    )  # type: ignore[assignment]
+    try:
+        return await getattr(FxService(async_session), method)(*args)
+    finally:
+        await engine.dispose()
+
+
+@app.command()
+def load(path: Path):
+    """Loads rates from a CSV file with date,currency,rate columns."""
+    with path.open(newline="") as file:
+        rates = [FxRateSchema.model_validate(row) for row in csv.DictReader(file)]
+    loaded = asyncio.run(run("load_rates", rates))
+    typer.echo(f"Loaded {loaded} exchange rates")
+
+
+if __name__ == "__main__":
+    app()
@@ -2,11 +2,16 @@ from contextlib import asynccontextmanager
 
 import uvicorn
 from api.v1.auth import router as auth_router
+from api.v1.export import router as export_router
+from api.v1.fx_rates import router as fx_rates_router
 from api.v1.incoming_categories import router as incoming_categories_router
 from api.v1.incoming_transactions import router as incoming_transactions_router
 from api.v1.outgoing_categories import router as outgoing_categories_router
 from api.v1.outgoing_transactions import router as outgoing_transactions_router
+from api.v1.reports import router as reports_router
 from api.v1.roles import router as roles_router
+from api.v1.statement_import import router as statement_import_router
+from api.v1.transfers import router as transfers_router
 from api.v1.users import router as users_router
 from api.v1.wallets import router as wallets_router
 from core.config import settings
@@ -15,18 +20,24 @@ from fastapi import FastAPI
 from fastapi.responses import ORJSONResponse
 from fastapi_pagination import add_pagination
 from redis.asyncio import Redis
+from services import group_commit_service, password_service
+from services.group_commit_service import GroupCommitter
+from services.password_service import PasswordHasher
 from sqlalchemy.ext.asyncio import (AsyncSession, async_sessionmaker,
                                     create_async_engine)
+from utils.revocation import revoked_tokens
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     try:
         redis.redis = Redis(host=settings.redis_host, port=settings.redis_port)
+        # Batch inserts go through executemany(), which uses the statement
+        # cache of asyncpg itself rather than the one of SQLAlchemy
         connect_args = (
             {}
             if settings.prepared_statement_cache_enabled
-            else {"prepared_statement_cache_size": 0}
+            else {"prepared_statement_cache_size": 0, "statement_cache_size": 0}
         )
         postgres.engine = create_async_engine(
             postgres.dsn,
@@ -35,8 +46,26 @@ async def lifespan(app: FastAPI):
             connect_args=connect_args,
         )
         postgres.async_session = async_sessionmaker(bind=postgres.engine, expire_on_commit=False, class_=AsyncSession)  # type: ignore[assignment]
+        if settings.group_commit_enabled:
+            group_commit_service.group_committer = GroupCommitter(
+                postgres.async_session,
+                redis.redis,
+                settings.group_commit_window_ms,
+                settings.group_commit_max_batch,
+            )
+        password_service.password_hasher = PasswordHasher(
+            settings.password_hash_workers,
+            settings.password_hash_max_concurrency,
+            settings.password_hash_queue_timeout,
+        )
+        revoked_tokens.start(redis.redis)
         yield
     finally:
+        await revoked_tokens.close()
+        if password_service.password_hasher is not None:
+            password_service.password_hasher.close()
+        if group_commit_service.group_committer is not None:
+            await group_commit_service.group_committer.close()
         await redis.redis.close()
 
 
@@ -68,6 +97,23 @@ app.include_router(
     prefix="/api/v1/transactions/outgoing",
     tags=["outgoing_transactions"],
 )
+app.include_router(
+    statement_import_router,
+    prefix="/api/v1/transactions/import",
+    tags=["statement_import"],
+)
+app.include_router(
+    transfers_router,
+    prefix="/api/v1/transactions/transfers",
+    tags=["transfers"],
+)
+app.include_router(
+    export_router,
+    prefix="/api/v1/transactions/export",
+    tags=["export"],
+)
+app.include_router(reports_router, prefix="/api/v1/reports", tags=["reports"])
+app.include_router(fx_rates_router, prefix="/api/v1/fx-rates", tags=["fx_rates"])
 app.include_router(wallets_router, prefix="/api/v1/wallets", tags=["wallets"])
 app.include_router(users_router, prefix="/api/v1/users", tags=["users"])
 app.include_router(roles_router, prefix="/api/v1/roles", tags=["roles"])
@@ -1,10 +1,16 @@
-from .base import Base
-from .enums import CurrencyEnum
+from .base import (TEXT_SEARCH_CONFIG, Base, add_default_partition,
+                   default_partition_name)
+from .balance_checkpoint import NO_TRANSACTION_ID, BalanceCheckpoint
+from .category_monthly_total import CategoryMonthlyTotal
+from .enums import CurrencyEnum, TransactionTypeEnum
+from .exchange_rate import ExchangeRate
 from .incoming_category import IncomingCategory
 from .incoming_transaction import IncomingTransaction
+from .ledger_entry import LedgerEntry
 from .outgoing_category import OutgoingCategory
 from .outgoing_transaction import OutgoingTransaction
 from .refresh_token import RefreshToken
 from .role import Role, user_role
 from .user import User
 from .wallet import Wallet
+from .wallet_balance_shard import WalletBalanceShard
@@ -0,0 +1,38 @@
+import uuid
+from datetime import datetime
+
+from models import Base
+from sqlalchemy import BigInteger, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import TIMESTAMP
+from sqlalchemy.dialects.postgresql import UUID as PgUUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+# Last transaction id of a checkpoint taken before the wallet had any
+NO_TRANSACTION_ID = uuid.UUID(int=0)
+
+
+class BalanceCheckpoint(Base):
+    """
+    Balance of a wallet including every ledger entry up to
+    (date, last_transaction_id) in the (date, id) order of the ledger.
+
+    Written by `python reconcile.py` and dropped by any write that lands
+    at or before it, so the entries after the latest checkpoint are all
+    that has to be summed to check the wallet amount.
+    """
+
+    __table_args__ = (
+        Index(
+            "ix_balancecheckpoint_wallet_id_date_last_transaction_id",
+            "wallet_id",
+            "date",
+            "last_transaction_id",
+        ),
+    )
+
+    wallet_id: Mapped[uuid.UUID] = mapped_column(
+        PgUUID, ForeignKey("wallet.id", ondelete="CASCADE")
+    )
+    date: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True))
+    last_transaction_id: Mapped[uuid.UUID] = mapped_column(PgUUID)
+    amount: Mapped[int] = mapped_column(BigInteger)
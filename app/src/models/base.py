@@ -1,12 +1,34 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import func
+from sqlalchemy import DDL, Table, event, func
 from sqlalchemy.dialects.postgresql import TIMESTAMP
 from sqlalchemy.dialects.postgresql import UUID as PgUUID
 from sqlalchemy.ext.declarative import declared_attr
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
+# Language agnostic text search configuration used for transaction descriptions
+TEXT_SEARCH_CONFIG = "simple"
+
+
+def default_partition_name(table_name: str) -> str:
+    return f"{table_name}_default"
+
+
+def add_default_partition(table: Table) -> None:
+    """
+    Creates the catch-all DEFAULT partition right after a partitioned table,
+    so rows outside of the monthly partitions can always be inserted.
+    """
+    event.listen(
+        table,
+        "after_create",
+        DDL(
+            f"CREATE TABLE {default_partition_name(table.name)} "
+            f"PARTITION OF {table.name} DEFAULT"
+        ),
+    )
+
 
 class Base(DeclarativeBase):
     @declared_attr.directive
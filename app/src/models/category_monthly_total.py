@@ -0,0 +1,37 @@
+import uuid
+from datetime import date
+
+from models import Base
+from models.enums import TransactionTypeEnum
+from sqlalchemy import BigInteger, Date, ForeignKey, Integer, UniqueConstraint
+from sqlalchemy.dialects.postgresql import ENUM
+from sqlalchemy.dialects.postgresql import UUID as PgUUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+
+class CategoryMonthlyTotal(Base):
+    __table_args__ = (
+        UniqueConstraint(
+            "user_id",
+            "transaction_type",
+            "month",
+            "wallet_id",
+            "category_id",
+            name="uq_categorymonthlytotal_key",
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
+
+    transaction_type: Mapped[TransactionTypeEnum] = mapped_column(
+        ENUM(
+            TransactionTypeEnum,
+            values_callable=lambda obj: [e.value for e in obj],
+            name="transaction_type",
+        )
+    )
+    user_id: Mapped[uuid.UUID] = mapped_column(PgUUID, ForeignKey("user.id"))
+    wallet_id: Mapped[uuid.UUID] = mapped_column(PgUUID, nullable=True)
+    category_id: Mapped[uuid.UUID] = mapped_column(PgUUID, nullable=True)
+    month: Mapped[date] = mapped_column(Date)
+    amount: Mapped[int] = mapped_column(BigInteger, default=0)
+    count: Mapped[int] = mapped_column(Integer, default=0)
@@ -7,3 +7,8 @@ class CurrencyEnum(enum.Enum):
     RUB = "RUB"
     BYN = "BYN"
     KZT = "KZT"
+
+
+class TransactionTypeEnum(enum.Enum):
+    incoming = "incoming"
+    outgoing = "outgoing"
@@ -0,0 +1,28 @@
+import datetime
+from decimal import Decimal
+
+from models import Base, CurrencyEnum
+from sqlalchemy import Date, Numeric, UniqueConstraint
+from sqlalchemy.dialects.postgresql import ENUM
+from sqlalchemy.orm import Mapped, mapped_column
+
+
+class ExchangeRate(Base):
+    """
+    Units of FX_BASE_CURRENCY one unit of `currency` is worth from `date`
+    until the next rate of the currency.
+    """
+
+    __table_args__ = (
+        UniqueConstraint("currency", "date", name="uq_exchangerate_currency_date"),
+    )
+
+    currency: Mapped[CurrencyEnum] = mapped_column(
+        ENUM(
+            CurrencyEnum,
+            values_callable=lambda obj: [e.value for e in obj],
+            name="currency",
+        )
+    )
+    date: Mapped[datetime.date] = mapped_column(Date)
+    rate: Mapped[Decimal] = mapped_column(Numeric(18, 8))
@@ -0,0 +1,118 @@
+import uuid
+from datetime import datetime, timezone
+
+from models import TEXT_SEARCH_CONFIG, Base, add_default_partition
+from models.enums import TransactionTypeEnum
+from sqlalchemy import (BigInteger, CheckConstraint, Computed, ForeignKey,
+                        Index, PrimaryKeyConstraint, Text, func)
+from sqlalchemy.dialects.postgresql import ENUM, TIMESTAMP, TSVECTOR
+from sqlalchemy.dialects.postgresql import UUID as PgUUID
+from sqlalchemy.orm import Mapped, mapped_column, validates
+
+
+class LedgerEntry(Base):
+    """
+    Incoming and outgoing transactions in one table.
+
+    `amount` is always positive, `signed_amount` is negative for outgoing
+    entries, so balances and cash flow are plain sums over one index range.
+    IncomingTransaction and OutgoingTransaction are single table inheritance
+    adapters over it, each mapping `category_id` onto its own column
+    (incoming_category_id and outgoing_category_id).
+
+    Monthly range partitions on date, the partition key has to be part of
+    the primary key. Partitions are managed with `python partitions.py`
+    """
+
+    __table_args__ = (
+        PrimaryKeyConstraint("id", "date"),
+        CheckConstraint(
+            "incoming_category_id IS NULL OR direction = 'incoming'",
+            name="ck_ledgerentry_incoming_category_id",
+        ),
+        CheckConstraint(
+            "outgoing_category_id IS NULL OR direction = 'outgoing'",
+            name="ck_ledgerentry_outgoing_category_id",
+        ),
+        Index(
+            "ix_ledgerentry_user_id_direction_date_id",
+            "user_id",
+            "direction",
+            "date",
+            "id",
+        ),
+        Index("ix_ledgerentry_user_id_date_id", "user_id", "date", "id"),
+        Index(
+            "ix_ledgerentry_wallet_id_date_id",
+            "wallet_id",
+            "date",
+            "id",
+            postgresql_include=["signed_amount"],
+        ),
+        # The trigram index on description is created by migration only, as
+        # it needs the pg_trgm extension
+        Index(
+            "ix_ledgerentry_description_tsv",
+            "description_tsv",
+            postgresql_using="gin",
+        ),
+        Index("ix_ledgerentry_date", "date", postgresql_using="brin"),
+        {"postgresql_partition_by": "RANGE (date)"},
+    )
+
+    direction: Mapped[TransactionTypeEnum] = mapped_column(
+        ENUM(
+            TransactionTypeEnum,
+            values_callable=lambda obj: [e.value for e in obj],
+            name="transaction_type",
+        )
+    )
+    amount: Mapped[int] = mapped_column(BigInteger)
+    signed_amount: Mapped[int] = mapped_column(
+        BigInteger,
+        Computed(
+            "CASE WHEN direction = 'incoming' THEN amount ELSE -amount END",
+            persisted=True,
+        ),
+    )
+    description: Mapped[str] = mapped_column(Text, nullable=True)
+    description_tsv: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(
+            f"to_tsvector('{TEXT_SEARCH_CONFIG}', coalesce(description, ''))",
+            persisted=True,
+        ),
+        deferred=True,
+    )
+    date: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True),
+        server_default=func.current_timestamp(),
+        primary_key=True,
+    )
+    wallet_id: Mapped[uuid.UUID] = mapped_column(
+        PgUUID, ForeignKey("wallet.id", ondelete="SET NULL")
+    )
+    user_id: Mapped[uuid.UUID] = mapped_column(PgUUID, ForeignKey("user.id"))
+
+    __mapper_args__ = {"polymorphic_on": "direction", "with_polymorphic": "*"}
+
+    @validates("date")
+    def validate_date(self, key, value):
+        if value.tzinfo is None:
+            raise ValueError("Date must contain time zone.")
+
+        utc_time = value.astimezone(timezone.utc)
+        current_utc = datetime.now(timezone.utc)
+
+        if utc_time > current_utc.now(timezone.utc):
+            raise ValueError("Date cannot be less than current date.")
+        return value
+
+    @validates("amount")
+    def validate_amount(self, key, amount):
+        if amount <= 0:
+            raise ValueError("Amount must be a positive number.")
+        return amount
+
+
+add_default_partition(LedgerEntry.__table__)
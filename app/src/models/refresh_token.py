@@ -2,17 +2,24 @@ import uuid
 from datetime import datetime
 
 from models import Base
-from sqlalchemy import DateTime, ForeignKey, String
+from sqlalchemy import (DateTime, ForeignKey, Index, LargeBinary,
+                        UniqueConstraint)
 from sqlalchemy.dialects.postgresql import UUID as PgUUID
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm import Mapped, mapped_column
 
 
 class RefreshToken(Base):
+    __table_args__ = (
+        UniqueConstraint("token_hash", name="uq_refreshtoken_token_hash"),
+        Index("ix_refreshtoken_user_id_expires_at", "user_id", "expires_at"),
+    )
+
     user_id: Mapped[uuid.UUID] = mapped_column(
         PgUUID, ForeignKey("user.id"), nullable=False
     )
-    token: Mapped[str] = mapped_column(String(255), nullable=False)
+    # SHA-256 of the token, the token itself is not stored
+    token_hash: Mapped[bytes] = mapped_column(LargeBinary(32), nullable=False)
     expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
 
     def __repr__(self) -> str:
-        return f"<RefreshToken {self.token} for User {self.user_id}>"
+        return f"<RefreshToken {self.token_hash.hex()} for User {self.user_id}>"
@@ -2,7 +2,6 @@ from models import Base, user_role
 from models.sqlalchemy_utils.email import EmailType
 from sqlalchemy import String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from werkzeug.security import check_password_hash, generate_password_hash
 
 
 class User(Base):
@@ -20,15 +19,13 @@ class User(Base):
     )
 
     def __init__(
-        self, login: str, password: str, first_name: str, last_name: str
+        self, login: str, password_hash: str, first_name: str, last_name: str
     ) -> None:
+        # Hashed by the caller, see services.password_service
         self.login = login
-        self.password = generate_password_hash(password)
+        self.password = password_hash
         self.first_name = first_name
         self.last_name = last_name
 
-    def check_password(self, password: str) -> bool:
-        return check_password_hash(self.password, password)
-
     def __repr__(self) -> str:
         return f"<User {self.login}>"
@@ -1,7 +1,7 @@
 import uuid
 
 from models import Base, CurrencyEnum
-from sqlalchemy import BigInteger, ForeignKey, String, Text
+from sqlalchemy import BigInteger, ForeignKey, Integer, String, Text
 from sqlalchemy.dialects.postgresql import ENUM
 from sqlalchemy.dialects.postgresql import UUID as PgUUID
 from sqlalchemy.orm import Mapped, mapped_column
@@ -11,6 +11,8 @@ class Wallet(Base):
     name: Mapped[str] = mapped_column(String)
     description: Mapped[str] = mapped_column(Text, nullable=True)
     amount: Mapped[int] = mapped_column(BigInteger)
+    # Number of WalletBalanceShard rows writers spread the balance over, 0 if none
+    balance_shards: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
     currency: Mapped[CurrencyEnum] = mapped_column(
         ENUM(
             CurrencyEnum,
@@ -18,4 +20,6 @@ class Wallet(Base):
             name="currency",
         )
     )
-    user_id: Mapped[uuid.UUID] = mapped_column(PgUUID, ForeignKey("user.id"))
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        PgUUID, ForeignKey("user.id"), index=True
+    )
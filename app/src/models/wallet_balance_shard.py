@@ -0,0 +1,26 @@
+import uuid
+
+from models import Base
+from sqlalchemy import BigInteger, ForeignKey, Integer, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID as PgUUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+
+class WalletBalanceShard(Base):
+    """
+    Part of the balance of a wallet with `balance_shards` set.
+
+    Writers add to one shard picked at random instead of the wallet row,
+    the exact balance is the wallet amount plus all of its shards. Shards
+    are folded back into the wallet amount by `python balance_shards.py fold`.
+    """
+
+    __table_args__ = (
+        UniqueConstraint("wallet_id", "shard", name="uq_walletbalanceshard_shard"),
+    )
+
+    wallet_id: Mapped[uuid.UUID] = mapped_column(
+        PgUUID, ForeignKey("wallet.id", ondelete="CASCADE")
+    )
+    shard: Mapped[int] = mapped_column(Integer)
+    amount: Mapped[int] = mapped_column(BigInteger, default=0)
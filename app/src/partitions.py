@@ -0,0 +1,47 @@
+import asyncio
+
+import typer
+from core.config import settings
+from db import postgres
+from services.partition_service import PartitionService
+from sqlalchemy.ext.asyncio import (AsyncSession, async_sessionmaker,
+                                    create_async_engine)
+
+app = typer.Typer()
+
+
+async def run(method: str, *args):
+    engine = create_async_engine(postgres.dsn, echo=settings.engine_echo, future=True)
+    async_session = async_sessionmaker(
+        bind=engine, expire_on_commit=False, class_=AsyncSession
+    )  # type: ignore[assignment]
+    try:
+        return await getattr(PartitionService(async_session), method)(*args)
+    finally:
+        await engine.dispose()
+
+
+@app.command()
+def create(months_ahead: int = settings.partition_months_ahead):
+    partitions = asyncio.run(run("create_future_partitions", months_ahead))
+    typer.echo(f"Created {len(partitions)} partitions: {', '.join(partitions)}")
+
+
+@app.command()
+def migrate(
+    limit: int | None = None,
+    pause: float = 1.0,
+    batch_size: int = settings.partition_batch_size,
+):
+    partitions = asyncio.run(run("migrate_default_partition", limit, pause, batch_size))
+    typer.echo(f"Moved rows into {len(partitions)} partitions: {', '.join(partitions)}")
+
+
+@app.command()
+def detach(keep_months: int = 36):
+    partitions = asyncio.run(run("detach_partitions", keep_months))
+    typer.echo(f"Detached {len(partitions)} partitions: {', '.join(partitions)}")
+
+
+if __name__ == "__main__":
+    app()
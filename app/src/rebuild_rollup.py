@@ -0,0 +1,36 @@
+import asyncio
+
+import typer
+from core.config import settings
+from db import postgres
+from services.rollup_service import RollupService
+from sqlalchemy.ext.asyncio import (AsyncSession, async_sessionmaker,
+                                    create_async_engine)
+
+app = typer.Typer()
+
+
+async def rebuild_rollup(chunk_size: int, concurrency: int) -> int:
+    engine = create_async_engine(
+        postgres.dsn,
+        echo=settings.engine_echo,
+        future=True,
+        pool_size=concurrency,
+    )
+    async_session = async_sessionmaker(
+        bind=engine, expire_on_commit=False, class_=AsyncSession
+    )  # type: ignore[assignment]
+    try:
+        return await RollupService(async_session).rebuild(chunk_size, concurrency)
+    finally:
+        await engine.dispose()
+
+
+@app.command()
+def rebuild(chunk_size: int = 500, concurrency: int = 4):
+    users = asyncio.run(rebuild_rollup(chunk_size, concurrency))
+    typer.echo(f"Monthly rollup rebuilt for {users} users.")
+
+
+if __name__ == "__main__":
+    app()
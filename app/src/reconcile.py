@@ -0,0 +1,53 @@
+import asyncio
+
+import typer
+from core.config import settings
+from db import postgres
+from schemas.wallet import ReconciliationResultSchema
+from services.reconciliation_service import ReconciliationService
+from sqlalchemy.ext.asyncio import (AsyncSession, async_sessionmaker,
+                                    create_async_engine)
+
+app = typer.Typer()
+
+
+async def reconcile_wallets(
+    chunk_size: int, concurrency: int, repair: bool, keep: int
+) -> ReconciliationResultSchema:
+    engine = create_async_engine(
+        postgres.dsn,
+        echo=settings.engine_echo,
+        future=True,
+        pool_size=concurrency,
+    )
+    async_session = async_sessionmaker(
+        bind=engine, expire_on_commit=False, class_=AsyncSession
+    )  # type: ignore[assignment]
+    try:
+        return await ReconciliationService(async_session).reconcile(
+            chunk_size, concurrency, repair, keep
+        )
+    finally:
+        await engine.dispose()
+
+
+@app.command()
+def reconcile(
+    chunk_size: int = 500, concurrency: int = 4, repair: bool = False, keep: int = 10
+):
+    result = asyncio.run(reconcile_wallets(chunk_size, concurrency, repair, keep))
+    for drift in result.drifts:
+        typer.echo(
+            f"Wallet {drift.wallet_id}: amount {drift.amount}, "
+            f"expected {drift.expected}" + (" (repaired)" if drift.repaired else "")
+        )
+    typer.echo(
+        f"{result.checked} of {result.wallets} wallets checked, "
+        f"{len(result.drifts)} drifted."
+    )
+    if result.drifts and not repair:
+        raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    app()
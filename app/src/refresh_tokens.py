@@ -0,0 +1,31 @@
+import asyncio
+
+import typer
+from core.config import settings
+from db import postgres
+from services.auth_service import AuthService
+from sqlalchemy.ext.asyncio import (AsyncSession, async_sessionmaker,
+                                    create_async_engine)
+
+app = typer.Typer()
+
+
+async def run(method: str, *args):
+    engine = create_async_engine(postgres.dsn, echo=settings.engine_echo, future=True)
+    async_session = async_sessionmaker(
+        bind=engine, expire_on_commit=False, class_=AsyncSession
+    )  # type: ignore[assignment]
+    try:
+        return await getattr(AuthService(async_session, None), method)(*args)
+    finally:
+        await engine.dispose()
+
+
+@app.command()
+def purge(batch_size: int = 1000):
+    purged = asyncio.run(run("purge_expired_refresh_tokens", batch_size))
+    typer.echo(f"Purged {purged} expired refresh tokens")
+
+
+if __name__ == "__main__":
+    app()
@@ -17,3 +17,14 @@ class RefreshInputSchema(BaseAuthSchema):
 class LoginInputSchema(BaseModel):
     login: str
     password: str
+
+
+class PasswordHashingStatsSchema(BaseModel):
+    workers: int
+    max_concurrency: int
+    waiting: int
+    in_flight: int
+    completed: int
+    timeouts: int
+    wait_seconds_total: float
+    max_wait_seconds: float
@@ -0,0 +1,15 @@
+from uuid import UUID
+
+from pydantic import BaseModel
+
+BATCH_MAX_SIZE = 10000
+
+
+class BatchItemResultSchema(BaseModel):
+    index: int
+    id: UUID | None = None
+    error: str | None = None
+
+
+class BatchResultSchema(BaseModel):
+    items: list[BatchItemResultSchema]
@@ -0,0 +1,28 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+from models import CurrencyEnum
+from pydantic import BaseModel, Field
+
+
+class FxRateSchema(BaseModel):
+    currency: CurrencyEnum
+    date: date
+    rate: Decimal = Field(gt=0, max_digits=18, decimal_places=8)
+
+
+class FxRateLoadResultSchema(BaseModel):
+    loaded: int
+
+
+class NetWorthSchema(BaseModel):
+    currency: CurrencyEnum
+    amount: int
+    date: date
+
+
+class TotalSpendSchema(BaseModel):
+    currency: CurrencyEnum
+    amount: int
+    date_from: datetime
+    date_to: datetime
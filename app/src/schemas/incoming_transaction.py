@@ -1,7 +1,8 @@
 from datetime import datetime
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from schemas.batch import BATCH_MAX_SIZE
 from schemas.mixins import IdMixin
 
 
@@ -25,3 +26,9 @@ class GetIncomingTransactionSchema(IdMixin, IncomingTransaction):
 
 class UpdateIncomingTransactionSchema(IncomingTransaction):
     pass
+
+
+class BatchCreateIncomingTransactionSchema(BaseModel):
+    transactions: list[CreateIncomingTransactionSchema] = Field(
+        max_length=BATCH_MAX_SIZE
+    )
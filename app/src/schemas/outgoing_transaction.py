@@ -1,7 +1,8 @@
 from datetime import datetime
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from schemas.batch import BATCH_MAX_SIZE
 from schemas.mixins import IdMixin
 
 
@@ -25,3 +26,9 @@ class GetOutgoingTransactionSchema(IdMixin, OutgoingTransaction):
 
 class UpdateOutgoingTransactionSchema(OutgoingTransaction):
     pass
+
+
+class BatchCreateOutgoingTransactionSchema(BaseModel):
+    transactions: list[CreateOutgoingTransactionSchema] = Field(
+        max_length=BATCH_MAX_SIZE
+    )
@@ -0,0 +1,32 @@
+from datetime import date
+from enum import Enum
+from uuid import UUID
+
+from models import TransactionTypeEnum
+from pydantic import BaseModel
+
+
+class ReportPeriod(str, Enum):
+    day = "day"
+    week = "week"
+    month = "month"
+
+
+class Total(BaseModel):
+    transaction_type: TransactionTypeEnum
+    amount: int
+    count: int
+
+
+class CategoryTotalSchema(Total):
+    category_id: UUID | None
+    category_name: str | None
+
+
+class WalletTotalSchema(Total):
+    wallet_id: UUID | None
+    wallet_name: str | None
+
+
+class PeriodTotalSchema(Total):
+    period_start: date
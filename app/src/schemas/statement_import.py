@@ -0,0 +1,16 @@
+from enum import Enum
+
+from pydantic import BaseModel
+
+
+class StatementFormat(str, Enum):
+    csv = "csv"
+    ofx = "ofx"
+    qif = "qif"
+
+
+class ImportStatementResultSchema(BaseModel):
+    incoming: int
+    outgoing: int
+    skipped: int
+    wallet_amount: int
@@ -0,0 +1,39 @@
+from datetime import datetime, timezone
+from enum import Enum
+from uuid import UUID
+
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+
+class SortOrder(str, Enum):
+    asc = "asc"
+    desc = "desc"
+
+
+class TransactionFilterSchema(BaseModel):
+    date_from: datetime | None = None
+    date_to: datetime | None = None
+    amount_min: int | None = None
+    amount_max: int | None = None
+    category_id: list[UUID] = Field(default_factory=list)
+    wallet_id: list[UUID] = Field(default_factory=list)
+    order: SortOrder = SortOrder.asc
+
+    @field_validator("date_from", "date_to")
+    @classmethod
+    def set_timezone(cls, value: datetime | None):
+        if value is not None and value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value
+
+    @model_validator(mode="after")
+    def check_ranges(self):
+        if self.date_from and self.date_to and self.date_from > self.date_to:
+            raise ValueError("date_from must not be later than date_to")
+        if (
+            self.amount_min is not None
+            and self.amount_max is not None
+            and self.amount_min > self.amount_max
+        ):
+            raise ValueError("amount_min must not be greater than amount_max")
+        return self
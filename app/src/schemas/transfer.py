@@ -0,0 +1,27 @@
+from datetime import datetime
+from uuid import UUID
+
+from pydantic import BaseModel, Field, model_validator
+from schemas.incoming_transaction import GetIncomingTransactionSchema
+from schemas.outgoing_transaction import GetOutgoingTransactionSchema
+
+
+class CreateTransferSchema(BaseModel):
+    amount: int = Field(gt=0)
+    description: str
+    from_wallet_id: UUID
+    to_wallet_id: UUID
+    outgoing_category_id: UUID
+    incoming_category_id: UUID
+    date: datetime | None = None
+
+    @model_validator(mode="after")
+    def check_wallets(self):
+        if self.from_wallet_id == self.to_wallet_id:
+            raise ValueError("from_wallet_id and to_wallet_id must differ")
+        return self
+
+
+class GetTransferSchema(BaseModel):
+    outgoing: GetOutgoingTransactionSchema
+    incoming: GetIncomingTransactionSchema
@@ -1,6 +1,10 @@
+from datetime import date
+from uuid import UUID
+
 from models import CurrencyEnum
 from pydantic import BaseModel
 from schemas.mixins import IdMixin, UserIdMixin
+from schemas.report import ReportPeriod
 
 
 class Wallet(BaseModel):
@@ -21,3 +25,22 @@ class GetWalletSchema(IdMixin, UserIdMixin, Wallet):
 
 class UpdateWalletSchema(Wallet):
     pass
+
+
+class BalancePointSchema(BaseModel):
+    date: date
+    period: ReportPeriod
+    amount: int
+
+
+class WalletDriftSchema(BaseModel):
+    wallet_id: UUID
+    amount: int
+    expected: int
+    repaired: bool = False
+
+
+class ReconciliationResultSchema(BaseModel):
+    wallets: int
+    checked: int
+    drifts: list[WalletDriftSchema]
@@ -1,26 +1,33 @@
+import hashlib
 from datetime import datetime, timedelta
+from uuid import uuid4
 
 import jwt
 from core.config import settings
 from db.postgres import get_postgres_session
-from db.redis import RedisCache, get_redis
+from db.redis import get_redis
 from fastapi.params import Depends
 from models import RefreshToken
 from redis import Redis
 from sqlalchemy import delete, exists, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from utils.auth import AccessTokenPayload
+from utils.auth import AccessTokenPayload, decode_token
+from utils.revocation import revoked_tokens
+
+
+def hash_refresh_token(refresh_token: str) -> bytes:
+    return hashlib.sha256(refresh_token.encode()).digest()
 
 
 class AuthService:
     def __init__(self, postgres_session: AsyncSession, redis: Redis):
         self.postgres_session = postgres_session
-        self.redis = RedisCache(redis)
+        self.redis = redis
 
     async def generate_access_token(self, user_id: str, user_roles: list[str]):
         valid_till = datetime.now() + timedelta(hours=settings.access_token_exp_hours)
         payload = AccessTokenPayload(
-            user_id=user_id, user_roles=user_roles, exp=int(valid_till.timestamp())
+            user_id=user_id, roles=user_roles, exp=int(valid_till.timestamp())
         )
 
         return jwt.encode(
@@ -35,6 +42,8 @@ class AuthService:
         payload = {
             "user_id": user_id,
             "exp": int(valid_till.timestamp()),
+            # Tokens issued to a user within one second must still differ
+            "jti": uuid4().hex,
         }
 
         jwt_token = jwt.encode(
@@ -44,20 +53,20 @@ class AuthService:
         async with self.postgres_session() as session:
             refresh_token = RefreshToken(
                 user_id=user_id,
-                token=jwt_token,
+                token_hash=hash_refresh_token(jwt_token),
                 expires_at=valid_till,
             )
             session.add(refresh_token)
             await session.commit()
 
-            return refresh_token.token
+            return jwt_token
 
     async def is_refresh_token_valid(self, refresh_token: str) -> bool:
         async with self.postgres_session() as session:
-            return await session.execute(
+            return await session.scalar(
                 select(
                     exists(RefreshToken).where(
-                        RefreshToken.token == refresh_token,
+                        RefreshToken.token_hash == hash_refresh_token(refresh_token),
                         RefreshToken.expires_at >= datetime.now(),
                     )
                 )
@@ -66,7 +75,9 @@ class AuthService:
     async def invalidate_refresh_token(self, refresh_token: str):
         async with self.postgres_session() as session:
             await session.execute(
-                delete(RefreshToken).where(RefreshToken.token == refresh_token)
+                delete(RefreshToken).where(
+                    RefreshToken.token_hash == hash_refresh_token(refresh_token)
+                )
             )
             await session.commit()
 
@@ -75,11 +86,41 @@ class AuthService:
             await session.execute(
                 delete(RefreshToken).where(
                     RefreshToken.user_id == user_id,
-                    RefreshToken.token != exclude_token,
+                    RefreshToken.token_hash != hash_refresh_token(exclude_token),
                 )
             )
             await session.commit()
 
+    async def purge_expired_refresh_tokens(self, batch_size: int = 1000) -> int:
+        """
+        Deletes expired refresh tokens, walking the table by primary key
+        `batch_size` rows per transaction so no lock is held for long.
+        Returns the number of deleted tokens.
+        """
+        now = datetime.now()
+        purged = 0
+        last_id = None
+        while True:
+            async with self.postgres_session() as session:
+                stmt = (
+                    select(RefreshToken.id).order_by(RefreshToken.id).limit(batch_size)
+                )
+                if last_id is not None:
+                    stmt = stmt.where(RefreshToken.id > last_id)
+                ids = (await session.scalars(stmt)).all()
+                if not ids:
+                    return purged
+
+                result = await session.execute(
+                    delete(RefreshToken).where(
+                        RefreshToken.id.in_(ids), RefreshToken.expires_at < now
+                    )
+                )
+                await session.commit()
+
+            purged += result.rowcount
+            last_id = ids[-1]
+
     async def update_refresh_token(
         self,
         user_id: str,
@@ -93,13 +134,15 @@ class AuthService:
         return refresh_token_new, access_token
 
     async def invalidate_access_token(self, token: str) -> None:
-        await self.redis.put_to_cache(
-            key=token, value=True, ttl=settings.access_token_exp_hours * 3600
-        )
+        payload = decode_token(token)
+        if payload and "jti" in payload:
+            await revoked_tokens.revoke(self.redis, payload["jti"], payload["exp"])
 
     async def is_access_token_valid(self, token: str) -> bool:
-        invalid_token = await self.redis.get_from_cache(key=token)
-        return False if invalid_token else True
+        payload = decode_token(token)
+        if not payload or "jti" not in payload:
+            return False
+        return not await revoked_tokens.is_revoked(self.redis, payload["jti"])
 
 
 def get_auth_service(
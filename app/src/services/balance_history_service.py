@@ -0,0 +1,156 @@
+from datetime import date, datetime, timedelta, timezone
+
+from core.config import settings
+from db.postgres import get_postgres_session
+from db.redis import RedisCache, get_redis
+from fastapi import Depends
+from models import LedgerEntry, Wallet
+from redis import Redis
+from schemas.report import ReportPeriod
+from schemas.wallet import BalancePointSchema
+from services.wallet_service import wallet_balance
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from utils.dates import next_month
+
+
+def balance_history_key(wallet_id) -> str:
+    return f"wallet_balance_history:{wallet_id}"
+
+
+async def invalidate_balance_history(redis: Redis, wallet_ids) -> None:
+    """Drops cached balance history of the wallets after their transactions change."""
+    keys = [balance_history_key(wallet_id) for wallet_id in wallet_ids if wallet_id]
+    if keys:
+        await redis.delete(*keys)
+
+
+def bucket_starts(first: date, today: date) -> list[tuple[date, ReportPeriod]]:
+    """
+    All bucket starts from `first` up to `today`: days for the
+    last BALANCE_HISTORY_DAILY_DAYS days, weeks up to a year back, months before.
+    """
+    daily_start, weekly_start = bucket_boundaries(today)
+    buckets = []
+
+    month = first.replace(day=1)
+    while month < weekly_start:
+        buckets.append((month, ReportPeriod.month))
+        month = next_month(month)
+
+    week = weekly_start
+    while week < daily_start:
+        buckets.append((week, ReportPeriod.week))
+        week += timedelta(weeks=1)
+
+    day = daily_start
+    while day <= today:
+        buckets.append((day, ReportPeriod.day))
+        day += timedelta(days=1)
+
+    return [bucket for bucket in buckets if bucket[0] >= first]
+
+
+def bucket_boundaries(today: date) -> tuple[date, date]:
+    daily_start = today - timedelta(days=settings.balance_history_daily_days - 1)
+    weekly_start = today - timedelta(days=settings.balance_history_weekly_days)
+    weekly_start -= timedelta(days=weekly_start.weekday())
+    return daily_start, min(weekly_start, daily_start)
+
+
+class BalanceHistoryService:
+    def __init__(self, postgres_session: AsyncSession, redis: Redis):
+        self.postgres_session = postgres_session
+        self.redis = redis
+        self.cache = RedisCache(redis)
+
+    async def get_balance_history(self, wallet: Wallet) -> list[BalancePointSchema]:
+        """
+        Balance of the wallet at the end of each day, week or month.
+
+        Cached per wallet until a transaction of the wallet changes, the wallet
+        amount is edited or the day is over.
+        """
+        today = datetime.now(timezone.utc).date()
+        key = balance_history_key(wallet.id)
+
+        cached = await self.cache.get_from_cache(key)
+        if (
+            cached
+            and cached["date"] == today.isoformat()
+            and cached["amount"] == wallet.amount
+        ):
+            return [BalancePointSchema(**point) for point in cached["points"]]
+
+        points = await self._compute(wallet.id, today)
+        await self.cache.put_to_cache(
+            key,
+            {
+                "date": today.isoformat(),
+                "amount": wallet.amount,
+                "points": [point.model_dump(mode="json") for point in points],
+            },
+            settings.balance_history_cache_ttl,
+        )
+        return points
+
+    async def _compute(self, wallet_id, today: date) -> list[BalancePointSchema]:
+        daily_start, weekly_start = bucket_boundaries(today)
+
+        # Index only scan of (wallet_id, date, id) INCLUDE (signed_amount)
+        transactions = (
+            select(
+                LedgerEntry.date,
+                LedgerEntry.signed_amount.label("amount"),
+            )
+            .where(LedgerEntry.wallet_id == wallet_id)
+            .subquery()
+        )
+
+        day = func.timezone("UTC", transactions.c.date)
+        bucketed = select(
+            case(
+                (day >= daily_start, func.date_trunc("day", day)),
+                (day >= weekly_start, func.date_trunc("week", day)),
+                else_=func.date_trunc("month", day),
+            ).label("bucket"),
+            transactions.c.amount,
+        ).subquery()
+
+        net = (
+            select(bucketed.c.bucket, func.sum(bucketed.c.amount).label("net"))
+            .group_by(bucketed.c.bucket)
+            .subquery()
+        )
+
+        # Balance at the end of a bucket is the current balance minus
+        # everything that happened in later buckets
+        current = select(wallet_balance()).filter_by(id=wallet_id).scalar_subquery()
+        later = func.sum(net.c.net).over(order_by=net.c.bucket.desc(), rows=(None, -1))
+        async with self.postgres_session() as session:
+            result = await session.execute(
+                select(net.c.bucket, current - func.coalesce(later, 0)).order_by(
+                    net.c.bucket
+                )
+            )
+            rows = result.all()
+
+        if not rows:
+            return []
+
+        balances = {bucket.date(): amount for bucket, amount in rows}
+        first = rows[0][0].date()
+        balance = rows[0][1]
+
+        points = []
+        for start, period in bucket_starts(first, today):
+            balance = balances.get(start, balance)
+            points.append(BalancePointSchema(date=start, period=period, amount=balance))
+        return points
+
+
+def get_balance_history_service(
+    postgres_session: AsyncSession = Depends(get_postgres_session),
+    redis: Redis = Depends(get_redis),
+) -> BalanceHistoryService:
+    return BalanceHistoryService(postgres_session, redis)
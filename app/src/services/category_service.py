@@ -2,11 +2,12 @@ from abc import ABC, abstractmethod
 
 from db.postgres import get_postgres_session
 from fastapi import Depends
-from models import IncomingCategory, OutgoingCategory
+from models import IncomingCategory, OutgoingCategory, TransactionTypeEnum
 from schemas.incoming_category import CreateIncomingCategorySchema
 from schemas.outgoing_category import CreateOutgoingCategorySchema
 from services.exceptions import (ConflictError, ObjectAlreadyExistsException,
                                  ObjectNotFoundError)
+from services.rollup_service import detach_category_rollup
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -104,6 +105,10 @@ class OutgoingCategoryService(AbstractCategoryService):
                 raise ObjectNotFoundError("Category not found")
 
             await session.delete(category)
+            await session.flush()
+            await detach_category_rollup(
+                session, TransactionTypeEnum.outgoing, category.id
+            )
             await session.commit()
 
 
@@ -177,6 +182,10 @@ class IncomingCategoryService(AbstractCategoryService):
                 raise ObjectNotFoundError("Category not found")
 
             await session.delete(category)
+            await session.flush()
+            await detach_category_rollup(
+                session, TransactionTypeEnum.incoming, category.id
+            )
             await session.commit()
 
 
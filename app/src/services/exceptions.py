@@ -8,3 +8,11 @@ class ObjectNotFoundError(Exception):
 
 class ConflictError(Exception):
     pass
+
+
+class StatementFormatError(Exception):
+    pass
+
+
+class ServiceBusyError(Exception):
+    pass
@@ -0,0 +1,119 @@
+import csv
+import io
+import zlib
+from typing import AsyncIterator
+from uuid import UUID
+
+import orjson
+from core.config import settings
+from db.postgres import get_postgres_session
+from fastapi import Depends
+from models import LedgerEntry, TransactionTypeEnum
+from schemas.export import ExportFormat
+from sqlalchemy import Text, cast, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+EXPORT_COLUMNS = [
+    "id",
+    "type",
+    "amount",
+    "description",
+    "date",
+    "category_id",
+    "wallet_id",
+]
+
+
+def serialize_ndjson(rows: list) -> bytes:
+    return b"".join(
+        orjson.dumps(dict(zip(EXPORT_COLUMNS, row)), default=str) + b"\n"
+        for row in rows
+    )
+
+
+def serialize_csv(rows: list) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(
+            [
+                value.isoformat() if hasattr(value, "isoformat") else value
+                for value in row
+            ]
+        )
+    return buffer.getvalue().encode()
+
+
+class TransactionExportService:
+    def __init__(self, postgres_session: AsyncSession):
+        self.postgres_session = postgres_session
+
+    async def export_user_transactions(
+        self,
+        user_id: UUID,
+        export_format: ExportFormat,
+        transaction_type: TransactionTypeEnum | None = None,
+        compress: bool = False,
+    ) -> AsyncIterator[bytes]:
+        """
+        Yields the user's transactions serialized in `export_format`.
+
+        Rows are read through a server-side cursor and serialized in chunks of
+        `EXPORT_CHUNK_SIZE`, so memory does not depend on the number of rows
+        and the first bytes are sent as soon as the first chunk is fetched.
+        """
+        chunks = self._serialize(user_id, export_format, transaction_type)
+        if not compress:
+            async for chunk in chunks:
+                yield chunk
+            return
+
+        # wbits=31 writes a gzip header, sync flush sends each chunk right away
+        compressor = zlib.compressobj(wbits=31)
+        async for chunk in chunks:
+            yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield compressor.flush()
+
+    async def _serialize(
+        self,
+        user_id: UUID,
+        export_format: ExportFormat,
+        transaction_type: TransactionTypeEnum | None,
+    ) -> AsyncIterator[bytes]:
+        if export_format == ExportFormat.csv:
+            serialize = serialize_csv
+            yield serialize([EXPORT_COLUMNS])
+        else:
+            serialize = serialize_ndjson
+
+        # Category columns are mapped on the direction subclasses only
+        columns = LedgerEntry.__table__.c
+        stmt = (
+            select(
+                LedgerEntry.id,
+                cast(LedgerEntry.direction, Text),
+                LedgerEntry.amount,
+                LedgerEntry.description,
+                LedgerEntry.date,
+                func.coalesce(
+                    columns.incoming_category_id, columns.outgoing_category_id
+                ),
+                LedgerEntry.wallet_id,
+            )
+            .filter_by(user_id=user_id)
+            .order_by(LedgerEntry.date, LedgerEntry.id)
+            .execution_options(yield_per=settings.export_chunk_size)
+        )
+        if transaction_type:
+            stmt = stmt.filter_by(direction=transaction_type)
+
+        async with self.postgres_session() as session:
+            result = await session.stream(stmt)
+            async for rows in result.partitions():
+                yield serialize(rows)
+
+
+def get_transaction_export_service(
+    postgres_session: AsyncSession = Depends(get_postgres_session),
+) -> TransactionExportService:
+    return TransactionExportService(postgres_session)
@@ -0,0 +1,199 @@
+import time
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from itertools import groupby
+from operator import itemgetter
+from uuid import UUID
+
+from core.config import settings
+from db.postgres import get_postgres_session
+from fastapi import Depends
+from models import (CurrencyEnum, ExchangeRate, LedgerEntry,
+                    TransactionTypeEnum, Wallet)
+from schemas.fx_rate import FxRateSchema, NetWorthSchema, TotalSpendSchema
+from services.exceptions import ConflictError
+from services.wallet_service import wallet_balance
+from sqlalchemy import BigInteger, Date, cast, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Rate of the base currency on any date
+BASE_RATE = [(date.min, Decimal(1))]
+
+
+class FxRateCache:
+    """
+    All rates in memory as {currency: [(date, rate), ...]} sorted by date.
+
+    Reloaded after FX_RATE_CACHE_TTL seconds, or right away in the process
+    that loaded new rates.
+    """
+
+    def __init__(self):
+        self.rates: dict | None = None
+        self.expires_at = 0.0
+
+    async def get(self, session: AsyncSession) -> dict:
+        if self.rates is None or time.monotonic() >= self.expires_at:
+            result = await session.execute(
+                select(
+                    ExchangeRate.currency, ExchangeRate.date, ExchangeRate.rate
+                ).order_by(ExchangeRate.currency, ExchangeRate.date)
+            )
+            self.rates = {
+                currency: [(day, rate) for _, day, rate in rows]
+                for currency, rows in groupby(result.all(), key=itemgetter(0))
+            }
+            self.expires_at = time.monotonic() + settings.fx_rate_cache_ttl
+        return self.rates
+
+    def invalidate(self) -> None:
+        self.rates = None
+
+
+fx_rate_cache = FxRateCache()
+
+
+def rates_on(series: list, days: list, currency: CurrencyEnum):
+    """
+    Rates of `series` in effect on each of the sorted `days`, found in one
+    pass over both lists.
+    """
+    index = -1
+    for day in days:
+        while index + 1 < len(series) and series[index + 1][0] <= day:
+            index += 1
+        if index < 0:
+            raise ConflictError(f"No {currency.value} rate on {day}")
+        yield series[index][1]
+
+
+def convert(groups: dict, rates: dict, target: CurrencyEnum) -> int:
+    """
+    Total of `groups` ({currency: [(day, amount), ...]} sorted by day) in the
+    `target` currency.
+
+    Amounts of a currency are summed per run of days with the same rate pair,
+    so there is one multiplication per rate change instead of one per row.
+    """
+    base = CurrencyEnum(settings.fx_base_currency)
+
+    def series(currency):
+        return BASE_RATE if currency == base else rates.get(currency, [])
+
+    total = Decimal(0)
+    for currency, rows in groups.items():
+        days = [day for day, _ in rows]
+        amounts = [amount for _, amount in rows]
+        if currency == target:
+            total += sum(amounts)
+            continue
+
+        pairs = zip(
+            rates_on(series(currency), days, currency),
+            rates_on(series(target), days, target),
+        )
+        for (source, destination), run in groupby(
+            zip(pairs, amounts), key=itemgetter(0)
+        ):
+            total += sum(amount for _, amount in run) * source / destination
+    return int(total.quantize(Decimal(1)))
+
+
+class FxService:
+    def __init__(self, postgres_session: AsyncSession):
+        self.postgres_session = postgres_session
+
+    async def load_rates(self, rates: list[FxRateSchema]) -> int:
+        """Inserts the rates, replacing the ones of the same currency and date."""
+        if not rates:
+            return 0
+
+        # The last rate of a currency and date wins within one load
+        rows = {(rate.currency, rate.date): rate.rate for rate in rates}
+        stmt = pg_insert(ExchangeRate).values(
+            [
+                {"currency": currency, "date": day, "rate": rate}
+                for (currency, day), rate in rows.items()
+            ]
+        )
+        async with self.postgres_session() as session:
+            await session.execute(
+                stmt.on_conflict_do_update(
+                    constraint="uq_exchangerate_currency_date",
+                    set_={"rate": stmt.excluded.rate, "updated_at": func.now()},
+                )
+            )
+            await session.commit()
+
+        fx_rate_cache.invalidate()
+        return len(rows)
+
+    async def get_net_worth(
+        self, user_id: UUID, currency: CurrencyEnum
+    ) -> NetWorthSchema:
+        """Sum of the wallet balances of the user at today's rates."""
+        today = datetime.now(timezone.utc).date()
+        async with self.postgres_session() as session:
+            result = await session.execute(
+                select(Wallet.currency, cast(func.sum(wallet_balance()), BigInteger))
+                .filter_by(user_id=user_id)
+                .group_by(Wallet.currency)
+            )
+            groups = {
+                wallet_currency: [(today, amount)] for wallet_currency, amount in result
+            }
+            rates = await fx_rate_cache.get(session)
+
+        return NetWorthSchema(
+            currency=currency, amount=convert(groups, rates, currency), date=today
+        )
+
+    async def get_total_spend(
+        self,
+        user_id: UUID,
+        date_from: datetime,
+        date_to: datetime,
+        currency: CurrencyEnum,
+    ) -> TotalSpendSchema:
+        """
+        Outgoing transactions of the user in [date_from, date_to), each
+        converted at the rate of its UTC day.
+        """
+        day = cast(func.timezone("UTC", LedgerEntry.date), Date)
+        async with self.postgres_session() as session:
+            # Transactions are summed per wallet currency and day in the database
+            result = await session.execute(
+                select(
+                    Wallet.currency,
+                    day,
+                    cast(func.sum(LedgerEntry.amount), BigInteger),
+                )
+                .join(Wallet, Wallet.id == LedgerEntry.wallet_id)
+                .where(
+                    LedgerEntry.user_id == user_id,
+                    LedgerEntry.direction == TransactionTypeEnum.outgoing,
+                    LedgerEntry.date >= date_from,
+                    LedgerEntry.date < date_to,
+                )
+                .group_by(Wallet.currency, day)
+                .order_by(Wallet.currency, day)
+            )
+            groups = {
+                wallet_currency: [(row_day, amount) for _, row_day, amount in rows]
+                for wallet_currency, rows in groupby(result.all(), key=itemgetter(0))
+            }
+            rates = await fx_rate_cache.get(session)
+
+        return TotalSpendSchema(
+            currency=currency,
+            amount=convert(groups, rates, currency),
+            date_from=date_from,
+            date_to=date_to,
+        )
+
+
+def get_fx_service(
+    postgres_session: AsyncSession = Depends(get_postgres_session),
+) -> FxService:
+    return FxService(postgres_session)
@@ -0,0 +1,154 @@
+import asyncio
+from collections import defaultdict
+from dataclasses import dataclass
+
+from models import LedgerEntry
+from redis.asyncio import Redis
+from services.balance_history_service import invalidate_balance_history
+from services.reconciliation_service import (add_checkpoint_date,
+                                             invalidate_checkpoints)
+from services.rollup_service import (add_rollup_delta, apply_rollup_deltas,
+                                     rollup_key)
+from services.wallet_service import apply_wallet_deltas
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+group_committer: "GroupCommitter | None" = None
+
+
+async def get_group_committer() -> "GroupCommitter | None":
+    return group_committer
+
+
+@dataclass
+class PendingTransaction:
+    service: object
+    transaction: LedgerEntry
+    future: asyncio.Future
+
+
+async def insert_transactions(session: AsyncSession, pending: list) -> dict:
+    """
+    Stores the pending transactions with one multi-row INSERT per direction,
+    one aggregated balance update per wallet and one rollup upsert per
+    direction. Must run in a transaction, returns the wallet deltas.
+    """
+    rows = defaultdict(list)
+    deltas = defaultdict(int)
+    dates = {}
+    rollup = defaultdict(dict)
+
+    for item in pending:
+        service, transaction = type(item.service), item.transaction
+        rows[service].append(
+            {
+                "id": transaction.id,
+                "amount": transaction.amount,
+                "description": transaction.description,
+                "category_id": transaction.category_id,
+                "wallet_id": transaction.wallet_id,
+                "user_id": transaction.user_id,
+                "date": transaction.date,
+            }
+        )
+        deltas[transaction.wallet_id] += service.sign * transaction.amount
+        add_checkpoint_date(dates, transaction.wallet_id, transaction.date)
+        add_rollup_delta(rollup[service], rollup_key(transaction), transaction.amount)
+
+    for service, items in rows.items():
+        await session.execute(insert(service.model), items)
+    await apply_wallet_deltas(session, deltas)
+    await invalidate_checkpoints(session, dates)
+    for service, items in rollup.items():
+        await apply_rollup_deltas(session, service.transaction_type, items)
+    return deltas
+
+
+class GroupCommitter:
+    """
+    Collects concurrent transaction creates for `window_ms` milliseconds and
+    stores them in a single commit.
+
+    A batch is flushed when the window ends or `max_batch` transactions are
+    waiting. If the batch fails as a whole, its transactions are retried one
+    by one, so every caller gets its own result or error.
+    """
+
+    def __init__(
+        self,
+        postgres_session: AsyncSession,
+        redis: Redis,
+        window_ms: int,
+        max_batch: int,
+    ):
+        self.postgres_session = postgres_session
+        self.redis = redis
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.pending: list[PendingTransaction] = []
+        self.timer: asyncio.TimerHandle | None = None
+        self.flushes: set[asyncio.Task] = set()
+
+    async def submit(self, service, transaction: LedgerEntry) -> LedgerEntry:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append(PendingTransaction(service, transaction, future))
+
+        if len(self.pending) >= self.max_batch:
+            self.flush()
+        elif self.timer is None:
+            self.timer = loop.call_later(self.window, self.flush)
+        return await future
+
+    def flush(self) -> None:
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+        batch, self.pending = self.pending, []
+        if batch:
+            task = asyncio.create_task(self._commit(batch))
+            self.flushes.add(task)
+            task.add_done_callback(self.flushes.discard)
+
+    async def close(self) -> None:
+        """Flushes the waiting transactions and waits for running commits."""
+        self.flush()
+        await asyncio.gather(*self.flushes, return_exceptions=True)
+
+    async def _commit(self, batch: list[PendingTransaction]) -> None:
+        try:
+            async with self.postgres_session() as session:
+                async with session.begin():
+                    deltas = await insert_transactions(session, batch)
+        except Exception:
+            await asyncio.gather(*(self._commit_one(item) for item in batch))
+            return
+
+        try:
+            await invalidate_balance_history(self.redis, deltas)
+        except Exception as error:
+            for item in batch:
+                resolve(item.future, error=error)
+            return
+
+        for item in batch:
+            resolve(item.future, item.transaction)
+
+    async def _commit_one(self, item: PendingTransaction) -> None:
+        try:
+            result = await item.service.write_transaction(item.transaction)
+        except Exception as error:
+            resolve(item.future, error=error)
+        else:
+            resolve(item.future, result)
+
+
+def resolve(future: asyncio.Future, result=None, error: Exception | None = None):
+    # The caller may have been cancelled while its transaction was written
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
@@ -0,0 +1,164 @@
+from datetime import datetime, timezone
+from typing import AsyncIterator
+from uuid import UUID, uuid4
+
+from core.config import settings
+from db.postgres import get_postgres_session
+from db.redis import get_redis
+from fastapi import Depends
+from models import (IncomingCategory, LedgerEntry, OutgoingCategory,
+                    TransactionTypeEnum)
+from redis import Redis
+from schemas.statement_import import (ImportStatementResultSchema,
+                                      StatementFormat)
+from services.balance_history_service import invalidate_balance_history
+from services.exceptions import ObjectNotFoundError, StatementFormatError
+from services.reconciliation_service import invalidate_checkpoints
+from services.rollup_service import (add_rollup_delta, apply_rollup_deltas,
+                                     month_of)
+from services.statement_parsers import PARSERS
+from services.wallet_service import apply_wallet_delta
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+COPY_COLUMNS = [
+    "id",
+    "direction",
+    "amount",
+    "description",
+    "date",
+    "incoming_category_id",
+    "outgoing_category_id",
+    "wallet_id",
+    "user_id",
+]
+
+
+class StatementImportService:
+    def __init__(self, postgres_session: AsyncSession, redis: Redis):
+        self.postgres_session = postgres_session
+        self.redis = redis
+
+    async def import_statement(
+        self,
+        lines: AsyncIterator[str],
+        statement_format: StatementFormat,
+        wallet_id: UUID,
+        user_id: UUID,
+        incoming_category_id: UUID,
+        outgoing_category_id: UUID,
+    ) -> ImportStatementResultSchema:
+        """
+        Streams a bank statement into the ledger table.
+
+        Positive amounts become incoming transactions, negative ones outgoing.
+        Records are parsed lazily and written with COPY in chunks of
+        `IMPORT_CHUNK_SIZE`, so memory does not depend on the file size. The
+        whole import, including the wallet balance change, is one transaction.
+        """
+        parse = PARSERS[statement_format.value]
+        now = datetime.now(timezone.utc)
+        records = []
+        rollups = {transaction_type: {} for transaction_type in TransactionTypeEnum}
+        result = ImportStatementResultSchema(
+            incoming=0, outgoing=0, skipped=0, wallet_amount=0
+        )
+        delta = 0
+        earliest = None
+
+        async with self.postgres_session() as session:
+            async with session.begin():
+                await self._check_categories(
+                    session, incoming_category_id, outgoing_category_id
+                )
+                connection = await session.connection()
+                raw_connection = await connection.get_raw_connection()
+                driver_connection = raw_connection.driver_connection
+
+                async for record in parse(lines, settings.import_amount_scale):
+                    if record.date > now:
+                        raise StatementFormatError(
+                            f"Date cannot be in the future: {record.date}"
+                        )
+
+                    if record.amount > 0:
+                        transaction_type = TransactionTypeEnum.incoming
+                        category_id = incoming_category_id
+                        categories = (category_id, None)
+                        result.incoming += 1
+                    elif record.amount < 0:
+                        transaction_type = TransactionTypeEnum.outgoing
+                        category_id = outgoing_category_id
+                        categories = (None, category_id)
+                        result.outgoing += 1
+                    else:
+                        result.skipped += 1
+                        continue
+
+                    records.append(
+                        (
+                            uuid4(),
+                            transaction_type.value,
+                            abs(record.amount),
+                            record.description,
+                            record.date,
+                            *categories,
+                            wallet_id,
+                            user_id,
+                        )
+                    )
+                    delta += record.amount
+                    earliest = min(earliest or record.date, record.date)
+                    add_rollup_delta(
+                        rollups[transaction_type],
+                        (user_id, wallet_id, category_id, month_of(record.date)),
+                        abs(record.amount),
+                    )
+
+                    if len(records) >= settings.import_chunk_size:
+                        await self._copy(driver_connection, records)
+
+                await self._copy(driver_connection, records)
+
+                result.wallet_amount = await apply_wallet_delta(
+                    session, wallet_id, delta
+                )
+                if earliest:
+                    await invalidate_checkpoints(session, {wallet_id: earliest})
+                for transaction_type, rollup in rollups.items():
+                    await apply_rollup_deltas(session, transaction_type, rollup)
+
+        await invalidate_balance_history(self.redis, [wallet_id])
+        return result
+
+    async def _copy(self, driver_connection, records: list):
+        if records:
+            await driver_connection.copy_records_to_table(
+                LedgerEntry.__tablename__, records=records, columns=COPY_COLUMNS
+            )
+            records.clear()
+
+    async def _check_categories(
+        self,
+        session: AsyncSession,
+        incoming_category_id: UUID,
+        outgoing_category_id: UUID,
+    ):
+        incoming = await session.scalar(
+            select(IncomingCategory.id).filter_by(id=incoming_category_id)
+        )
+        if incoming is None:
+            raise ObjectNotFoundError("Incoming category not found!")
+
+        outgoing = await session.scalar(
+            select(OutgoingCategory.id).filter_by(id=outgoing_category_id)
+        )
+        if outgoing is None:
+            raise ObjectNotFoundError("Outgoing category not found!")
+
+
+def get_statement_import_service(
+    postgres_session: AsyncSession = Depends(get_postgres_session),
+    redis: Redis = Depends(get_redis),
+) -> StatementImportService:
+    return StatementImportService(postgres_session, redis)
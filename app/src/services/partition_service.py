@@ -0,0 +1,354 @@
+import asyncio
+import re
+from datetime import date, datetime, timezone
+from uuid import UUID
+
+from core.config import settings
+from models import LedgerEntry, default_partition_name
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from utils.dates import add_months, current_month, next_month
+
+PARTITIONED_MODELS = (LedgerEntry,)
+
+
+def partition_name(table_name: str, month: date) -> str:
+    return f"{table_name}_p{month:%Y_%m}"
+
+
+def month_bound(month: date) -> str:
+    return f"{month.isoformat()} 00:00:00+00"
+
+
+class PartitionService:
+    """
+    Maintains monthly range partitions of the ledger table.
+
+    Rows without a monthly partition land in the DEFAULT partition, which
+    also holds the history of tables converted by the partitioning migration.
+    Partition changes run with PARTITION_LOCK_TIMEOUT, so they give up instead
+    of queueing behind long queries.
+    """
+
+    def __init__(self, postgres_session: AsyncSession):
+        self.postgres_session = postgres_session
+
+    async def get_partitions(self, table_name: str) -> dict[date, str]:
+        async with self.postgres_session() as session:
+            return await self._partitions(session, table_name)
+
+    async def create_partition(
+        self,
+        model,
+        month: date,
+        batch_size: int | None = None,
+        pause: float = 0,
+    ) -> bool:
+        """
+        Attaches the partition for `month`, moving its rows out of the DEFAULT
+        partition. Returns False if it already exists.
+
+        The new table is built detached, with the indexes of the parent. Rows
+        of the month are copied into it from DEFAULT in batches of
+        `batch_size`, each in its own transaction, while DEFAULT keeps serving
+        them. The last transaction takes an ACCESS EXCLUSIVE lock on DEFAULT,
+        so queries of the parent that touch DEFAULT wait for it: it copies the
+        rows changed since, deletes the month from DEFAULT and attaches the
+        table. ATTACH scans the whole DEFAULT partition under that lock unless
+        a CHECK constraint on DEFAULT already excludes the month. Such a fence
+        is validated beforehand, without blocking, for months after the
+        current one, which cannot have rows yet.
+        """
+        if batch_size is None:
+            batch_size = settings.partition_batch_size
+
+        table = model.__table__.name
+        name = partition_name(table, month)
+        default = default_partition_name(table)
+        start, end = month_bound(month), month_bound(next_month(month))
+        in_month = f"date >= '{start}' AND date < '{end}'"
+        columns = [
+            column.name for column in model.__table__.columns if column.computed is None
+        ]
+
+        async with self.postgres_session() as lock_session:
+            # Serializes maintenance of one table between concurrent runs, the
+            # lock is held until all transactions below are done
+            await lock_session.execute(
+                text("SELECT pg_advisory_xact_lock(hashtext(:table))"),
+                {"table": table},
+            )
+            if month in await self._partitions(lock_session, table):
+                return False
+            has_default = bool(
+                await lock_session.scalar(text(f"SELECT to_regclass('{default}')"))
+            )
+
+            async with self.postgres_session() as session:
+                await self._create_detached(session, table, name, in_month)
+
+            copied = 0
+            if has_default:
+                copied = await self._copy_rows(
+                    name, default, in_month, columns, batch_size, pause
+                )
+            fenced = (
+                has_default
+                and not copied
+                and month > current_month()
+                and await self._fence_default(default, name, in_month)
+            )
+
+            async with self.postgres_session() as session:
+                await session.execute(
+                    text(f"SET LOCAL lock_timeout = {settings.partition_lock_timeout}")
+                )
+                if has_default and not fenced:
+                    await session.execute(
+                        text(f"LOCK TABLE {default} IN ACCESS EXCLUSIVE MODE")
+                    )
+                    await self._sync_rows(session, name, default, in_month, columns)
+                    await session.execute(
+                        text(f"DELETE FROM {default} WHERE {in_month}")
+                    )
+                await session.execute(
+                    text(
+                        f"ALTER TABLE {table} ATTACH PARTITION {name} "
+                        f"FOR VALUES FROM ('{start}') TO ('{end}')"
+                    )
+                )
+                await session.execute(
+                    text(f"ALTER TABLE {name} DROP CONSTRAINT {name}_range")
+                )
+                if fenced:
+                    await session.execute(
+                        text(f"ALTER TABLE {default} DROP CONSTRAINT {name}_fence")
+                    )
+                await session.commit()
+        return True
+
+    async def create_future_partitions(
+        self, months_ahead: int | None = None
+    ) -> list[str]:
+        """Creates missing partitions from the current month `months_ahead` months on."""
+        if months_ahead is None:
+            months_ahead = settings.partition_months_ahead
+
+        created = []
+        for model in PARTITIONED_MODELS:
+            for offset in range(months_ahead + 1):
+                month = add_months(current_month(), offset)
+                if await self.create_partition(model, month):
+                    created.append(partition_name(model.__table__.name, month))
+        return created
+
+    async def migrate_default_partition(
+        self,
+        limit: int | None = None,
+        pause: float = 0,
+        batch_size: int | None = None,
+    ) -> list[str]:
+        """
+        Moves rows of the DEFAULT partition into monthly partitions.
+
+        Months are processed newest first, each is copied in batches of
+        `batch_size` rows and attached by `create_partition`, so the tool can
+        be stopped and resumed at any point. `pause` seconds between batches
+        leave room for the regular load. Attaching a month still locks DEFAULT
+        for the time it takes to delete the month from it and to scan the rest.
+        """
+        created = []
+        for model in PARTITIONED_MODELS:
+            default = default_partition_name(model.__table__.name)
+            async with self.postgres_session() as session:
+                result = await session.execute(
+                    text(
+                        f"SELECT DISTINCT date_trunc('month', timezone('UTC', date))::date "
+                        f"FROM {default} ORDER BY 1 DESC"
+                    )
+                )
+                months = result.scalars().all()
+
+            for month in months:
+                if limit is not None and len(created) >= limit:
+                    return created
+                if await self.create_partition(model, month, batch_size, pause):
+                    created.append(partition_name(model.__table__.name, month))
+                await asyncio.sleep(pause)
+        return created
+
+    async def detach_partitions(self, keep_months: int) -> list[str]:
+        """
+        Detaches partitions older than `keep_months` months for archival.
+
+        Detached partitions stay in the database as standalone tables to be
+        dumped and dropped. DETACH CONCURRENTLY is not available while a
+        DEFAULT partition exists, the lock timeout keeps the detach from
+        queueing behind long queries instead.
+        """
+        cutoff = add_months(current_month(), -keep_months)
+        detached = []
+        for model in PARTITIONED_MODELS:
+            table = model.__table__.name
+            for month, name in sorted((await self.get_partitions(table)).items()):
+                if month >= cutoff:
+                    break
+                async with self.postgres_session() as session:
+                    await session.execute(
+                        text(
+                            f"SET LOCAL lock_timeout = {settings.partition_lock_timeout}"
+                        )
+                    )
+                    await session.execute(
+                        text(f"ALTER TABLE {table} DETACH PARTITION {name}")
+                    )
+                    await session.commit()
+                detached.append(name)
+        return detached
+
+    async def _create_detached(self, session, table: str, name: str, in_month: str):
+        await session.execute(
+            text(f"SET LOCAL lock_timeout = {settings.partition_lock_timeout}")
+        )
+        # A detached table that still has the range constraint is left over
+        # from an interrupted run, archived partitions lost it on attach
+        if await session.scalar(
+            text(
+                "SELECT 1 FROM pg_constraint "
+                "WHERE conrelid = to_regclass(:name) AND conname = :constraint"
+            ),
+            {"name": name, "constraint": f"{name}_range"},
+        ):
+            await session.execute(text(f"DROP TABLE {name}"))
+        # Partitions must carry the CHECK constraints of the parent, indexes
+        # built now are adopted by ATTACH instead of being built under its lock
+        await session.execute(
+            text(
+                f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS "
+                f"INCLUDING GENERATED INCLUDING CONSTRAINTS INCLUDING INDEXES)"
+            )
+        )
+        # Lets ATTACH PARTITION skip the validation scan of the new table
+        await session.execute(
+            text(f"ALTER TABLE {name} ADD CONSTRAINT {name}_range CHECK ({in_month})")
+        )
+        await session.commit()
+
+    async def _copy_rows(
+        self,
+        name: str,
+        default: str,
+        in_month: str,
+        columns: list[str],
+        batch_size: int,
+        pause: float,
+    ) -> int:
+        """
+        Copies rows of the month from DEFAULT into the detached table `name`,
+        walking the primary key of DEFAULT. Returns the number of rows copied.
+        """
+        column_list = ", ".join(columns)
+        stmt = text(
+            f"WITH batch AS (SELECT {column_list} FROM {default} "
+            f"WHERE {in_month} AND (id, date) > (:id, :date) "
+            f"ORDER BY id, date LIMIT :limit), "
+            f"copied AS (INSERT INTO {name} ({column_list}) "
+            f"SELECT {column_list} FROM batch) "
+            f"SELECT id, date, count(*) OVER () FROM batch "
+            f"ORDER BY id DESC, date DESC LIMIT 1"
+        )
+        key = {"id": UUID(int=0), "date": datetime.min.replace(tzinfo=timezone.utc)}
+        copied = 0
+        while True:
+            async with self.postgres_session() as session:
+                last = (
+                    await session.execute(stmt, {**key, "limit": batch_size})
+                ).first()
+                await session.commit()
+            if last is None:
+                return copied
+
+            key = {"id": last[0], "date": last[1]}
+            copied += last[2]
+            if last[2] < batch_size:
+                return copied
+            await asyncio.sleep(pause)
+
+    async def _fence_default(self, default: str, name: str, in_month: str) -> bool:
+        """
+        Adds a validated CHECK constraint excluding the month to DEFAULT, so
+        ATTACH does not have to scan it. The constraint is added NOT VALID and
+        validated separately, which does not block reads and writes. Returns
+        False if DEFAULT turned out to have rows of the month.
+        """
+        async with self.postgres_session() as session:
+            await session.execute(
+                text(f"SET LOCAL lock_timeout = {settings.partition_lock_timeout}")
+            )
+            await session.execute(
+                text(
+                    f"ALTER TABLE {default} ADD CONSTRAINT {name}_fence "
+                    f"CHECK (NOT ({in_month})) NOT VALID"
+                )
+            )
+            await session.commit()
+
+        async with self.postgres_session() as session:
+            try:
+                await session.execute(
+                    text(f"ALTER TABLE {default} VALIDATE CONSTRAINT {name}_fence")
+                )
+                await session.commit()
+                return True
+            except IntegrityError:
+                await session.rollback()
+                await session.execute(
+                    text(f"ALTER TABLE {default} DROP CONSTRAINT {name}_fence")
+                )
+                await session.commit()
+                return False
+
+    async def _sync_rows(
+        self, session, name: str, default: str, in_month: str, columns: list[str]
+    ):
+        """Brings the copy in `name` up to date with the rows of the month in DEFAULT."""
+        copy_row = ", ".join(f"copy.{column}" for column in columns)
+        source_row = ", ".join(f"source.{column}" for column in columns)
+        column_list = ", ".join(columns)
+        # Rows deleted or updated since they were copied
+        await session.execute(
+            text(
+                f"DELETE FROM {name} copy WHERE NOT EXISTS ("
+                f"SELECT 1 FROM {default} source "
+                f"WHERE source.id = copy.id AND source.date = copy.date "
+                f"AND ROW({source_row}) IS NOT DISTINCT FROM ROW({copy_row}))"
+            )
+        )
+        # Rows inserted or updated since, and the deleted copies of updated rows
+        await session.execute(
+            text(
+                f"INSERT INTO {name} ({column_list}) "
+                f"SELECT {column_list} FROM {default} source WHERE {in_month} "
+                f"AND NOT EXISTS (SELECT 1 FROM {name} copy "
+                f"WHERE copy.id = source.id AND copy.date = source.date)"
+            )
+        )
+
+    async def _partitions(self, session, table_name: str) -> dict[date, str]:
+        result = await session.execute(
+            text(
+                "SELECT child.relname FROM pg_inherits "
+                "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "WHERE pg_inherits.inhparent = CAST(:table AS regclass)"
+            ),
+            {"table": table_name},
+        )
+        pattern = re.compile(rf"{table_name}_p(\d{{4}})_(\d{{2}})")
+
+        partitions = {}
+        for name in result.scalars():
+            match = pattern.fullmatch(name)
+            if match:
+                partitions[date(int(match[1]), int(match[2]), 1)] = name
+        return partitions
@@ -0,0 +1,94 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from schemas.auth import PasswordHashingStatsSchema
+from services.exceptions import ServiceBusyError
+from werkzeug.security import check_password_hash, generate_password_hash
+
+password_hasher: "PasswordHasher | None" = None
+
+
+async def get_password_hasher() -> "PasswordHasher":
+    return password_hasher
+
+
+def lower_priority() -> None:
+    # Request handling gets the CPU first when the workers share it
+    os.nice(10)
+
+
+class PasswordHasher:
+    """
+    Hashes and checks passwords in a pool of `workers` processes, so the
+    slow KDF never runs on the event loop.
+
+    At most `max_concurrency` passwords are in the pool at once, the rest
+    wait for a slot. A call that waited `queue_timeout` seconds gives up with
+    ServiceBusyError. Waits and timeouts are counted for `stats()`.
+    """
+
+    def __init__(self, workers: int, max_concurrency: int, queue_timeout: float):
+        # Workers are spawned, forking would copy the event loop and its sockets
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=lower_priority,
+        )
+        self.workers = workers
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self.slots = asyncio.Semaphore(max_concurrency)
+        self.waiting = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.max_wait_seconds = 0.0
+
+    async def hash(self, password: str) -> str:
+        return await self._run(generate_password_hash, password)
+
+    async def check(self, password_hash: str, password: str) -> bool:
+        return await self._run(check_password_hash, password_hash, password)
+
+    def stats(self) -> PasswordHashingStatsSchema:
+        return PasswordHashingStatsSchema(
+            workers=self.workers,
+            max_concurrency=self.max_concurrency,
+            waiting=self.waiting,
+            in_flight=self.in_flight,
+            completed=self.completed,
+            timeouts=self.timeouts,
+            wait_seconds_total=self.wait_seconds_total,
+            max_wait_seconds=self.max_wait_seconds,
+        )
+
+    def close(self) -> None:
+        self.executor.shutdown(cancel_futures=True)
+
+    async def _run(self, function, *args):
+        started = time.monotonic()
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self.slots.acquire(), self.queue_timeout)
+        except TimeoutError:
+            self.timeouts += 1
+            raise ServiceBusyError("Password hashing is overloaded")
+        finally:
+            self.waiting -= 1
+            waited = time.monotonic() - started
+            self.wait_seconds_total += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+        self.in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self.executor, function, *args
+            )
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self.slots.release()
@@ -0,0 +1,247 @@
+import asyncio
+from datetime import datetime, timezone
+from uuid import UUID
+
+from models import NO_TRANSACTION_ID, BalanceCheckpoint, LedgerEntry, Wallet
+from schemas.wallet import ReconciliationResultSchema, WalletDriftSchema
+from services.exceptions import ObjectNotFoundError
+from services.wallet_service import (apply_wallet_deltas, lock_wallets,
+                                     wallet_balance)
+from sqlalchemy import and_, delete, func, insert, or_, select, true, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def add_checkpoint_date(dates: dict, wallet_id, date: datetime):
+    """Keeps the earliest changed date per wallet in `dates`."""
+    if wallet_id and (wallet_id not in dates or date < dates[wallet_id]):
+        dates[wallet_id] = date
+
+
+async def invalidate_checkpoints(session: AsyncSession, dates: dict) -> None:
+    """
+    Drops checkpoints that no longer match the ledger after a write.
+
+    `dates` maps wallet ids onto the earliest date of a created, changed or
+    deleted entry. Must run in the same transaction as the write.
+    """
+    conditions = [
+        and_(BalanceCheckpoint.wallet_id == wallet_id, BalanceCheckpoint.date >= date)
+        for wallet_id, date in dates.items()
+        if wallet_id
+    ]
+    if conditions:
+        await session.execute(delete(BalanceCheckpoint).where(or_(*conditions)))
+
+
+def balances_query(wallet_ids: list):
+    """
+    (wallet id, balance, latest checkpoint date, id and amount, sum of the
+    entries after it, date and id of the last entry) for each of `wallet_ids`.
+
+    The sum only reads the (wallet_id, date, id) index range after the
+    latest checkpoint, so it costs as much as the wallet changed since.
+    """
+    checkpoint = (
+        select(
+            BalanceCheckpoint.date,
+            BalanceCheckpoint.last_transaction_id,
+            BalanceCheckpoint.amount,
+        )
+        .where(BalanceCheckpoint.wallet_id == Wallet.id)
+        .order_by(
+            BalanceCheckpoint.date.desc(), BalanceCheckpoint.last_transaction_id.desc()
+        )
+        .limit(1)
+        .lateral()
+    )
+    last = (
+        select(LedgerEntry.date, LedgerEntry.id)
+        .where(LedgerEntry.wallet_id == Wallet.id)
+        .order_by(LedgerEntry.date.desc(), LedgerEntry.id.desc())
+        .limit(1)
+        .lateral()
+    )
+    since = (
+        select(func.coalesce(func.sum(LedgerEntry.signed_amount), 0))
+        .where(
+            LedgerEntry.wallet_id == Wallet.id,
+            tuple_(LedgerEntry.date, LedgerEntry.id)
+            > tuple_(checkpoint.c.date, checkpoint.c.last_transaction_id),
+        )
+        .scalar_subquery()
+    )
+    return (
+        select(
+            Wallet.id,
+            wallet_balance(),
+            checkpoint.c.date,
+            checkpoint.c.last_transaction_id,
+            checkpoint.c.amount,
+            since,
+            last.c.date,
+            last.c.id,
+        )
+        .select_from(Wallet)
+        .outerjoin(checkpoint, true())
+        .outerjoin(last, true())
+        .where(Wallet.id.in_(wallet_ids))
+        .order_by(Wallet.id)
+    )
+
+
+class ReconciliationService:
+    def __init__(self, postgres_session: AsyncSession):
+        self.postgres_session = postgres_session
+
+    async def check_wallet(self, wallet_id: UUID) -> WalletDriftSchema | None:
+        """
+        Compares the wallet amount with its latest checkpoint plus the entries
+        after it. Returns None if the wallet has no checkpoint yet.
+        """
+        async with self.postgres_session() as session:
+            result = await session.execute(balances_query([wallet_id]))
+            row = result.first()
+
+        if row is None:
+            raise ObjectNotFoundError("Wallet not found!")
+
+        wallet_id, amount, _, _, checkpoint_amount, since, _, _ = row
+        if checkpoint_amount is None:
+            return None
+        return WalletDriftSchema(
+            wallet_id=wallet_id, amount=amount, expected=checkpoint_amount + since
+        )
+
+    async def reconcile(
+        self,
+        chunk_size: int = 500,
+        concurrency: int = 4,
+        repair: bool = False,
+        keep: int = 10,
+    ) -> ReconciliationResultSchema:
+        """
+        Checks every wallet against its latest checkpoint and writes a new one.
+
+        Wallets are processed in chunks of `chunk_size`, up to `concurrency`
+        chunks at a time, each in its own transaction. Wallets without a
+        checkpoint get their current amount as the first one. Drifted wallets
+        are set to the expected amount if `repair` is set, otherwise the new
+        checkpoint keeps the expected amount so the drift is reported again.
+        Only the latest `keep` checkpoints of a wallet are kept.
+        """
+        async with self.postgres_session() as session:
+            stmt = await session.scalars(select(Wallet.id).order_by(Wallet.id))
+            wallet_ids = stmt.all()
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def reconcile_chunk(chunk: list):
+            async with semaphore:
+                return await self.reconcile_wallets(chunk, repair, keep)
+
+        results = await asyncio.gather(
+            *(
+                reconcile_chunk(wallet_ids[i : i + chunk_size])
+                for i in range(0, len(wallet_ids), chunk_size)
+            )
+        )
+        return ReconciliationResultSchema(
+            wallets=len(wallet_ids),
+            checked=sum(checked for checked, _ in results),
+            drifts=[drift for _, drifts in results for drift in drifts],
+        )
+
+    async def reconcile_wallets(
+        self, wallet_ids: list, repair: bool = False, keep: int = 10
+    ) -> tuple[int, list[WalletDriftSchema]]:
+        checked = 0
+        drifts = []
+        checkpoints = []
+        now = datetime.now(timezone.utc)
+
+        async with self.postgres_session() as session:
+            async with session.begin():
+                # Every write path locks the wallet row or one of its shards, so
+                # holding these locks keeps the balance and the ledger consistent
+                # while they are read
+                await lock_wallets(session, wallet_ids)
+                result = await session.execute(balances_query(wallet_ids))
+
+                for (
+                    wallet_id,
+                    amount,
+                    checkpoint_date,
+                    checkpoint_id,
+                    checkpoint_amount,
+                    since,
+                    date,
+                    last_id,
+                ) in result.all():
+                    if date is None:
+                        date = checkpoint_date or now
+                        last_id = NO_TRANSACTION_ID
+
+                    if checkpoint_amount is None:
+                        expected = amount
+                    else:
+                        checked += 1
+                        expected = checkpoint_amount + since
+                        if expected != amount:
+                            drifts.append(
+                                WalletDriftSchema(
+                                    wallet_id=wallet_id,
+                                    amount=amount,
+                                    expected=expected,
+                                    repaired=repair,
+                                )
+                            )
+                        if (date, last_id) == (checkpoint_date, checkpoint_id):
+                            continue
+
+                    checkpoints.append(
+                        {
+                            "wallet_id": wallet_id,
+                            "date": date,
+                            "last_transaction_id": last_id,
+                            "amount": expected,
+                        }
+                    )
+
+                if repair:
+                    await apply_wallet_deltas(
+                        session,
+                        {
+                            drift.wallet_id: drift.expected - drift.amount
+                            for drift in drifts
+                        },
+                    )
+                if checkpoints:
+                    await session.execute(insert(BalanceCheckpoint), checkpoints)
+                    await self._prune(session, wallet_ids, keep)
+
+        return checked, drifts
+
+    async def _prune(self, session: AsyncSession, wallet_ids: list, keep: int):
+        position = (
+            func.row_number()
+            .over(
+                partition_by=BalanceCheckpoint.wallet_id,
+                order_by=(
+                    BalanceCheckpoint.date.desc(),
+                    BalanceCheckpoint.created_at.desc(),
+                ),
+            )
+            .label("position")
+        )
+        ranked = (
+            select(BalanceCheckpoint.id, position)
+            .where(BalanceCheckpoint.wallet_id.in_(wallet_ids))
+            .subquery()
+        )
+        await session.execute(
+            delete(BalanceCheckpoint).where(
+                BalanceCheckpoint.id.in_(
+                    select(ranked.c.id).where(ranked.c.position > keep)
+                )
+            )
+        )
@@ -0,0 +1,256 @@
+from datetime import datetime, timezone
+from uuid import UUID
+from zoneinfo import ZoneInfo
+
+from db.postgres import get_postgres_session
+from fastapi import Depends
+from models import (CategoryMonthlyTotal, IncomingCategory, OutgoingCategory,
+                    TransactionTypeEnum, Wallet)
+from schemas.report import (CategoryTotalSchema, PeriodTotalSchema,
+                            ReportPeriod, WalletTotalSchema)
+from services.rollup_service import TRANSACTION_MODELS
+from sqlalchemy import (TIMESTAMP, BigInteger, and_, cast, func,
+                        literal_column, or_, select, union_all)
+from sqlalchemy.ext.asyncio import AsyncSession
+from utils.dates import next_month
+
+CATEGORY_MODELS = {
+    TransactionTypeEnum.incoming: IncomingCategory,
+    TransactionTypeEnum.outgoing: OutgoingCategory,
+}
+
+
+def split_by_months(date_from: datetime, date_to: datetime, aligned=None) -> tuple:
+    """
+    Splits [date_from, date_to) into whole UTC months and the remaining ranges.
+
+    Whole months can be read from the rollup, the remaining ranges (at most the
+    two edges, plus months rejected by `aligned`) have to be read from raw rows.
+    """
+    first = date_from.astimezone(timezone.utc)
+    month = datetime(first.year, first.month, 1, tzinfo=timezone.utc)
+    if month < date_from:
+        month = next_month(month)
+
+    months, ranges = [], []
+    start = date_from
+    while next_month(month) <= date_to:
+        if aligned is None or aligned(month):
+            if start < month:
+                ranges.append((start, month))
+            months.append(month.date())
+            start = next_month(month)
+        month = next_month(month)
+
+    if start < date_to:
+        ranges.append((start, date_to))
+    return months, ranges
+
+
+def is_local_month(tz: ZoneInfo):
+    def aligned(month: datetime) -> bool:
+        return all(
+            value.astimezone(tz).replace(tzinfo=None) == value.replace(tzinfo=None)
+            for value in (month, next_month(month))
+        )
+
+    return aligned
+
+
+class ReportService:
+    def __init__(self, postgres_session: AsyncSession):
+        self.postgres_session = postgres_session
+
+    async def get_totals_by_category(
+        self,
+        user_id: UUID,
+        date_from: datetime,
+        date_to: datetime,
+        transaction_type: TransactionTypeEnum | None = None,
+    ) -> list[CategoryTotalSchema]:
+        months, ranges = split_by_months(date_from, date_to)
+        totals = []
+        async with self.postgres_session() as session:
+            for current_type in self._types(transaction_type):
+                category = CATEGORY_MODELS[current_type]
+                parts = self._parts(
+                    user_id,
+                    current_type,
+                    months,
+                    ranges,
+                    lambda model: model.category_id,
+                )
+                result = await session.execute(
+                    select(
+                        parts.c.key,
+                        category.name,
+                        cast(func.sum(parts.c.amount), BigInteger),
+                        cast(func.sum(parts.c.count), BigInteger),
+                    )
+                    .outerjoin(category, category.id == parts.c.key)
+                    .group_by(parts.c.key, category.name)
+                    .order_by(category.name)
+                )
+                totals.extend(
+                    CategoryTotalSchema(
+                        transaction_type=current_type,
+                        category_id=key,
+                        category_name=name,
+                        amount=amount,
+                        count=count,
+                    )
+                    for key, name, amount, count in result.all()
+                    if count
+                )
+        return totals
+
+    async def get_totals_by_wallet(
+        self,
+        user_id: UUID,
+        date_from: datetime,
+        date_to: datetime,
+        transaction_type: TransactionTypeEnum | None = None,
+    ) -> list[WalletTotalSchema]:
+        months, ranges = split_by_months(date_from, date_to)
+        totals = []
+        async with self.postgres_session() as session:
+            for current_type in self._types(transaction_type):
+                parts = self._parts(
+                    user_id,
+                    current_type,
+                    months,
+                    ranges,
+                    lambda model: model.wallet_id,
+                )
+                result = await session.execute(
+                    select(
+                        parts.c.key,
+                        Wallet.name,
+                        cast(func.sum(parts.c.amount), BigInteger),
+                        cast(func.sum(parts.c.count), BigInteger),
+                    )
+                    .outerjoin(Wallet, Wallet.id == parts.c.key)
+                    .group_by(parts.c.key, Wallet.name)
+                    .order_by(Wallet.name)
+                )
+                totals.extend(
+                    WalletTotalSchema(
+                        transaction_type=current_type,
+                        wallet_id=key,
+                        wallet_name=name,
+                        amount=amount,
+                        count=count,
+                    )
+                    for key, name, amount, count in result.all()
+                    if count
+                )
+        return totals
+
+    async def get_totals_by_period(
+        self,
+        user_id: UUID,
+        date_from: datetime,
+        date_to: datetime,
+        period: ReportPeriod,
+        tz: ZoneInfo,
+        transaction_type: TransactionTypeEnum | None = None,
+    ) -> list[PeriodTotalSchema]:
+        """
+        Totals per day, week or month in the time zone `tz`.
+
+        Only monthly buckets that match a UTC month are read from the rollup,
+        everything else is grouped from raw rows.
+        """
+        if period == ReportPeriod.month:
+            months, ranges = split_by_months(date_from, date_to, is_local_month(tz))
+        else:
+            months, ranges = [], [(date_from, date_to)]
+
+        def bucket(model):
+            return func.date_trunc(period.value, func.timezone(tz.key, model.date))
+
+        def rollup_bucket(rollup):
+            return cast(rollup.month, TIMESTAMP)
+
+        totals = []
+        async with self.postgres_session() as session:
+            for current_type in self._types(transaction_type):
+                parts = self._parts(
+                    user_id, current_type, months, ranges, bucket, rollup_bucket
+                )
+                result = await session.execute(
+                    select(
+                        parts.c.key,
+                        cast(func.sum(parts.c.amount), BigInteger),
+                        cast(func.sum(parts.c.count), BigInteger),
+                    )
+                    .group_by(parts.c.key)
+                    .order_by(parts.c.key)
+                )
+                totals.extend(
+                    PeriodTotalSchema(
+                        transaction_type=current_type,
+                        period_start=key.date(),
+                        amount=amount,
+                        count=count,
+                    )
+                    for key, amount, count in result.all()
+                    if count
+                )
+        return totals
+
+    def _types(self, transaction_type: TransactionTypeEnum | None):
+        return [transaction_type] if transaction_type else list(TransactionTypeEnum)
+
+    def _parts(
+        self,
+        user_id: UUID,
+        transaction_type: TransactionTypeEnum,
+        months: list,
+        ranges: list,
+        key,
+        rollup_key=None,
+    ):
+        """
+        Builds a subquery of (key, amount, count) rows: rollup rows for
+        `months` and raw rows for the `ranges` of dates.
+        """
+        model = TRANSACTION_MODELS[transaction_type]
+
+        parts = []
+        if months:
+            rollup = CategoryMonthlyTotal
+            parts.append(
+                select(
+                    (rollup_key or key)(rollup).label("key"),
+                    rollup.amount.label("amount"),
+                    rollup.count.label("count"),
+                ).where(
+                    rollup.user_id == user_id,
+                    rollup.transaction_type == transaction_type,
+                    rollup.month.in_(months),
+                )
+            )
+        if ranges:
+            parts.append(
+                select(
+                    key(model).label("key"),
+                    model.amount.label("amount"),
+                    literal_column("1").label("count"),
+                ).where(
+                    model.user_id == user_id,
+                    or_(
+                        *(
+                            and_(model.date >= start, model.date < end)
+                            for start, end in ranges
+                        )
+                    ),
+                )
+            )
+        return union_all(*parts).subquery()
+
+
+def get_report_service(
+    postgres_session: AsyncSession = Depends(get_postgres_session),
+) -> ReportService:
+    return ReportService(postgres_session)
@@ -1,8 +1,15 @@
+import json
+import time
+from collections import OrderedDict
 from typing import List
+from uuid import uuid4
 
+from core.config import settings
 from db.postgres import get_postgres_session
+from db.redis import RedisCache, get_redis
 from fastapi.params import Depends
-from models import Role, User
+from models import Role, User, user_role
+from redis.asyncio import Redis
 from schemas.role import CreateRoleSchema, UpdateRoleSchema
 from services.exceptions import (ConflictError, ObjectAlreadyExistsException,
                                  ObjectNotFoundError)
@@ -11,9 +18,70 @@ from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
+def user_roles_key(user_id: str) -> str:
+    return f"user_roles:{user_id}"
+
+
+def user_roles_version_key(user_id: str) -> str:
+    return f"user_roles_version:{user_id}"
+
+
+# Stores the roles only if the version is still the one read before the query
+PUT_IF_VERSION = """
+if (redis.call('GET', KEYS[1]) or '') ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[2], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+
+class LocalRoleCache:
+    """
+    Role titles of the most recently used `max_size` users, each kept for
+    `ttl` seconds in front of the Redis cache.
+
+    Only this process drops its entries on a role change, the other
+    processes see the old roles until their entries expire.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.users: OrderedDict[str, tuple[float, list[str]]] = OrderedDict()
+
+    def get(self, user_id: str) -> list[str] | None:
+        entry = self.users.get(user_id)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self.users[user_id]
+            return None
+        self.users.move_to_end(user_id)
+        return entry[1]
+
+    def put(self, user_id: str, titles: list[str]) -> None:
+        self.users[user_id] = (time.monotonic() + self.ttl, titles)
+        self.users.move_to_end(user_id)
+        while len(self.users) > self.max_size:
+            self.users.popitem(last=False)
+
+    def invalidate(self, user_ids: list[str]) -> None:
+        for user_id in user_ids:
+            self.users.pop(user_id, None)
+
+
+local_role_cache = LocalRoleCache(
+    settings.role_cache_local_size, settings.role_cache_local_ttl
+)
+
+
 class RoleService:
-    def __init__(self, postgres_session: AsyncSession):
+    def __init__(self, postgres_session: AsyncSession, redis: Redis):
         self.postgres_session = postgres_session
+        self.redis = redis
+        self.cache = RedisCache(redis)
+        self.put_if_version = redis.register_script(PUT_IF_VERSION)
 
     async def create_role(self, data: CreateRoleSchema) -> User:
         role = Role(
@@ -61,11 +129,14 @@ class RoleService:
             for field in data.model_fields_set:
                 field_value = getattr(data, field)
                 setattr(role, field, field_value)
+            user_ids = await self._role_user_ids(session, role.id)
             try:
                 await session.commit()
             except IntegrityError:
                 raise ConflictError("ConflictError")
-            return role
+
+        await self.invalidate_user_roles(user_ids)
+        return role
 
     async def delete_role(self, role_id: str):
         async with self.postgres_session() as session:
@@ -75,9 +146,12 @@ class RoleService:
             if role is None:
                 raise ObjectNotFoundError("Role not found!")
 
+            user_ids = await self._role_user_ids(session, role.id)
             await session.delete(role)
             await session.commit()
 
+        await self.invalidate_user_roles(user_ids)
+
     async def get_user_roles(self, user_id: str) -> List[Role]:
         async with self.postgres_session() as session:
             stmt = await session.scalars(select(User).filter_by(id=user_id))
@@ -88,6 +162,63 @@ class RoleService:
 
             return user.roles
 
+    async def get_user_role_titles(self, user_id: str) -> list[str]:
+        """
+        Role titles of the user, from the local cache, then Redis, then a
+        single `user_role JOIN role` query.
+
+        Every invalidation sets a new version of the user's roles. The query
+        result is cached only if the version did not change while it ran, so
+        a role change committed in between cannot be overwritten by the old
+        titles.
+        """
+        titles = local_role_cache.get(user_id)
+        if titles is not None:
+            return titles
+
+        titles = await self.cache.get_from_cache(user_roles_key(user_id))
+        if titles is None:
+            version = await self.redis.get(user_roles_version_key(user_id))
+            async with self.postgres_session() as session:
+                result = await session.scalars(
+                    select(Role.title)
+                    .join(user_role, user_role.c.role_id == Role.id)
+                    .where(user_role.c.user_id == user_id)
+                    .order_by(Role.title)
+                )
+                titles = list(result.all())
+            stored = await self.put_if_version(
+                keys=[user_roles_version_key(user_id), user_roles_key(user_id)],
+                args=[version or "", json.dumps(titles), settings.role_cache_ttl],
+            )
+            if not stored:
+                return titles
+
+        local_role_cache.put(user_id, titles)
+        return titles
+
+    async def invalidate_user_roles(self, user_ids: list[str]) -> None:
+        local_role_cache.invalidate(user_ids)
+        if not user_ids:
+            return
+        async with self.redis.pipeline(transaction=True) as pipe:
+            # A new version rather than a counter, so an expired version key
+            # cannot come back with the value a reader saw
+            for user_id in user_ids:
+                pipe.set(
+                    user_roles_version_key(user_id),
+                    uuid4().hex,
+                    ex=settings.role_cache_ttl,
+                )
+            pipe.delete(*(user_roles_key(user_id) for user_id in user_ids))
+            await pipe.execute()
+
+    async def _role_user_ids(self, session: AsyncSession, role_id) -> list[str]:
+        result = await session.scalars(
+            select(user_role.c.user_id).where(user_role.c.role_id == role_id)
+        )
+        return [str(user_id) for user_id in result.all()]
+
     async def assign_role_to_user(self, user_id: str, role_id: str):
         async with self.postgres_session() as session:
             async with session.begin():
@@ -103,7 +234,8 @@ class RoleService:
 
                 if role not in user.roles:
                     user.roles.append(role)
-                    await session.commit()
+
+        await self.invalidate_user_roles([str(user_id)])
 
     async def remove_role_from_user(self, user_id: str, role_id: str):
         async with self.postgres_session() as session:
@@ -120,10 +252,12 @@ class RoleService:
 
                 if role in user.roles:
                     user.roles.remove(role)
-                    await session.commit()
+
+        await self.invalidate_user_roles([str(user_id)])
 
 
 def get_role_service(
     postgres_session: AsyncSession = Depends(get_postgres_session),
+    redis: Redis = Depends(get_redis),
 ) -> RoleService:
-    return RoleService(postgres_session=postgres_session)
+    return RoleService(postgres_session=postgres_session, redis=redis)
@@ -0,0 +1,220 @@
+import asyncio
+from datetime import date, datetime, timezone
+from uuid import uuid4
+
+from models import (CategoryMonthlyTotal, IncomingTransaction,
+                    OutgoingTransaction, TransactionTypeEnum, User, Wallet)
+from services.wallet_service import lock_wallets
+from sqlalchemy import (Date, delete, func, insert, literal, literal_column,
+                        null, select)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+TRANSACTION_MODELS = {
+    TransactionTypeEnum.incoming: IncomingTransaction,
+    TransactionTypeEnum.outgoing: OutgoingTransaction,
+}
+
+
+def month_of(value: datetime) -> date:
+    return value.astimezone(timezone.utc).date().replace(day=1)
+
+
+def month_column(model):
+    # Literal arguments keep the expression identical in SELECT and GROUP BY
+    return func.date_trunc(
+        literal_column("'month'"),
+        func.timezone(literal_column("'UTC'"), model.date),
+    ).cast(Date)
+
+
+def rollup_key(transaction) -> tuple:
+    return (
+        transaction.user_id,
+        transaction.wallet_id,
+        transaction.category_id,
+        month_of(transaction.date),
+    )
+
+
+def add_rollup_delta(deltas: dict, key: tuple, amount: int, count: int = 1):
+    total, number = deltas.get(key, (0, 0))
+    deltas[key] = (total + amount, number + count)
+
+
+async def apply_rollup_deltas(
+    session: AsyncSession, transaction_type: TransactionTypeEnum, deltas: dict
+):
+    """
+    Adds `deltas` ({(user_id, wallet_id, category_id, month): (amount, count)})
+    to the monthly rollup with one INSERT ... ON CONFLICT DO UPDATE.
+
+    Must run in the same transaction as the change to the raw rows. Keys are
+    written in a fixed order so concurrent writers cannot deadlock.
+    """
+    rows = [
+        {
+            "id": uuid4(),
+            "transaction_type": transaction_type,
+            "user_id": user_id,
+            "wallet_id": wallet_id,
+            "category_id": category_id,
+            "month": month,
+            "amount": amount,
+            "count": count,
+        }
+        for (user_id, wallet_id, category_id, month), (amount, count) in sorted(
+            deltas.items(), key=lambda item: tuple(map(str, item[0]))
+        )
+        if amount or count
+    ]
+    if not rows:
+        return
+
+    stmt = pg_insert(CategoryMonthlyTotal).values(rows)
+    await session.execute(
+        stmt.on_conflict_do_update(
+            constraint="uq_categorymonthlytotal_key",
+            set_={
+                "amount": CategoryMonthlyTotal.amount + stmt.excluded.amount,
+                "count": CategoryMonthlyTotal.count + stmt.excluded.count,
+                "updated_at": func.current_timestamp(),
+            },
+        )
+    )
+
+
+async def detach_category_rollup(
+    session: AsyncSession, transaction_type: TransactionTypeEnum, category_id
+):
+    """
+    Moves the rollup rows of a deleted category to the NULL category, merging
+    them into the rows already there.
+
+    Ledger entries lose the category through ON DELETE SET NULL, so later
+    changes to them hit the NULL key. Must run in the same transaction as the
+    delete, after it has been flushed: the cascade locks the ledger rows, so
+    writers that read the old id finish before the move and the rest see NULL.
+    """
+    moved = (
+        delete(CategoryMonthlyTotal)
+        .filter_by(transaction_type=transaction_type, category_id=category_id)
+        .returning(*CategoryMonthlyTotal.__table__.c)
+        .cte("moved")
+    )
+    stmt = pg_insert(CategoryMonthlyTotal).from_select(
+        [
+            "id",
+            "transaction_type",
+            "user_id",
+            "wallet_id",
+            "category_id",
+            "month",
+            "amount",
+            "count",
+        ],
+        select(
+            func.gen_random_uuid(),
+            moved.c.transaction_type,
+            moved.c.user_id,
+            moved.c.wallet_id,
+            null(),
+            moved.c.month,
+            moved.c.amount,
+            moved.c.count,
+        ),
+    )
+    await session.execute(
+        stmt.on_conflict_do_update(
+            constraint="uq_categorymonthlytotal_key",
+            set_={
+                "amount": CategoryMonthlyTotal.amount + stmt.excluded.amount,
+                "count": CategoryMonthlyTotal.count + stmt.excluded.count,
+                "updated_at": func.current_timestamp(),
+            },
+        )
+    )
+
+
+class RollupService:
+    def __init__(self, postgres_session: AsyncSession):
+        self.postgres_session = postgres_session
+
+    async def rebuild(self, chunk_size: int = 500, concurrency: int = 4) -> int:
+        """
+        Recomputes the monthly rollup from the raw transaction tables.
+
+        Users are processed in chunks of `chunk_size`, up to `concurrency`
+        chunks at a time, each in its own transaction. Returns the number of
+        users processed.
+        """
+        async with self.postgres_session() as session:
+            stmt = await session.scalars(select(User.id).order_by(User.id))
+            user_ids = stmt.all()
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def rebuild_chunk(chunk: list):
+            async with semaphore:
+                await self.rebuild_users(chunk)
+
+        await asyncio.gather(
+            *(
+                rebuild_chunk(user_ids[i : i + chunk_size])
+                for i in range(0, len(user_ids), chunk_size)
+            )
+        )
+        return len(user_ids)
+
+    async def rebuild_users(self, user_ids: list):
+        async with self.postgres_session() as session:
+            async with session.begin():
+                # Every write path locks the wallet row or one of its shards
+                # before touching the rollup, so holding these locks keeps
+                # concurrent writes out
+                wallet_ids = await session.scalars(
+                    select(Wallet.id).where(Wallet.user_id.in_(user_ids))
+                )
+                await lock_wallets(session, wallet_ids.all())
+                await session.execute(
+                    delete(CategoryMonthlyTotal).where(
+                        CategoryMonthlyTotal.user_id.in_(user_ids)
+                    )
+                )
+
+                for transaction_type, model in TRANSACTION_MODELS.items():
+                    month = month_column(model)
+                    await session.execute(
+                        insert(CategoryMonthlyTotal).from_select(
+                            [
+                                "id",
+                                "transaction_type",
+                                "user_id",
+                                "wallet_id",
+                                "category_id",
+                                "month",
+                                "amount",
+                                "count",
+                            ],
+                            select(
+                                func.gen_random_uuid(),
+                                literal(
+                                    transaction_type,
+                                    CategoryMonthlyTotal.transaction_type.type,
+                                ),
+                                model.user_id,
+                                model.wallet_id,
+                                model.category_id,
+                                month,
+                                func.sum(model.amount),
+                                func.count(),
+                            )
+                            .where(model.user_id.in_(user_ids))
+                            .group_by(
+                                model.user_id,
+                                model.wallet_id,
+                                model.category_id,
+                                month,
+                            ),
+                        )
+                    )
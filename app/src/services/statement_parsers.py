@@ -0,0 +1,197 @@
+import codecs
+import csv
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal, InvalidOperation, Overflow
+from typing import AsyncIterator
+
+from services.exceptions import StatementFormatError
+
+OFX_TAG = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<]*)")
+QIF_DATE_FORMATS = ("%m/%d/%Y", "%m/%d/%y", "%d.%m.%Y", "%Y-%m-%d", "%m/%d'%y")
+# Amounts are stored in BIGINT columns
+MAX_AMOUNT = 2**63 - 1
+
+
+@dataclass(slots=True)
+class StatementRecord:
+    date: datetime
+    amount: int
+    description: str
+
+
+async def aiter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decodes an async stream of byte chunks into lines without buffering it."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    tail = ""
+    async for chunk in chunks:
+        lines = (tail + decoder.decode(chunk)).splitlines(keepends=True)
+        tail = lines.pop() if lines and not lines[-1].endswith(("\n", "\r")) else ""
+        for line in lines:
+            yield line.rstrip("\r\n")
+    tail += decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+def parse_amount(value: str, scale: int) -> int:
+    try:
+        amount = Decimal(value.strip().replace(",", "").replace(" ", "")) * scale
+    except InvalidOperation:
+        raise StatementFormatError(f"Invalid amount: {value!r}")
+    except Overflow:
+        raise StatementFormatError(f"Amount is out of range: {value!r}")
+
+    if not amount.is_finite():
+        raise StatementFormatError(f"Invalid amount: {value!r}")
+    if abs(amount) > MAX_AMOUNT:
+        raise StatementFormatError(f"Amount is out of range: {value!r}")
+    if amount != amount.to_integral_value():
+        raise StatementFormatError(f"Amount has too many decimal places: {value!r}")
+
+    return int(amount)
+
+
+def parse_date(value: str, formats: tuple[str, ...] = ()) -> datetime:
+    value = value.strip()
+    for date_format in formats:
+        try:
+            date = datetime.strptime(value, date_format)
+            break
+        except ValueError:
+            continue
+    else:
+        try:
+            date = datetime.fromisoformat(value)
+        except ValueError:
+            raise StatementFormatError(f"Invalid date: {value!r}")
+
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+
+    return date
+
+
+async def parse_csv(
+    lines: AsyncIterator[str], scale: int
+) -> AsyncIterator[StatementRecord]:
+    """
+    Parses CSV with a header row containing `date`, `amount`
+    and optionally `description` columns.
+    """
+    header = None
+    line_number = 0
+    async for line in lines:
+        line_number += 1
+        if not line.strip():
+            continue
+
+        row = next(csv.reader([line]))
+
+        if header is None:
+            header = [column.strip().lower() for column in row]
+            if "date" not in header or "amount" not in header:
+                raise StatementFormatError("CSV header must contain date and amount")
+            continue
+
+        if len(row) != len(header):
+            raise StatementFormatError(
+                f"Line {line_number}: expected {len(header)} columns, got {len(row)}"
+            )
+
+        record = dict(zip(header, row))
+        yield StatementRecord(
+            date=parse_date(record["date"]),
+            amount=parse_amount(record["amount"], scale),
+            description=record.get("description", ""),
+        )
+
+
+def _ofx_date(value: str) -> datetime:
+    # 20250131120000[-5:EST] -> date, time and optional offset in hours
+    match = re.match(
+        r"(\d{8})(\d{6})?(?:\.\d+)?(?:\[([+-]?\d+(?:\.\d+)?)[^]]*])?", value
+    )
+    if match is None:
+        raise StatementFormatError(f"Invalid date: {value!r}")
+
+    date_part, time_part, offset = match.groups()
+    date = datetime.strptime(date_part + (time_part or "000000"), "%Y%m%d%H%M%S")
+    if offset is None:
+        return date.replace(tzinfo=timezone.utc)
+
+    return date.replace(tzinfo=timezone.utc) - timedelta(hours=float(offset))
+
+
+async def parse_ofx(
+    lines: AsyncIterator[str], scale: int
+) -> AsyncIterator[StatementRecord]:
+    """Parses <STMTTRN> blocks of SGML (OFX 1.x) or XML (OFX 2.x) statements."""
+    transaction = None
+    async for line in lines:
+        for closing, tag, value in OFX_TAG.findall(line):
+            tag = tag.upper()
+            value = value.strip()
+
+            if tag == "STMTTRN":
+                if transaction is not None:
+                    yield _ofx_record(transaction, scale)
+                transaction = None if closing else {}
+            elif transaction is not None and not closing and value:
+                transaction[tag] = value
+
+    if transaction is not None:
+        yield _ofx_record(transaction, scale)
+
+
+def _ofx_record(transaction: dict, scale: int) -> StatementRecord:
+    if "DTPOSTED" not in transaction or "TRNAMT" not in transaction:
+        raise StatementFormatError("OFX transaction without DTPOSTED or TRNAMT")
+
+    return StatementRecord(
+        date=_ofx_date(transaction["DTPOSTED"]),
+        amount=parse_amount(transaction["TRNAMT"], scale),
+        description=transaction.get("MEMO") or transaction.get("NAME", ""),
+    )
+
+
+async def parse_qif(
+    lines: AsyncIterator[str], scale: int
+) -> AsyncIterator[StatementRecord]:
+    """Parses QIF records: D (date), T/U (amount), P (payee), M (memo), ^ (end)."""
+    transaction = {}
+    async for line in lines:
+        if not line or line.startswith("!"):
+            continue
+
+        code, value = line[0], line[1:].strip()
+
+        if code == "^":
+            if transaction:
+                yield _qif_record(transaction, scale)
+            transaction = {}
+        elif code in "DTUPM":
+            transaction.setdefault(code, value)
+
+    if transaction:
+        yield _qif_record(transaction, scale)
+
+
+def _qif_record(transaction: dict, scale: int) -> StatementRecord:
+    amount = transaction.get("T") or transaction.get("U")
+    if "D" not in transaction or amount is None:
+        raise StatementFormatError("QIF transaction without date or amount")
+
+    return StatementRecord(
+        date=parse_date(transaction["D"], QIF_DATE_FORMATS),
+        amount=parse_amount(amount, scale),
+        description=transaction.get("M") or transaction.get("P", ""),
+    )
+
+
+PARSERS = {
+    "csv": parse_csv,
+    "ofx": parse_ofx,
+    "qif": parse_qif,
+}
@@ -1,16 +1,100 @@
+import re
 from abc import ABC, abstractmethod
+from collections import defaultdict
+from datetime import datetime, timezone
+from uuid import uuid4
 
 from db.postgres import get_postgres_session
+from db.redis import get_redis
 from fastapi import Depends
-from models import IncomingTransaction, OutgoingTransaction, Wallet
-from schemas.incoming_transaction import (CreateIncomingTransactionSchema,
+from models import (TEXT_SEARCH_CONFIG, IncomingCategory, IncomingTransaction,
+                    LedgerEntry, OutgoingCategory, OutgoingTransaction,
+                    TransactionTypeEnum)
+from redis import Redis
+from schemas.batch import BatchItemResultSchema
+from schemas.incoming_transaction import (BatchCreateIncomingTransactionSchema,
+                                          CreateIncomingTransactionSchema,
                                           UpdateIncomingTransactionSchema)
-from schemas.outgoing_transaction import (CreateOutgoingTransactionSchema,
+from schemas.outgoing_transaction import (BatchCreateOutgoingTransactionSchema,
+                                          CreateOutgoingTransactionSchema,
                                           UpdateOutgoingTransactionSchema)
+from schemas.transaction_filter import SortOrder, TransactionFilterSchema
+from services.balance_history_service import invalidate_balance_history
 from services.exceptions import ConflictError, ObjectNotFoundError
-from sqlalchemy import select
+from services.group_commit_service import GroupCommitter, get_group_committer
+from services.reconciliation_service import (add_checkpoint_date,
+                                             invalidate_checkpoints)
+from services.rollup_service import (add_rollup_delta, apply_rollup_deltas,
+                                     rollup_key)
+from services.wallet_service import apply_wallet_delta, apply_wallet_deltas
+from sqlalchemy import REAL, Select, false, func, insert, literal, or_, select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from utils.pagination import (KeysetCursor, KeysetPage, paginate_by_keyset,
+                              paginate_by_rank)
+
+CreateTransactionSchema = (
+    CreateIncomingTransactionSchema | CreateOutgoingTransactionSchema
+)
+BatchCreateTransactionSchema = (
+    BatchCreateIncomingTransactionSchema | BatchCreateOutgoingTransactionSchema
+)
+UpdateTransactionSchema = (
+    UpdateIncomingTransactionSchema | UpdateOutgoingTransactionSchema
+)
+
+# Trigrams need at least three characters to narrow down a substring search
+SUBSTRING_SEARCH_MIN_LENGTH = 3
+
+
+def filter_transactions(stmt: Select, model, filters: TransactionFilterSchema):
+    """
+    Adds the listing filters to `stmt` as plain conditions on indexed columns.
+
+    Date bounds narrow the (user_id, direction, date, id) range scan, category
+    and wallet ids are served by the (<direction>_category_id, user_id, date, id)
+    and (wallet_id, date, id) indexes.
+    """
+    if filters.date_from:
+        stmt = stmt.where(model.date >= filters.date_from)
+    if filters.date_to:
+        stmt = stmt.where(model.date <= filters.date_to)
+    if filters.amount_min is not None:
+        stmt = stmt.where(model.amount >= filters.amount_min)
+    if filters.amount_max is not None:
+        stmt = stmt.where(model.amount <= filters.amount_max)
+    if filters.category_id:
+        stmt = stmt.where(model.category_id.in_(filters.category_id))
+    if filters.wallet_id:
+        stmt = stmt.where(model.wallet_id.in_(filters.wallet_id))
+    return stmt
+
+
+def search_transactions(model, query: str):
+    """
+    Builds the match condition and rank for a description search.
+
+    Every word of `query` is matched as a prefix against the generated
+    tsvector column (GIN index), the whole query is also matched as a
+    substring with ILIKE (trigram index). Substring only matches rank lowest.
+    """
+    words = re.findall(r"[^\W_]+", query)
+    tsquery = func.to_tsquery(
+        TEXT_SEARCH_CONFIG, " & ".join(f"{word}:*" for word in words)
+    )
+
+    conditions = []
+    if words:
+        conditions.append(model.description_tsv.op("@@")(tsquery))
+    if len(query) >= SUBSTRING_SEARCH_MIN_LENGTH:
+        pattern = re.sub(r"([\\%_])", r"\\\1", query)
+        conditions.append(model.description.ilike(f"%{pattern}%", escape="\\"))
+
+    if words:
+        rank = func.ts_rank(model.description_tsv, tsquery, type_=REAL)
+    else:
+        rank = literal(0, REAL)
+    return or_(false(), *conditions), rank
 
 
 class AbstractTransactionService(ABC):
@@ -18,6 +102,10 @@ class AbstractTransactionService(ABC):
     async def create_transaction(self, data):
         pass
 
+    @abstractmethod
+    async def create_transactions(self, data, wallets):
+        pass
+
     @abstractmethod
     async def update_transaction(self, transaction_id, data):
         pass
@@ -31,132 +119,157 @@ class AbstractTransactionService(ABC):
         pass
 
     @abstractmethod
-    async def get_user_transactions(self, user_id):
+    async def get_user_transactions(self, user_id, size, cursor, filters):
         pass
 
+    @abstractmethod
+    async def search_user_transactions(self, user_id, query, size, cursor):
+        pass
 
-class OutgoingTransactionService(AbstractTransactionService):
-    def __init__(self, postgres_session: AsyncSession):
-        self.postgres_session = postgres_session
-
-    async def create_transaction(self, data: CreateOutgoingTransactionSchema):
-        transaction = OutgoingTransaction(
-            amount=data.amount,
-            description=data.description,
-            category_id=data.category_id,
-            wallet_id=data.wallet_id,
-            user_id=data.user_id,
-        )
-        if data.date:
-            transaction.date = data.date
-
-        async with self.postgres_session() as session:
-            async with session.begin():
-                stmt = await session.scalars(
-                    select(Wallet).filter_by(id=transaction.wallet_id)
-                )
-                wallet = stmt.first()
-                if wallet is None:
-                    raise ObjectNotFoundError("Wallet not found!")
-                wallet.amount -= transaction.amount
-                session.add(transaction)
-            return transaction
-
-    async def update_transaction(
-        self, transaction_id, data: UpdateOutgoingTransactionSchema
-    ):
-        async with self.postgres_session() as session:
-            stmt = await session.scalars(
-                select(OutgoingTransaction).filter_by(id=transaction_id)
-            )
-
-            transaction = stmt.first()
-
-            if transaction is None:
-                raise ObjectNotFoundError("Transaction not found!")
-
-            for field in data.model_fields_set:
-                field_value = getattr(data, field)
-                setattr(transaction, field, field_value)
-            try:
-                await session.commit()
-            except IntegrityError:
-                raise ConflictError("ConflictError")
-            return transaction
-
-    async def delete_transaction(self, transaction_id: str):
-        async with self.postgres_session() as session:
-            stmt = await session.scalars(
-                select(OutgoingTransaction).filter_by(id=transaction_id)
-            )
-            transaction = stmt.first()
-
-            if transaction is None:
-                raise ObjectNotFoundError("Transaction not found!")
-
-            await session.delete(transaction)
-            await session.commit()
-
-    async def get_transaction_by_id(self, transaction_id: str):
-        async with self.postgres_session() as session:
-            stmt = await session.scalars(
-                select(OutgoingTransaction).filter_by(id=transaction_id)
-            )
-
-            transaction = stmt.first()
-
-            if transaction is None:
-                raise ObjectNotFoundError("Transaction not found!")
-
-            return transaction
-
-    async def get_user_transactions(self, user_id: str):
-        async with self.postgres_session() as session:
-            stmt = await session.scalars(
-                select(OutgoingTransaction).filter_by(user_id=user_id)
-            )
-            transactions = stmt.all()
 
-            if transactions is None:
-                raise ObjectNotFoundError("Transactions not found!")
+class TransactionService(AbstractTransactionService):
+    """
+    Transactions of one direction over the shared ledger table.
 
-            return transactions
+    Subclasses set the mapped model, its category model and the sign the
+    transaction amount is applied to the wallet balance with.
+    """
 
+    model: type[LedgerEntry]
+    category_model: type
+    transaction_type: TransactionTypeEnum
+    sign: int
 
-class IncomingTransactionService(AbstractTransactionService):
-    def __init__(self, postgres_session: AsyncSession):
+    def __init__(
+        self,
+        postgres_session: AsyncSession,
+        redis: Redis,
+        group_committer: GroupCommitter | None = None,
+    ):
         self.postgres_session = postgres_session
+        self.redis = redis
+        self.group_committer = group_committer
 
-    async def create_transaction(self, data: CreateIncomingTransactionSchema):
-        transaction = IncomingTransaction(
+    async def create_transaction(self, data: CreateTransactionSchema):
+        transaction = self.model(
+            id=uuid4(),
             amount=data.amount,
             description=data.description,
             category_id=data.category_id,
             wallet_id=data.wallet_id,
             user_id=data.user_id,
+            date=data.date or datetime.now(timezone.utc),
         )
 
-        if data.date:
-            transaction.date = data.date
+        if self.group_committer is not None:
+            return await self.group_committer.submit(self, transaction)
+        return await self.write_transaction(transaction)
 
+    async def write_transaction(self, transaction: LedgerEntry):
         async with self.postgres_session() as session:
             async with session.begin():
-                stmt = await session.scalars(
-                    select(Wallet).filter_by(id=transaction.wallet_id)
+                await apply_wallet_delta(
+                    session, transaction.wallet_id, self.sign * transaction.amount
+                )
+                await invalidate_checkpoints(
+                    session, {transaction.wallet_id: transaction.date}
                 )
-                wallet = stmt.first()
-                if wallet is None:
-                    raise ObjectNotFoundError("Wallet not found!")
-                wallet.amount += transaction.amount
                 session.add(transaction)
-            return transaction
+                await apply_rollup_deltas(
+                    session,
+                    self.transaction_type,
+                    {rollup_key(transaction): (transaction.amount, 1)},
+                )
+        await invalidate_balance_history(self.redis, [transaction.wallet_id])
+        return transaction
+
+    async def create_transactions(
+        self, data: BatchCreateTransactionSchema, wallets: dict
+    ) -> list[BatchItemResultSchema]:
+        """
+        Creates a batch of transactions with one multi-row INSERT.
+
+        `wallets` maps the wallet ids the caller may write to onto their owners.
+        Invalid items are reported per item, the rest are stored together with
+        one aggregated balance update per wallet in a single commit.
+        """
+        results = []
+        rows = []
+        deltas = defaultdict(int)
+        dates = {}
+        rollup = {}
+        now = datetime.now(timezone.utc)
 
-    async def update_transaction(
-        self, transaction_id: str, data: UpdateIncomingTransactionSchema
-    ):
+        async with self.postgres_session() as session:
+            async with session.begin():
+                stmt = await session.scalars(
+                    select(self.category_model.id).where(
+                        self.category_model.id.in_(
+                            {t.category_id for t in data.transactions}
+                        )
+                    )
+                )
+                categories = set(stmt.all())
+
+                for index, item in enumerate(data.transactions):
+                    if item.wallet_id not in wallets:
+                        error = "Wallet not found!"
+                    elif item.category_id not in categories:
+                        error = "Category not found!"
+                    else:
+                        error = None
+
+                    if error is None:
+                        try:
+                            transaction = self.model(
+                                id=uuid4(),
+                                amount=item.amount,
+                                description=item.description,
+                                category_id=item.category_id,
+                                wallet_id=item.wallet_id,
+                                user_id=wallets[item.wallet_id],
+                                date=item.date or now,
+                            )
+                        except ValueError as e:
+                            error = str(e)
+
+                    if error is not None:
+                        results.append(BatchItemResultSchema(index=index, error=error))
+                        continue
+
+                    rows.append(
+                        {
+                            "id": transaction.id,
+                            "amount": transaction.amount,
+                            "description": transaction.description,
+                            "category_id": transaction.category_id,
+                            "wallet_id": transaction.wallet_id,
+                            "user_id": transaction.user_id,
+                            "date": transaction.date,
+                        }
+                    )
+                    deltas[transaction.wallet_id] += self.sign * transaction.amount
+                    add_checkpoint_date(dates, transaction.wallet_id, transaction.date)
+                    add_rollup_delta(
+                        rollup, rollup_key(transaction), transaction.amount
+                    )
+                    results.append(
+                        BatchItemResultSchema(index=index, id=transaction.id)
+                    )
+
+                if rows:
+                    await session.execute(insert(self.model), rows)
+                    await apply_wallet_deltas(session, deltas)
+                    await invalidate_checkpoints(session, dates)
+                    await apply_rollup_deltas(session, self.transaction_type, rollup)
+
+        await invalidate_balance_history(self.redis, deltas)
+        return results
+
+    async def update_transaction(self, transaction_id, data: UpdateTransactionSchema):
         async with self.postgres_session() as session:
             stmt = await session.scalars(
-                select(IncomingTransaction).filter_by(id=transaction_id)
+                select(self.model).filter_by(id=transaction_id).with_for_update()
             )
 
             transaction = stmt.first()
@@ -164,32 +277,59 @@ class IncomingTransactionService(AbstractTransactionService):
             if transaction is None:
                 raise ObjectNotFoundError("Transaction not found!")
 
+            deltas = defaultdict(int)
+            deltas[transaction.wallet_id] -= self.sign * transaction.amount
+            dates = {}
+            add_checkpoint_date(dates, transaction.wallet_id, transaction.date)
+            rollup = {}
+            add_rollup_delta(rollup, rollup_key(transaction), -transaction.amount, -1)
+
             for field in data.model_fields_set:
                 field_value = getattr(data, field)
                 setattr(transaction, field, field_value)
+
+            deltas[transaction.wallet_id] += self.sign * transaction.amount
+            add_checkpoint_date(dates, transaction.wallet_id, transaction.date)
+            add_rollup_delta(rollup, rollup_key(transaction), transaction.amount)
             try:
+                await apply_wallet_deltas(session, deltas)
+                await invalidate_checkpoints(session, dates)
+                await apply_rollup_deltas(session, self.transaction_type, rollup)
                 await session.commit()
             except IntegrityError:
                 raise ConflictError("ConflictError")
-            return transaction
+        await invalidate_balance_history(self.redis, deltas)
+        return transaction
 
     async def delete_transaction(self, transaction_id: str):
         async with self.postgres_session() as session:
             stmt = await session.scalars(
-                select(IncomingTransaction).filter_by(id=transaction_id)
+                select(self.model).filter_by(id=transaction_id).with_for_update()
             )
             transaction = stmt.first()
 
             if transaction is None:
                 raise ObjectNotFoundError("Transaction not found!")
 
+            await apply_wallet_deltas(
+                session, {transaction.wallet_id: -self.sign * transaction.amount}
+            )
+            await invalidate_checkpoints(
+                session, {transaction.wallet_id: transaction.date}
+            )
+            await apply_rollup_deltas(
+                session,
+                self.transaction_type,
+                {rollup_key(transaction): (-transaction.amount, -1)},
+            )
             await session.delete(transaction)
             await session.commit()
+        await invalidate_balance_history(self.redis, [transaction.wallet_id])
 
     async def get_transaction_by_id(self, transaction_id: str):
         async with self.postgres_session() as session:
             stmt = await session.scalars(
-                select(IncomingTransaction).filter_by(id=transaction_id)
+                select(self.model).filter_by(id=transaction_id)
             )
 
             transaction = stmt.first()
@@ -199,26 +339,68 @@ class IncomingTransactionService(AbstractTransactionService):
 
             return transaction
 
-    async def get_user_transactions(self, user_id: str):
+    async def get_user_transactions(
+        self,
+        user_id: str,
+        size: int,
+        cursor: KeysetCursor | None = None,
+        filters: TransactionFilterSchema | None = None,
+    ) -> KeysetPage:
+        filters = filters or TransactionFilterSchema()
         async with self.postgres_session() as session:
-            stmt = await session.scalars(
-                select(IncomingTransaction).filter_by(user_id=user_id)
+            return await paginate_by_keyset(
+                session,
+                filter_transactions(
+                    select(self.model).filter_by(user_id=user_id),
+                    self.model,
+                    filters,
+                ),
+                self.model,
+                size,
+                cursor,
+                descending=filters.order == SortOrder.desc,
             )
-            transactions = stmt.all()
 
-            if transactions is None:
-                raise ObjectNotFoundError("Transactions not found!")
+    async def search_user_transactions(
+        self, user_id: str, query: str, size: int, cursor: KeysetCursor | None = None
+    ) -> KeysetPage:
+        condition, rank = search_transactions(self.model, query)
+        async with self.postgres_session() as session:
+            return await paginate_by_rank(
+                session,
+                select(self.model).filter_by(user_id=user_id).where(condition),
+                self.model,
+                rank,
+                size,
+                cursor,
+            )
+
+
+class OutgoingTransactionService(TransactionService):
+    model = OutgoingTransaction
+    category_model = OutgoingCategory
+    transaction_type = TransactionTypeEnum.outgoing
+    sign = -1
+
 
-            return transactions
+class IncomingTransactionService(TransactionService):
+    model = IncomingTransaction
+    category_model = IncomingCategory
+    transaction_type = TransactionTypeEnum.incoming
+    sign = 1
 
 
 def get_outgoing_transaction_service(
     postgres_session: AsyncSession = Depends(get_postgres_session),
+    redis: Redis = Depends(get_redis),
+    group_committer: GroupCommitter | None = Depends(get_group_committer),
 ) -> OutgoingTransactionService:
-    return OutgoingTransactionService(postgres_session)
+    return OutgoingTransactionService(postgres_session, redis, group_committer)
 
 
 def get_incoming_transaction_service(
     postgres_session: AsyncSession = Depends(get_postgres_session),
+    redis: Redis = Depends(get_redis),
+    group_committer: GroupCommitter | None = Depends(get_group_committer),
 ) -> IncomingTransactionService:
-    return IncomingTransactionService(postgres_session)
+    return IncomingTransactionService(postgres_session, redis, group_committer)
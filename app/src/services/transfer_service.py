@@ -0,0 +1,107 @@
+from datetime import datetime, timezone
+
+from db.postgres import get_postgres_session
+from db.redis import get_redis
+from fastapi import Depends
+from models import (IncomingTransaction, OutgoingTransaction,
+                    TransactionTypeEnum, Wallet)
+from redis import Redis
+from schemas.incoming_transaction import GetIncomingTransactionSchema
+from schemas.outgoing_transaction import GetOutgoingTransactionSchema
+from schemas.transfer import CreateTransferSchema, GetTransferSchema
+from services.balance_history_service import invalidate_balance_history
+from services.exceptions import ConflictError, ObjectNotFoundError
+from services.reconciliation_service import invalidate_checkpoints
+from services.rollup_service import apply_rollup_deltas, rollup_key
+from services.wallet_service import apply_wallet_deltas
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class TransferService:
+    def __init__(self, postgres_session: AsyncSession, redis: Redis):
+        self.postgres_session = postgres_session
+        self.redis = redis
+
+    async def create_transfer(self, data: CreateTransferSchema) -> GetTransferSchema:
+        """
+        Moves `amount` between two wallets of the same currency.
+
+        The outgoing and the incoming leg and both balance updates are
+        written in one transaction. Balances are updated in wallet id order,
+        so transfers in opposite directions between the same wallets wait for
+        each other instead of deadlocking.
+        """
+        date = data.date or datetime.now(timezone.utc)
+
+        try:
+            async with self.postgres_session() as session:
+                async with session.begin():
+                    stmt = await session.scalars(
+                        select(Wallet).where(
+                            Wallet.id.in_([data.from_wallet_id, data.to_wallet_id])
+                        )
+                    )
+                    wallets = {wallet.id: wallet for wallet in stmt.all()}
+
+                    if len(wallets) != 2:
+                        raise ObjectNotFoundError("Wallet not found!")
+                    if len({wallet.currency for wallet in wallets.values()}) != 1:
+                        raise ConflictError("Wallets have different currencies")
+
+                    outgoing = OutgoingTransaction(
+                        amount=data.amount,
+                        description=data.description,
+                        category_id=data.outgoing_category_id,
+                        wallet_id=data.from_wallet_id,
+                        user_id=wallets[data.from_wallet_id].user_id,
+                        date=date,
+                    )
+                    incoming = IncomingTransaction(
+                        amount=data.amount,
+                        description=data.description,
+                        category_id=data.incoming_category_id,
+                        wallet_id=data.to_wallet_id,
+                        user_id=wallets[data.to_wallet_id].user_id,
+                        date=date,
+                    )
+
+                    await apply_wallet_deltas(
+                        session,
+                        {
+                            data.from_wallet_id: -data.amount,
+                            data.to_wallet_id: data.amount,
+                        },
+                    )
+                    await invalidate_checkpoints(
+                        session, {data.from_wallet_id: date, data.to_wallet_id: date}
+                    )
+                    session.add_all([outgoing, incoming])
+                    await apply_rollup_deltas(
+                        session,
+                        TransactionTypeEnum.outgoing,
+                        {rollup_key(outgoing): (outgoing.amount, 1)},
+                    )
+                    await apply_rollup_deltas(
+                        session,
+                        TransactionTypeEnum.incoming,
+                        {rollup_key(incoming): (incoming.amount, 1)},
+                    )
+        except IntegrityError:
+            raise ObjectNotFoundError("Category not found!")
+
+        await invalidate_balance_history(
+            self.redis, [data.from_wallet_id, data.to_wallet_id]
+        )
+        return GetTransferSchema(
+            outgoing=GetOutgoingTransactionSchema.model_validate(outgoing),
+            incoming=GetIncomingTransactionSchema.model_validate(incoming),
+        )
+
+
+def get_transfer_service(
+    postgres_session: AsyncSession = Depends(get_postgres_session),
+    redis: Redis = Depends(get_redis),
+) -> TransferService:
+    return TransferService(postgres_session, redis)
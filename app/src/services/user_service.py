@@ -4,19 +4,22 @@ from models import Role, User
 from schemas.user import CreateUserSchema
 from services.exceptions import (ConflictError, ObjectAlreadyExistsException,
                                  ObjectNotFoundError)
+from services.password_service import PasswordHasher, get_password_hasher
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import noload
 
 
 class UserService:
-    def __init__(self, postgres_session: AsyncSession):
+    def __init__(self, postgres_session: AsyncSession, password_hasher: PasswordHasher):
         self.postgres_session = postgres_session
+        self.password_hasher = password_hasher
 
     async def create_user(self, user_data: CreateUserSchema) -> User:
         user = User(
             login=user_data.login,
-            password=user_data.password,
+            password_hash=await self.password_hasher.hash(user_data.password),
             first_name=user_data.first_name,
             last_name=user_data.last_name,
         )
@@ -42,7 +45,10 @@ class UserService:
 
     async def get_user_by_login(self, user_login: str) -> User:
         async with self.postgres_session() as session:
-            stmt = await session.scalars(select(User).filter_by(login=user_login))
+            # Roles are read through RoleService.get_user_role_titles
+            stmt = await session.scalars(
+                select(User).filter_by(login=user_login).options(noload(User.roles))
+            )
 
             user = stmt.first()
 
@@ -52,6 +58,13 @@ class UserService:
             return user
 
     async def update_user(self, user_id: str, user_data: CreateUserSchema) -> User:
+        values = {
+            field: getattr(user_data, field) for field in user_data.model_fields_set
+        }
+        # Hashed before a connection is taken, the hash can wait for the pool
+        if "password" in values:
+            values["password"] = await self.password_hasher.hash(values["password"])
+
         async with self.postgres_session() as session:
             stmt = await session.scalars(select(User).filter_by(id=user_id))
 
@@ -60,8 +73,7 @@ class UserService:
             if user is None:
                 raise ObjectNotFoundError("User not found!")
 
-            for field in user_data.model_fields_set:
-                field_value = getattr(user_data, field)
+            for field, field_value in values.items():
                 setattr(user, field, field_value)
             try:
                 await session.commit()
@@ -69,6 +81,9 @@ class UserService:
                 raise ConflictError("ConflictError")
             return user
 
+    async def check_password(self, user: User, password: str) -> bool:
+        return await self.password_hasher.check(user.password, password)
+
     async def delete_user(self, user_id: str):
         async with self.postgres_session() as session:
             stmt = await session.scalars(select(User).filter_by(id=user_id))
@@ -83,5 +98,8 @@ class UserService:
 
 def get_user_service(
     postgres_session: AsyncSession = Depends(get_postgres_session),
+    password_hasher: PasswordHasher = Depends(get_password_hasher),
 ) -> UserService:
-    return UserService(postgres_session=postgres_session)
+    return UserService(
+        postgres_session=postgres_session, password_hasher=password_hasher
+    )
@@ -1,12 +1,39 @@
+from collections import defaultdict
+from random import randrange
+from uuid import uuid4
+
 from db.postgres import get_postgres_session
 from fastapi.params import Depends
-from models import Wallet
+from models import BalanceCheckpoint, Wallet, WalletBalanceShard
 from schemas.wallet import CreateWalletSchema, UpdateWalletSchema
 from services.exceptions import (ConflictError, ObjectAlreadyExistsException,
                                  ObjectNotFoundError)
-from sqlalchemy import select
+from sqlalchemy import (BigInteger, cast, delete, exists, func, insert, select,
+                        update)
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+
+SHARD_PICK_RANGE = 2**31 - 1
+
+
+def wallet_balance():
+    """Exact balance of `Wallet`: its amount plus the amounts of its shards."""
+    shards = (
+        select(cast(func.coalesce(func.sum(WalletBalanceShard.amount), 0), BigInteger))
+        .where(WalletBalanceShard.wallet_id == Wallet.id)
+        .scalar_subquery()
+    )
+    return Wallet.amount + shards
+
+
+def with_balances(rows) -> list[Wallet]:
+    """Wallets of (wallet, balance) rows with the amount set to the balance."""
+    wallets = []
+    for wallet, balance in rows:
+        set_committed_value(wallet, "amount", balance)
+        wallets.append(wallet)
+    return wallets
 
 
 class WalletService:
@@ -33,26 +60,41 @@ class WalletService:
 
     async def get_wallet_by_id(self, wallet_id: str):
         async with self.postgres_session() as session:
-            stmt = await session.scalars(select(Wallet).filter_by(id=wallet_id))
-            wallet = stmt.first()
+            result = await session.execute(
+                select(Wallet, wallet_balance()).filter_by(id=wallet_id)
+            )
+            wallets = with_balances(result.all())
 
-            if wallet is None:
+            if not wallets:
                 raise ObjectNotFoundError("Wallet not found")
 
-            return wallet
+            return wallets[0]
 
     async def get_wallets_by_user_id(self, user_id: str):
         async with self.postgres_session() as session:
-            stmt = await session.scalars(select(Wallet).filter_by(user_id=user_id))
-            wallets = stmt.all()
+            result = await session.execute(
+                select(Wallet, wallet_balance()).filter_by(user_id=user_id)
+            )
+            wallets = with_balances(result.all())
 
             if wallets is None:
                 raise ObjectNotFoundError("Wallets not found")
 
             return wallets
 
+    async def get_wallets_by_ids(self, wallet_ids: list[str]):
+        async with self.postgres_session() as session:
+            result = await session.execute(
+                select(Wallet, wallet_balance()).where(Wallet.id.in_(wallet_ids))
+            )
+            return with_balances(result.all())
+
     async def update_wallet(self, wallet_id: str, wallet_data: UpdateWalletSchema):
         async with self.postgres_session() as session:
+            # The new amount replaces the whole balance, shards included
+            if "amount" in wallet_data.model_fields_set:
+                await fold_shards(session, [wallet_id])
+
             stmt = await session.scalars(select(Wallet).filter_by(id=wallet_id))
 
             wallet = stmt.first()
@@ -60,9 +102,16 @@ class WalletService:
             if wallet is None:
                 raise ObjectNotFoundError("Wallet not found!")
 
+            amount = wallet.amount
             for field in wallet_data.model_fields_set:
                 field_value = getattr(wallet_data, field)
                 setattr(wallet, field, field_value)
+
+            # A manual correction of the balance starts from a new checkpoint
+            if wallet.amount != amount:
+                await session.execute(
+                    delete(BalanceCheckpoint).filter_by(wallet_id=wallet.id)
+                )
             try:
                 await session.commit()
             except IntegrityError:
@@ -80,6 +129,179 @@ class WalletService:
             await session.delete(wallet)
             await session.commit()
 
+    async def set_balance_shards(self, wallet_id: str, shards: int):
+        """
+        Spreads the balance of the wallet over `shards` rows, 0 turns it off.
+
+        The current shards are folded into the wallet amount first, so the
+        balance does not change.
+        """
+        async with self.postgres_session() as session:
+            async with session.begin():
+                await fold_shards(session, [wallet_id])
+                stmt = await session.scalars(select(Wallet).filter_by(id=wallet_id))
+                wallet = stmt.first()
+
+                if wallet is None:
+                    raise ObjectNotFoundError("Wallet not found!")
+
+                await session.execute(
+                    delete(WalletBalanceShard).filter_by(wallet_id=wallet.id)
+                )
+                if shards:
+                    await session.execute(
+                        insert(WalletBalanceShard),
+                        [
+                            {
+                                "id": uuid4(),
+                                "wallet_id": wallet.id,
+                                "shard": shard,
+                                "amount": 0,
+                            }
+                            for shard in range(shards)
+                        ],
+                    )
+                wallet.balance_shards = shards
+            return wallet
+
+    async def fold_balance_shards(self, chunk_size: int = 500) -> int:
+        """
+        Folds the shards of every sharded wallet into the wallet amount,
+        `chunk_size` wallets per transaction. Returns the number of wallets.
+        """
+        async with self.postgres_session() as session:
+            stmt = await session.scalars(
+                select(Wallet.id).where(Wallet.balance_shards > 0).order_by(Wallet.id)
+            )
+            wallet_ids = stmt.all()
+
+        for i in range(0, len(wallet_ids), chunk_size):
+            async with self.postgres_session() as session:
+                async with session.begin():
+                    await fold_shards(session, wallet_ids[i : i + chunk_size])
+        return len(wallet_ids)
+
+
+async def lock_wallets(session: AsyncSession, wallet_ids: list) -> list:
+    """
+    Locks the wallet rows and then their shards, so no write to the wallets
+    is in flight until the transaction ends. Returns the shard
+    (id, wallet id, amount) rows.
+    """
+    await session.execute(
+        select(Wallet.id)
+        .where(Wallet.id.in_(wallet_ids))
+        .order_by(Wallet.id)
+        .with_for_update()
+    )
+    result = await session.execute(
+        select(
+            WalletBalanceShard.id,
+            WalletBalanceShard.wallet_id,
+            WalletBalanceShard.amount,
+        )
+        .where(WalletBalanceShard.wallet_id.in_(wallet_ids))
+        .order_by(WalletBalanceShard.wallet_id, WalletBalanceShard.shard)
+        .with_for_update()
+    )
+    return result.all()
+
+
+async def fold_shards(session: AsyncSession, wallet_ids: list) -> None:
+    """Moves the shard amounts of the wallets into the wallet amounts."""
+    deltas = defaultdict(int)
+    shard_ids = []
+    for shard_id, wallet_id, amount in await lock_wallets(session, wallet_ids):
+        if amount:
+            deltas[wallet_id] += amount
+            shard_ids.append(shard_id)
+
+    if shard_ids:
+        await session.execute(
+            update(WalletBalanceShard)
+            .where(WalletBalanceShard.id.in_(shard_ids))
+            .values(amount=0)
+            .execution_options(synchronize_session=False)
+        )
+    for wallet_id in sorted(deltas, key=str):
+        await add_wallet_amount(session, wallet_id, deltas[wallet_id])
+
+
+async def add_wallet_amount(session: AsyncSession, wallet_id, delta: int) -> None:
+    await session.execute(
+        update(Wallet)
+        .where(Wallet.id == wallet_id)
+        .values(amount=Wallet.amount + delta)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def apply_wallet_delta(session: AsyncSession, wallet_id, delta: int) -> int:
+    """
+    Atomically adds `delta` to the wallet balance in the session's transaction
+    and returns the new balance.
+
+    The change is a single `UPDATE ... SET amount = amount + :delta RETURNING`,
+    so concurrent writers serialize on the row lock instead of losing updates.
+    Wallets with balance shards get the delta on a random shard instead and
+    leave the wallet row alone, so their writers only queue up behind writers
+    that picked the same shard. Both updates are one statement, the wallet
+    row is updated only if no shard was.
+    """
+    # The shard is picked from a number drawn here, a random() in the query
+    # would be drawn again when the update has to wait for the shard row
+    pick = (
+        select(randrange(SHARD_PICK_RANGE) % func.nullif(Wallet.balance_shards, 0))
+        .where(Wallet.id == wallet_id)
+        .scalar_subquery()
+    )
+    shard = (
+        update(WalletBalanceShard)
+        .where(
+            WalletBalanceShard.wallet_id == wallet_id,
+            WalletBalanceShard.shard == pick,
+        )
+        .values(amount=WalletBalanceShard.amount + delta)
+        .returning(WalletBalanceShard.id)
+        .cte("shard_delta")
+    )
+    wallet = (
+        update(Wallet)
+        .where(Wallet.id == wallet_id, ~exists(shard.select()))
+        .values(amount=Wallet.amount + delta)
+        .returning(Wallet.amount)
+        .cte("wallet_delta")
+    )
+    result = await session.execute(
+        select(
+            select(wallet.c.amount).scalar_subquery(),
+            exists(shard.select()),
+            # Subqueries see the shards as of the statement start
+            select(wallet_balance()).where(Wallet.id == wallet_id).scalar_subquery()
+            + delta,
+        ).execution_options(synchronize_session=False)
+    )
+    amount, sharded, balance = result.one()
+
+    if amount is not None:
+        return amount
+    if not sharded:
+        raise ObjectNotFoundError("Wallet not found!")
+    return balance
+
+
+async def apply_wallet_deltas(session: AsyncSession, deltas: dict) -> None:
+    """
+    Applies per-wallet balance deltas, locking wallets in a deterministic order.
+
+    Wallets that were detached (`None`) and zero deltas are skipped.
+    """
+    for wallet_id in sorted(
+        (wallet_id for wallet_id, delta in deltas.items() if delta and wallet_id),
+        key=str,
+    ):
+        await apply_wallet_delta(session, wallet_id, deltas[wallet_id])
+
 
 def get_wallet_service(
     postgres_session: AsyncSession = Depends(get_postgres_session),
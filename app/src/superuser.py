@@ -7,6 +7,7 @@ from models import Role, User
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import (AsyncSession, async_sessionmaker,
                                     create_async_engine)
+from werkzeug.security import generate_password_hash
 
 app = typer.Typer()
 
@@ -28,7 +29,10 @@ async def create_superuser(login: str, password: str):
                 session.add(admin_role)
                 await session.commit()
             superuser = User(
-                login=login, password=password, first_name=None, last_name=None
+                login=login,
+                password_hash=generate_password_hash(password),
+                first_name=None,
+                last_name=None,
             )
             superuser.roles.append(admin_role)
             session.add(superuser)
@@ -21,4 +21,5 @@ pytest_plugins = [
     "tests.functional.fixtures.test_data.users",
     "tests.functional.fixtures.test_data.roles",
     "tests.functional.fixtures.test_data.wallets",
+    "tests.functional.fixtures.test_data.dataset",
 ]
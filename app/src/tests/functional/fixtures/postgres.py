@@ -1,5 +1,6 @@
 import pytest_asyncio
 from models import Base
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import (AsyncSession, async_sessionmaker,
                                     create_async_engine)
 from tests.functional.settings import settings
@@ -28,3 +29,22 @@ async def db_session(prepare_database):
     async with test_sessionmaker() as session:
         yield session
         await session.rollback()
+
+
+@pytest_asyncio.fixture(loop_scope="function")
+async def session_factory(prepare_database):
+    return async_sessionmaker(
+        bind=prepare_database, expire_on_commit=False, class_=AsyncSession
+    )
+
+
+@pytest_asyncio.fixture(loop_scope="function")
+async def captured_statements(prepare_database):
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(prepare_database.sync_engine, "before_cursor_execute", capture)
+    yield statements
+    event.remove(prepare_database.sync_engine, "before_cursor_execute", capture)
@@ -0,0 +1,129 @@
+from datetime import datetime, timedelta, timezone
+from random import choice, randint
+from uuid import uuid4
+
+import pytest_asyncio
+from models import (CategoryMonthlyTotal, CurrencyEnum, IncomingCategory,
+                    IncomingTransaction, OutgoingCategory, OutgoingTransaction,
+                    RefreshToken, User, Wallet)
+from services.auth_service import hash_refresh_token
+from sqlalchemy import delete, insert, text
+from tests.functional.fixtures.postgres import db_session
+
+DATASET_USERS = 20
+DATASET_CATEGORIES = 20
+DATASET_WALLETS_PER_USER = 10
+DATASET_TRANSACTIONS_PER_WALLET = 50
+DATASET_REFRESH_TOKENS_PER_USER = 50
+DATASET_HISTORY_DAYS = 3 * 365
+
+
+@pytest_asyncio.fixture(loop_scope="function")
+async def seed_dataset(db_session):
+    """Наполняем базу объемом данных, на котором видны планы запросов"""
+    now = datetime.now(timezone.utc)
+    suffix = uuid4().hex[:8]
+
+    users = [
+        {"id": uuid4(), "login": f"dataset_{suffix}_{i}", "password": "password"}
+        for i in range(DATASET_USERS)
+    ]
+    incoming_categories = [
+        {"id": uuid4(), "name": f"Dataset category {suffix} {i}"}
+        for i in range(DATASET_CATEGORIES)
+    ]
+    outgoing_categories = [
+        {"id": uuid4(), "name": f"Dataset category {suffix} {i}"}
+        for i in range(DATASET_CATEGORIES)
+    ]
+    wallets = [
+        {
+            "id": uuid4(),
+            "name": f"Dataset wallet {i}",
+            "amount": 0,
+            "currency": CurrencyEnum.USD,
+            "user_id": user["id"],
+        }
+        for user in users
+        for i in range(DATASET_WALLETS_PER_USER)
+    ]
+
+    def transactions(categories):
+        return [
+            {
+                "id": uuid4(),
+                "amount": randint(1, 1000),
+                "description": "",
+                "date": now
+                - timedelta(minutes=randint(0, DATASET_HISTORY_DAYS * 1440)),
+                "category_id": choice(categories)["id"],
+                "wallet_id": wallet["id"],
+                "user_id": wallet["user_id"],
+            }
+            for wallet in wallets
+            for _ in range(DATASET_TRANSACTIONS_PER_WALLET)
+        ]
+
+    refresh_token_values = {
+        uuid4().hex: user["id"]
+        for user in users
+        for _ in range(DATASET_REFRESH_TOKENS_PER_USER)
+    }
+    refresh_tokens = [
+        {
+            "id": uuid4(),
+            "token_hash": hash_refresh_token(token),
+            "expires_at": datetime.now() + timedelta(days=1),
+            "user_id": user_id,
+        }
+        for token, user_id in refresh_token_values.items()
+    ]
+
+    await db_session.execute(insert(User), users)
+    await db_session.execute(insert(IncomingCategory), incoming_categories)
+    await db_session.execute(insert(OutgoingCategory), outgoing_categories)
+    await db_session.execute(insert(Wallet), wallets)
+    await db_session.execute(
+        insert(IncomingTransaction), transactions(incoming_categories)
+    )
+    await db_session.execute(
+        insert(OutgoingTransaction), transactions(outgoing_categories)
+    )
+    await db_session.execute(insert(RefreshToken), refresh_tokens)
+    await db_session.commit()
+
+    for table in (
+        "ledgerentry",
+        "wallet",
+        "refreshtoken",
+    ):
+        await db_session.execute(text(f"ANALYZE {table}"))
+    await db_session.commit()
+
+    yield {
+        "users": users,
+        "incoming_categories": incoming_categories,
+        "outgoing_categories": outgoing_categories,
+        "wallets": wallets,
+        "refresh_tokens": refresh_tokens,
+        "refresh_token_values": list(refresh_token_values),
+    }
+
+    user_ids = [user["id"] for user in users]
+    for model in (
+        RefreshToken,
+        IncomingTransaction,
+        OutgoingTransaction,
+        CategoryMonthlyTotal,
+        Wallet,
+    ):
+        await db_session.execute(delete(model).where(model.user_id.in_(user_ids)))
+    await db_session.execute(delete(User).where(User.id.in_(user_ids)))
+    for model, categories in (
+        (IncomingCategory, incoming_categories),
+        (OutgoingCategory, outgoing_categories),
+    ):
+        await db_session.execute(
+            delete(model).where(model.id.in_([c["id"] for c in categories]))
+        )
+    await db_session.commit()
@@ -3,6 +3,7 @@ from uuid import uuid4
 import pytest_asyncio
 from models import User
 from tests.functional.fixtures.postgres import db_session
+from werkzeug.security import generate_password_hash
 
 
 @pytest_asyncio.fixture(loop_scope="function")
@@ -11,7 +12,7 @@ async def create_users(db_session):
     for i in range(3):
         user = User(
             login=f"Login_{i}",
-            password=f"password_{i}",
+            password_hash=generate_password_hash(f"password_{i}"),
             first_name=f"First_{i}",
             last_name=f"Last_{i}",
         )
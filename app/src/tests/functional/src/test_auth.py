@@ -0,0 +1,178 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+from http import HTTPStatus
+from uuid import uuid4
+
+import pytest
+from models import RefreshToken
+from services.auth_service import AuthService, hash_refresh_token
+from sqlalchemy import func, insert, select
+from tests.functional.fixtures.auth import auth_header
+from utils import auth
+from utils.bloom import BloomFilter
+from utils.revocation import RevokedTokens, revoked_jti_key
+
+
+class TestAuth:
+    def setup_method(self):
+        self.endpoint = "/api/v1/wallets/users/"
+
+    @pytest.mark.asyncio
+    async def test_revoked_token(
+        self, client, session_factory, redis_client, create_users
+    ):
+        """Отозванный токен не принимается ресурсными эндпоинтами"""
+        user_id = str(create_users[0].id)
+        headers = auth_header([], user_id)
+
+        response = await client.get(f"{self.endpoint}{user_id}", headers=headers)
+        assert response.status_code == HTTPStatus.OK
+
+        token = headers["Authorization"].removeprefix("Bearer ")
+        await AuthService(session_factory, redis_client).invalidate_access_token(token)
+
+        # Токен уже в кэше проверенных, но отзыв все равно виден
+        response = await client.get(f"{self.endpoint}{user_id}", headers=headers)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+        response = await client.get(
+            f"{self.endpoint}{user_id}",
+            headers={"Authorization": "Bearer invalid"},
+        )
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+    @pytest.mark.asyncio
+    async def test_revocation_expires_with_token(self, session_factory, redis_client):
+        """Отзыв хранится по jti ровно до истечения токена"""
+        token = auth_header([])["Authorization"].removeprefix("Bearer ")
+        payload = auth.decode_token(token)
+        service = AuthService(session_factory, redis_client)
+
+        assert await service.is_access_token_valid(token)
+        await service.invalidate_access_token(token)
+        assert not await service.is_access_token_valid(token)
+
+        key = revoked_jti_key(payload["jti"])
+        ttl = await redis_client.ttl(key)
+        assert abs(ttl - (payload["exp"] - time.time())) <= 1
+
+    @pytest.mark.asyncio
+    async def test_revoked_filter_sync(self, redis_client):
+        """Фильтр отозванных jti заполняется из Redis и через pub/sub"""
+        writer = RevokedTokens(1000, 0.001, 3600)
+        reader = RevokedTokens(1000, 0.001, 3600)
+        exp = int(time.time()) + 60
+
+        await writer.revoke(redis_client, "revoked-before-start", exp)
+        reader.start(redis_client)
+        try:
+            for _ in range(50):
+                if reader.synced:
+                    break
+                await asyncio.sleep(0.1)
+            assert reader.synced
+            assert "revoked-before-start" in reader.filter
+
+            await writer.revoke(redis_client, "revoked-after-start", exp)
+            for _ in range(50):
+                if "revoked-after-start" in reader.filter:
+                    break
+                await asyncio.sleep(0.1)
+            assert "revoked-after-start" in reader.filter
+            assert await reader.is_revoked(redis_client, "revoked-after-start")
+            assert not await reader.is_revoked(redis_client, "not-revoked")
+        finally:
+            await reader.close()
+
+    def test_bloom_filter(self):
+        """Bloom-фильтр без ложноотрицательных ответов и с заданной долей ложноположительных"""
+        bloom = BloomFilter(10000, 0.01)
+        for n in range(10000):
+            bloom.add(f"added-{n}")
+
+        assert all(f"added-{n}" in bloom for n in range(10000))
+        false_positives = sum(f"absent-{n}" in bloom for n in range(10000))
+        assert false_positives < 200
+
+    def test_verified_token_cache(self, monkeypatch):
+        """Подпись токена проверяется один раз, кэш ограничен по размеру"""
+        cache = auth.VerifiedTokenCache(max_size=2, ttl=60)
+        monkeypatch.setattr(auth, "verified_tokens", cache)
+        decode_calls = []
+        decode_token = auth.decode_token
+        monkeypatch.setattr(
+            auth,
+            "decode_token",
+            lambda token: decode_calls.append(token) or decode_token(token),
+        )
+        tokens = [
+            auth_header([], str(n))["Authorization"].removeprefix("Bearer ")
+            for n in range(3)
+        ]
+
+        for token in [tokens[0], tokens[0], tokens[1], tokens[0]]:
+            assert auth.verify_token(token) is not None
+        assert decode_calls == tokens[:2]
+
+        # Вытесняется давно не использованный токен
+        auth.verify_token(tokens[2])
+        auth.verify_token(tokens[0])
+        auth.verify_token(tokens[1])
+        assert decode_calls == tokens[:3] + [tokens[1]]
+
+        # Неверные токены не кэшируются
+        assert auth.verify_token("invalid") is None
+        assert auth.verify_token("invalid") is None
+        assert decode_calls[-2:] == ["invalid", "invalid"]
+
+    @pytest.mark.asyncio
+    async def test_refresh_token_rotation(self, client, session_factory, create_users):
+        """Refresh токен хранится как хеш и действует только один раз"""
+        response = await client.post(
+            "/api/v1/auth/login",
+            json={"login": "Login_0", "password": "password_0"},
+        )
+        assert response.status_code == HTTPStatus.OK
+        tokens = response.json()
+
+        async with session_factory() as session:
+            stored = await session.scalar(
+                select(RefreshToken.token_hash).filter_by(user_id=create_users[0].id)
+            )
+        assert stored == hash_refresh_token(tokens["refresh_token"])
+
+        response = await client.post("/api/v1/auth/refresh", json=tokens)
+        assert response.status_code == HTTPStatus.OK
+
+        response = await client.post("/api/v1/auth/refresh", json=tokens)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+    @pytest.mark.asyncio
+    async def test_purge_expired_refresh_tokens(self, session_factory, create_users):
+        """Истекшие refresh токены удаляются пачками, действующие остаются"""
+        user_id = create_users[0].id
+        now = datetime.now()
+        async with session_factory() as session:
+            await session.execute(
+                insert(RefreshToken),
+                [
+                    {
+                        "id": uuid4(),
+                        "user_id": user_id,
+                        "token_hash": hash_refresh_token(uuid4().hex),
+                        "expires_at": now + timedelta(days=1 if n % 3 else -1),
+                    }
+                    for n in range(30)
+                ],
+            )
+            await session.commit()
+
+        purged = await AuthService(session_factory, None).purge_expired_refresh_tokens(
+            batch_size=7
+        )
+        assert purged == 10
+
+        async with session_factory() as session:
+            count = await session.scalar(select(func.count()).select_from(RefreshToken))
+        assert count == 20
@@ -0,0 +1,177 @@
+from datetime import date, datetime, timedelta, timezone
+from http import HTTPStatus
+from random import randint
+from uuid import uuid4
+
+import pytest
+from models import IncomingTransaction, OutgoingTransaction
+from services.balance_history_service import balance_history_key
+from sqlalchemy import select
+from tests.functional.fixtures.auth import auth_header
+
+
+async def signed_transactions(session_factory, wallet_id) -> list:
+    rows = []
+    async with session_factory() as session:
+        for model, sign in ((IncomingTransaction, 1), (OutgoingTransaction, -1)):
+            result = await session.execute(
+                select(model.date, model.amount).filter_by(wallet_id=wallet_id)
+            )
+            rows.extend((when, sign * amount) for when, amount in result.all())
+    return rows
+
+
+class TestBalanceHistory:
+    def setup_method(self):
+        self.endpoint = "/api/v1/wallets/"
+
+    async def create_transactions(self, client, wallet, categories, kind, dates):
+        response = await client.post(
+            f"/api/v1/transactions/{kind}/batch",
+            headers=auth_header([], str(wallet.user_id)),
+            json={
+                "transactions": [
+                    {
+                        "amount": randint(1, 100),
+                        "description": "",
+                        "category_id": str(categories[0].id),
+                        "wallet_id": str(wallet.id),
+                        "date": when.isoformat(),
+                    }
+                    for when in dates
+                ]
+            },
+        )
+        assert response.status_code == HTTPStatus.OK
+
+    @pytest.mark.asyncio
+    async def test_balance_history(
+        self,
+        client,
+        session_factory,
+        redis_client,
+        create_wallets,
+        create_incoming_categories,
+        create_outgoing_categories,
+    ):
+        """История баланса кошелька по дням, неделям и месяцам"""
+        wallet = create_wallets[0]
+        headers = auth_header([], str(wallet.user_id))
+        now = datetime.now(timezone.utc)
+
+        dates = [now - timedelta(days=days, hours=1) for days in range(0, 900, 7)]
+        await self.create_transactions(
+            client, wallet, create_incoming_categories, "incoming", dates
+        )
+        await self.create_transactions(
+            client, wallet, create_outgoing_categories, "outgoing", dates[::3]
+        )
+
+        response = await client.get(
+            f"{self.endpoint}{wallet.id}/balance-history", headers=headers
+        )
+        assert response.status_code == HTTPStatus.OK
+        points = response.json()
+
+        assert [point["period"] for point in points[-90:]] == ["day"] * 90
+        assert {point["period"] for point in points} == {"day", "week", "month"}
+        assert points[-1]["date"] == now.date().isoformat()
+
+        # Баланс на конец периода равен текущему минус все более поздние транзакции
+        response = await client.get(f"{self.endpoint}{wallet.id}", headers=headers)
+        current = response.json()["amount"]
+        transactions = await signed_transactions(session_factory, wallet.id)
+        ends = [point["date"] for point in points[1:]] + [
+            (now.date() + timedelta(days=1)).isoformat()
+        ]
+        for point, end in zip(points, ends):
+            end = datetime.combine(date.fromisoformat(end), datetime.min.time())
+            end = end.replace(tzinfo=timezone.utc)
+            assert point["amount"] == current - sum(
+                amount for when, amount in transactions if when >= end
+            ), point
+
+        # Повторный запрос отдается из кэша, новая транзакция его сбрасывает
+        assert await redis_client.exists(balance_history_key(wallet.id))
+        await self.create_transactions(
+            client, wallet, create_outgoing_categories, "outgoing", [now]
+        )
+        assert not await redis_client.exists(balance_history_key(wallet.id))
+
+        response = await client.get(
+            f"{self.endpoint}{wallet.id}/balance-history", headers=headers
+        )
+        response_wallet = await client.get(
+            f"{self.endpoint}{wallet.id}", headers=headers
+        )
+        assert response.json()[-1]["amount"] == response_wallet.json()["amount"]
+
+    @pytest.mark.asyncio
+    async def test_balance_history_after_import(
+        self,
+        client,
+        redis_client,
+        create_wallets,
+        create_incoming_categories,
+        create_outgoing_categories,
+    ):
+        """Импорт выписки сбрасывает кэш истории, даже если баланс не изменился"""
+        wallet = create_wallets[0]
+        headers = auth_header([], str(wallet.user_id))
+        now = datetime.now(timezone.utc)
+        await self.create_transactions(
+            client,
+            wallet,
+            create_incoming_categories,
+            "incoming",
+            [now - timedelta(days=10)],
+        )
+
+        response = await client.get(
+            f"{self.endpoint}{wallet.id}/balance-history", headers=headers
+        )
+        history = response.json()
+        assert await redis_client.exists(balance_history_key(wallet.id))
+
+        content = (
+            "date,amount,description\n"
+            f"{(now - timedelta(days=3)).isoformat()},100.00,In\n"
+            f"{now.isoformat()},-100.00,Out\n"
+        )
+        response = await client.post(
+            "/api/v1/transactions/import/",
+            headers=headers,
+            params={
+                "wallet_id": str(wallet.id),
+                "incoming_category_id": str(create_incoming_categories[0].id),
+                "outgoing_category_id": str(create_outgoing_categories[0].id),
+            },
+            content=content,
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert not await redis_client.exists(balance_history_key(wallet.id))
+
+        response = await client.get(
+            f"{self.endpoint}{wallet.id}/balance-history", headers=headers
+        )
+        # Текущий баланс тот же, но три дня назад он был на 100.00 больше
+        points = response.json()
+        assert points[-1]["amount"] == history[-1]["amount"]
+        assert points[-3]["amount"] == history[-3]["amount"] + 10000
+
+    @pytest.mark.asyncio
+    async def test_balance_history_access(self, client, create_wallets):
+        """История баланса чужого и несуществующего кошелька"""
+        wallet = create_wallets[0]
+
+        response = await client.get(
+            f"{self.endpoint}{wallet.id}/balance-history",
+            headers=auth_header([], str(uuid4())),
+        )
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+        response = await client.get(
+            f"{self.endpoint}{uuid4()}/balance-history",
+            headers=auth_header([], str(wallet.user_id)),
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND
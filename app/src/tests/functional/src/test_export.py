@@ -0,0 +1,71 @@
+import csv
+import io
+from http import HTTPStatus
+from uuid import uuid4
+
+import orjson
+import pytest
+from tests.functional.fixtures.auth import auth_header
+from tests.functional.fixtures.test_data.dataset import (
+    DATASET_TRANSACTIONS_PER_WALLET, DATASET_WALLETS_PER_USER)
+
+USER_TRANSACTIONS = DATASET_WALLETS_PER_USER * DATASET_TRANSACTIONS_PER_WALLET
+
+
+class TestExport:
+    def setup_method(self):
+        self.endpoint = "/api/v1/transactions/export/users/"
+
+    @pytest.mark.asyncio
+    async def test_export_ndjson(self, client, seed_dataset):
+        """Выгружаем транзакции пользователя в NDJSON"""
+        user_id = str(seed_dataset["users"][0]["id"])
+        headers = auth_header([], user_id)
+
+        response = await client.get(self.endpoint + user_id, headers=headers)
+        assert response.status_code == HTTPStatus.OK
+        assert response.headers["content-type"] == "application/x-ndjson"
+
+        rows = [orjson.loads(line) for line in response.text.splitlines()]
+        assert len(rows) == 2 * USER_TRANSACTIONS
+        assert len({row["id"] for row in rows}) == len(rows)
+        assert {row["type"] for row in rows} == {"incoming", "outgoing"}
+
+        # Только расходы
+        response = await client.get(
+            self.endpoint + user_id, headers=headers, params={"type": "outgoing"}
+        )
+        rows = [orjson.loads(line) for line in response.text.splitlines()]
+        assert len(rows) == USER_TRANSACTIONS
+        assert [row["date"] for row in rows] == sorted(row["date"] for row in rows)
+
+    @pytest.mark.asyncio
+    async def test_export_csv_gzip(self, client, seed_dataset):
+        """Выгружаем транзакции пользователя в CSV со сжатием"""
+        user_id = str(seed_dataset["users"][0]["id"])
+
+        response = await client.get(
+            self.endpoint + user_id,
+            headers=auth_header([], user_id),
+            params={"format": "csv", "gzip": True},
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.headers["content-encoding"] == "gzip"
+
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert len(rows) == 2 * USER_TRANSACTIONS
+        assert all(int(row["amount"]) > 0 for row in rows)
+        assert all(row["wallet_id"] for row in rows)
+
+    @pytest.mark.asyncio
+    async def test_export_forbidden(self, client, seed_dataset):
+        """Чужие транзакции не выгружаются"""
+        user_id = str(seed_dataset["users"][0]["id"])
+
+        response = await client.get(
+            self.endpoint + user_id, headers=auth_header([], str(uuid4()))
+        )
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+        response = await client.get(self.endpoint + user_id)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
@@ -0,0 +1,128 @@
+from datetime import datetime, timezone
+from http import HTTPStatus
+
+import pytest
+from models import Wallet
+from schemas.outgoing_transaction import CreateOutgoingTransactionSchema
+from services.transaction_service import OutgoingTransactionService
+from sqlalchemy import update
+from tests.functional.fixtures.auth import auth_header
+
+RATES = [
+    {"currency": "EUR", "date": "2025-01-01", "rate": "1.10"},
+    {"currency": "EUR", "date": "2025-01-03", "rate": "1.20"},
+    {"currency": "RUB", "date": "2025-01-01", "rate": "0.01"},
+]
+
+
+async def set_currency(session_factory, wallet, currency):
+    async with session_factory() as session:
+        await session.execute(
+            update(Wallet).filter_by(id=wallet.id).values(currency=currency)
+        )
+        await session.commit()
+
+
+class TestFxRates:
+    def setup_method(self):
+        self.endpoint = "/api/v1/fx-rates/"
+        self.reports_endpoint = "/api/v1/reports/users/"
+
+    @pytest.mark.asyncio
+    async def test_load_rates(self, client, access_token_admin, create_users):
+        """Загрузка курсов доступна только администратору"""
+        response = await client.post(
+            self.endpoint, json=RATES, headers=auth_header([], str(create_users[0].id))
+        )
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+        response = await client.post(
+            self.endpoint, json=RATES, headers=access_token_admin
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == {"loaded": 3}
+
+        # Повторная загрузка заменяет курс той же даты
+        response = await client.post(
+            self.endpoint,
+            json=[RATES[0] | {"rate": "1.15"}],
+            headers=access_token_admin,
+        )
+        assert response.json() == {"loaded": 1}
+
+    @pytest.mark.asyncio
+    async def test_net_worth(
+        self, client, session_factory, access_token_admin, create_wallets
+    ):
+        """Сумма балансов кошельков в валютах по последним курсам"""
+        await client.post(self.endpoint, json=RATES, headers=access_token_admin)
+        user_id = create_wallets[0].user_id
+        wallets = [w for w in create_wallets if w.user_id == user_id]
+        eur, rub = wallets[0], wallets[1]
+        await set_currency(session_factory, eur, "EUR")
+        await set_currency(session_factory, rub, "RUB")
+        usd = sum(w.amount for w in wallets[2:])
+
+        headers = auth_header([], str(user_id))
+        url = f"{self.reports_endpoint}{user_id}/net-worth"
+
+        response = await client.get(url, params={"currency": "USD"}, headers=headers)
+        assert response.status_code == HTTPStatus.OK
+        expected = usd + eur.amount * 1.2 + rub.amount * 0.01
+        assert response.json()["amount"] == pytest.approx(expected, abs=1)
+
+        response = await client.get(url, params={"currency": "EUR"}, headers=headers)
+        assert response.json()["amount"] == pytest.approx(expected / 1.2, abs=1)
+
+        # Нет курса для валюты кошелька
+        await set_currency(session_factory, rub, "KZT")
+        response = await client.get(url, params={"currency": "USD"}, headers=headers)
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    @pytest.mark.asyncio
+    async def test_total_spend(
+        self,
+        client,
+        session_factory,
+        redis_client,
+        access_token_admin,
+        create_wallets,
+        create_outgoing_categories,
+    ):
+        """Расходы переводятся по курсу на дату каждой транзакции"""
+        await client.post(self.endpoint, json=RATES, headers=access_token_admin)
+        wallet = create_wallets[0]
+        await set_currency(session_factory, wallet, "EUR")
+        service = OutgoingTransactionService(session_factory, redis_client)
+        for day, amount in ((2, 100), (2, 50), (4, 100), (5, 10)):
+            await service.create_transaction(
+                CreateOutgoingTransactionSchema(
+                    amount=amount,
+                    description="",
+                    category_id=create_outgoing_categories[0].id,
+                    wallet_id=wallet.id,
+                    user_id=wallet.user_id,
+                    date=datetime(2025, 1, day, 12, tzinfo=timezone.utc),
+                )
+            )
+
+        response = await client.get(
+            f"{self.reports_endpoint}{wallet.user_id}/total-spend",
+            params={
+                "currency": "USD",
+                "date_from": "2025-01-01T00:00:00",
+                "date_to": "2025-01-05T00:00:00",
+            },
+            headers=auth_header([], str(wallet.user_id)),
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()["amount"] == 150 * 1.1 + 100 * 1.2
+
+        # Без date_to расходы считаются по текущий момент
+        response = await client.get(
+            f"{self.reports_endpoint}{wallet.user_id}/total-spend",
+            params={"currency": "USD", "date_from": "2024-12-31T00:00:00"},
+            headers=auth_header([], str(wallet.user_id)),
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()["amount"] == 150 * 1.1 + 100 * 1.2 + 10 * 1.2
@@ -0,0 +1,142 @@
+import asyncio
+import logging
+import time
+from random import choice, randint
+from uuid import uuid4
+
+import pytest
+from models import LedgerEntry, Wallet
+from schemas.incoming_transaction import CreateIncomingTransactionSchema
+from schemas.outgoing_transaction import CreateOutgoingTransactionSchema
+from services.exceptions import ObjectNotFoundError
+from services.group_commit_service import GroupCommitter
+from services.transaction_service import (IncomingTransactionService,
+                                          OutgoingTransactionService)
+from sqlalchemy import func, select
+
+logger = logging.getLogger(__name__)
+
+CONCURRENT_TRANSACTIONS = 2000
+
+
+class TestGroupCommit:
+    @pytest.mark.asyncio
+    async def test_concurrent_create_transactions(
+        self,
+        session_factory,
+        redis_client,
+        create_wallets,
+        create_incoming_categories,
+        create_outgoing_categories,
+    ):
+        """Параллельные транзакции записываются общими коммитами"""
+        wallet = create_wallets[0]
+        committer = GroupCommitter(session_factory, redis_client, 5, 500)
+        incoming_service = IncomingTransactionService(
+            session_factory, redis_client, committer
+        )
+        outgoing_service = OutgoingTransactionService(
+            session_factory, redis_client, committer
+        )
+
+        incoming = [randint(1, 100) for _ in range(CONCURRENT_TRANSACTIONS // 2)]
+        outgoing = [randint(1, 100) for _ in range(CONCURRENT_TRANSACTIONS // 2)]
+
+        tasks = [
+            incoming_service.create_transaction(
+                CreateIncomingTransactionSchema(
+                    amount=amount,
+                    description="",
+                    category_id=choice(create_incoming_categories).id,
+                    wallet_id=wallet.id,
+                    user_id=wallet.user_id,
+                )
+            )
+            for amount in incoming
+        ] + [
+            outgoing_service.create_transaction(
+                CreateOutgoingTransactionSchema(
+                    amount=amount,
+                    description="",
+                    category_id=choice(create_outgoing_categories).id,
+                    wallet_id=wallet.id,
+                    user_id=wallet.user_id,
+                )
+            )
+            for amount in outgoing
+        ]
+
+        started = time.perf_counter()
+        transactions = await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+        await committer.close()
+
+        logger.info(
+            "%s concurrent transactions with group commit in %.2fs (%.0f tx/s)",
+            CONCURRENT_TRANSACTIONS,
+            elapsed,
+            CONCURRENT_TRANSACTIONS / elapsed,
+        )
+
+        assert len({t.id for t in transactions}) == CONCURRENT_TRANSACTIONS
+        async with session_factory() as session:
+            amount = await session.scalar(select(Wallet.amount).filter_by(id=wallet.id))
+            count = await session.scalar(
+                select(func.count()).where(LedgerEntry.wallet_id == wallet.id)
+            )
+        assert amount == wallet.amount + sum(incoming) - sum(outgoing)
+        assert count == CONCURRENT_TRANSACTIONS
+
+    @pytest.mark.asyncio
+    async def test_per_caller_errors(
+        self,
+        session_factory,
+        redis_client,
+        captured_statements,
+        create_wallets,
+        create_outgoing_categories,
+    ):
+        """Ошибка одной транзакции не мешает остальным в том же коммите"""
+        committer = GroupCommitter(session_factory, redis_client, 50, 500)
+        service = OutgoingTransactionService(session_factory, redis_client, committer)
+
+        def transaction(wallet_id):
+            return CreateOutgoingTransactionSchema(
+                amount=10,
+                description="",
+                category_id=create_outgoing_categories[0].id,
+                wallet_id=wallet_id,
+                user_id=create_wallets[0].user_id,
+            )
+
+        # Без ошибок все транзакции попадают в один INSERT
+        await asyncio.gather(
+            *(service.create_transaction(transaction(w.id)) for w in create_wallets)
+        )
+        inserts = [
+            s for s, _ in captured_statements if s.startswith("INSERT INTO ledgerentry")
+        ]
+        assert len(inserts) == 1
+
+        # Несуществующий кошелек отклоняется только для своего вызова
+        results = await asyncio.gather(
+            service.create_transaction(transaction(create_wallets[0].id)),
+            service.create_transaction(transaction(uuid4())),
+            service.create_transaction(transaction(create_wallets[1].id)),
+            return_exceptions=True,
+        )
+        await committer.close()
+
+        assert isinstance(results[1], ObjectNotFoundError)
+        async with session_factory() as session:
+            amounts = dict(
+                (
+                    await session.execute(
+                        select(Wallet.id, Wallet.amount).where(
+                            Wallet.id.in_([w.id for w in create_wallets[:2]])
+                        )
+                    )
+                ).all()
+            )
+        for wallet in create_wallets[:2]:
+            assert amounts[wallet.id] == wallet.amount - 20
@@ -0,0 +1,101 @@
+import asyncio
+from http import HTTPStatus
+from uuid import uuid4
+
+import pytest
+from models import LedgerEntry, Wallet
+from sqlalchemy import func, select
+from tests.functional.fixtures.auth import auth_header
+
+
+class TestIdempotency:
+    def setup_method(self):
+        self.endpoint = "/api/v1/transactions/outgoing/"
+
+    def transaction(self, wallet, category, amount=10):
+        return {
+            "amount": amount,
+            "description": "",
+            "category_id": str(category.id),
+            "wallet_id": str(wallet.id),
+            "user_id": str(wallet.user_id),
+        }
+
+    @pytest.mark.asyncio
+    async def test_retry(
+        self, client, session_factory, create_wallets, create_outgoing_categories
+    ):
+        """Повторный запрос с тем же ключом возвращает сохраненный ответ"""
+        wallet = create_wallets[0]
+        headers = auth_header([], str(wallet.user_id))
+        headers["Idempotency-Key"] = str(uuid4())
+        data = self.transaction(wallet, create_outgoing_categories[0])
+
+        first = await client.post(self.endpoint, json=data, headers=headers)
+        assert first.status_code == HTTPStatus.OK
+        retry = await client.post(self.endpoint, json=data, headers=headers)
+        assert retry.status_code == HTTPStatus.OK
+        assert retry.json() == first.json()
+
+        async with session_factory() as session:
+            amount = await session.scalar(select(Wallet.amount).filter_by(id=wallet.id))
+        assert amount == wallet.amount - 10
+
+        # Тот же ключ с другим телом запроса отклоняется
+        data["amount"] = 20
+        response = await client.post(self.endpoint, json=data, headers=headers)
+        assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+        # Без ключа каждый запрос создает новую транзакцию
+        del headers["Idempotency-Key"]
+        first = await client.post(self.endpoint, json=data, headers=headers)
+        retry = await client.post(self.endpoint, json=data, headers=headers)
+        assert first.json()["id"] != retry.json()["id"]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_duplicates(
+        self, client, session_factory, create_wallets, create_outgoing_categories
+    ):
+        """Одновременные запросы с одним ключом создают одну транзакцию"""
+        wallet = create_wallets[0]
+        headers = auth_header([], str(wallet.user_id))
+        headers["Idempotency-Key"] = str(uuid4())
+        data = {
+            "transactions": [self.transaction(wallet, create_outgoing_categories[0])]
+        }
+
+        responses = await asyncio.gather(
+            *(
+                client.post(self.endpoint + "batch", json=data, headers=headers)
+                for _ in range(10)
+            )
+        )
+        assert {response.status_code for response in responses} == {HTTPStatus.OK}
+        assert len({response.text for response in responses}) == 1
+
+        async with session_factory() as session:
+            count = await session.scalar(
+                select(func.count()).where(LedgerEntry.wallet_id == wallet.id)
+            )
+        assert count == 1
+
+    @pytest.mark.asyncio
+    async def test_create_wallet(self, client, create_users):
+        """Ключ действует в пределах пользователя"""
+        key = str(uuid4())
+        ids = []
+        for user in create_users[:2]:
+            headers = auth_header([], str(user.id)) | {"Idempotency-Key": key}
+            data = {
+                "name": "wallet",
+                "amount": 100,
+                "currency": "USD",
+                "user_id": str(user.id),
+            }
+            for _ in range(2):
+                response = await client.post(
+                    "/api/v1/wallets/", json=data, headers=headers
+                )
+                assert response.status_code == HTTPStatus.OK
+                ids.append(response.json()["id"])
+        assert ids[0] == ids[1] != ids[2] == ids[3]
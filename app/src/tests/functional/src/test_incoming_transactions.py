@@ -157,10 +157,17 @@ class TestOutgoingTransactions:
         )
         assert response.status_code == HTTPStatus.NOT_FOUND
 
-        # Удаляем пользователем
+        # Удаляем чужим пользователем
         response = await client.delete(
             self.endpoint + transaction_id_2, headers=access_token_user
         )
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+        # Удаляем владельцем
+        user_id = str(create_incoming_transactions[1].user_id)
+        response = await client.delete(
+            self.endpoint + transaction_id_2, headers=auth_header([], user_id)
+        )
         assert response.status_code == HTTPStatus.OK
 
         response = await client.get(
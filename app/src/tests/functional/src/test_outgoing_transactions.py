@@ -41,6 +41,117 @@ class TestOutgoingTransactions:
         response = await client.get(endpoint + user_id)
         assert response.status_code == HTTPStatus.UNAUTHORIZED
 
+    @pytest.mark.asyncio
+    async def test_get_user_transactions_cursor(
+        self, access_token_admin, client, create_outgoing_transactions
+    ):
+        """Листаем транзакции пользователя курсором"""
+        endpoint = "/api/v1/transactions/outgoing/users/"
+        user_id = str(create_outgoing_transactions[0].user_id)
+        user_transactions = [
+            str(t.id) for t in create_outgoing_transactions if str(t.user_id) == user_id
+        ]
+
+        # Проходим все страницы вперед
+        ids = []
+        pages = []
+        cursor = None
+        while True:
+            params = {"size": 40}
+            if cursor:
+                params["cursor"] = cursor
+            response = await client.get(
+                endpoint + user_id, headers=access_token_admin, params=params
+            )
+            assert response.status_code == HTTPStatus.OK
+            pages.append(response.json())
+            ids.extend(item["id"] for item in response.json()["items"])
+            cursor = response.json()["next_page"]
+            if not cursor:
+                break
+
+        assert len(ids) == len(set(ids))
+        assert sorted(ids) == sorted(user_transactions)
+        assert pages[0]["previous_page"] is None
+
+        # Возвращаемся на предыдущую страницу
+        response = await client.get(
+            endpoint + user_id,
+            headers=access_token_admin,
+            params={"size": 40, "cursor": pages[1]["previous_page"]},
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()["items"] == pages[0]["items"]
+
+        # Проверяем некорректный курсор
+        response = await client.get(
+            endpoint + user_id,
+            headers=access_token_admin,
+            params={"cursor": "invalid"},
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    @pytest.mark.asyncio
+    async def test_get_user_transactions_filters(
+        self, access_token_admin, client, create_outgoing_transactions
+    ):
+        """Фильтруем и сортируем транзакции пользователя на сервере"""
+        endpoint = "/api/v1/transactions/outgoing/users/"
+        user_id = str(create_outgoing_transactions[0].user_id)
+        user_transactions = sorted(
+            (t for t in create_outgoing_transactions if str(t.user_id) == user_id),
+            key=lambda t: (t.date, t.id),
+            reverse=True,
+        )
+        dates = sorted(t.date for t in user_transactions)
+        date_from, date_to = dates[len(dates) // 4], dates[-len(dates) // 4]
+        category_ids = list({str(t.category_id) for t in user_transactions})[:2]
+        wallet_ids = list({str(t.wallet_id) for t in user_transactions})[:2]
+
+        filters = {
+            "date_from": date_from.isoformat(),
+            "date_to": date_to.isoformat(),
+            "amount_min": 3,
+            "amount_max": 8,
+            "category_id": category_ids,
+            "wallet_id": wallet_ids,
+            "order": "desc",
+        }
+        expected = [
+            str(t.id)
+            for t in user_transactions
+            if date_from <= t.date <= date_to
+            and 3 <= t.amount <= 8
+            and str(t.category_id) in category_ids
+            and str(t.wallet_id) in wallet_ids
+        ]
+
+        # Проходим все страницы, новые транзакции идут первыми
+        ids = []
+        cursor = None
+        while True:
+            params = {**filters, "size": 3}
+            if cursor:
+                params["cursor"] = cursor
+            response = await client.get(
+                endpoint + user_id, headers=access_token_admin, params=params
+            )
+            assert response.status_code == HTTPStatus.OK
+            ids.extend(item["id"] for item in response.json()["items"])
+            cursor = response.json()["next_page"]
+            if not cursor:
+                break
+
+        assert ids == expected
+
+        # Проверяем некорректный диапазон
+        response = await client.get(
+            endpoint + user_id,
+            headers=access_token_admin,
+            params={"amount_min": 10, "amount_max": 1},
+        )
+        assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
     @pytest.mark.asyncio
     async def test_get_transaction(
         self, access_token_admin, client, create_outgoing_transactions
@@ -53,6 +164,12 @@ class TestOutgoingTransactions:
         assert response.status_code == HTTPStatus.OK
         assert response.json()["id"] == transaction_id
 
+        # Чужая транзакция
+        response = await client.get(
+            self.endpoint + transaction_id, headers=auth_header([])
+        )
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
     @pytest.mark.asyncio
     async def test_get_non_existing_transaction(
         self, access_token_admin, client, create_outgoing_transactions
@@ -134,6 +251,63 @@ class TestOutgoingTransactions:
         assert response.status_code == HTTPStatus.FORBIDDEN
         assert response.json() == {"detail": "Forbidden"}
 
+    @pytest.mark.asyncio
+    async def test_create_transactions_batch(
+        self, client, create_wallets, create_outgoing_categories
+    ):
+        """Создаем транзакции пачкой"""
+        wallet = create_wallets[0]
+        foreign_wallet = create_wallets[-1]
+        category_id = str(create_outgoing_categories[0].id)
+        headers = auth_header([], str(wallet.user_id))
+
+        response = await client.get(
+            f"/api/v1/wallets/{wallet.id}", headers=auth_header(["admin"])
+        )
+        amount = response.json()["amount"]
+
+        transactions = [
+            {
+                "amount": i + 1,
+                "description": "",
+                "category_id": category_id,
+                "wallet_id": str(wallet.id),
+            }
+            for i in range(100)
+        ]
+        # Некорректная сумма, чужой кошелек и несуществующая категория
+        transactions.append({**transactions[0], "amount": -1})
+        transactions.append({**transactions[0], "wallet_id": str(foreign_wallet.id)})
+        transactions.append({**transactions[0], "category_id": str(uuid4())})
+
+        response = await client.post(
+            self.endpoint + "batch",
+            headers=headers,
+            json={"transactions": transactions},
+        )
+        assert response.status_code == HTTPStatus.OK
+        items = response.json()["items"]
+        assert [item["index"] for item in items] == list(range(103))
+        assert all(item["id"] and not item["error"] for item in items[:100])
+        assert all(not item["id"] and item["error"] for item in items[100:])
+
+        response = await client.get(
+            f"/api/v1/wallets/{wallet.id}", headers=auth_header(["admin"])
+        )
+        assert response.json()["amount"] == amount - sum(range(1, 101))
+
+        response = await client.get(
+            self.endpoint + items[0]["id"], headers=auth_header(["admin"])
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()["user_id"] == str(wallet.user_id)
+
+        # Неавторизованный пользователь
+        response = await client.post(
+            self.endpoint + "batch", json={"transactions": transactions}
+        )
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+
     @pytest.mark.asyncio
     async def test_delete_transaction(
         self,
@@ -158,10 +332,17 @@ class TestOutgoingTransactions:
         )
         assert response.status_code == HTTPStatus.NOT_FOUND
 
-        # Удаляем пользователем
+        # Удаляем чужим пользователем
         response = await client.delete(
             self.endpoint + transaction_id_2, headers=access_token_user
         )
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+        # Удаляем владельцем
+        user_id = str(create_outgoing_transactions[1].user_id)
+        response = await client.delete(
+            self.endpoint + transaction_id_2, headers=auth_header([], user_id)
+        )
         assert response.status_code == HTTPStatus.OK
 
         response = await client.get(
@@ -219,12 +400,29 @@ class TestOutgoingTransactions:
                 "category_id": str(transaction.category_id),
                 "wallet_id": str(transaction.wallet_id),
                 "user_id": str(transaction.user_id),
-                "date": str(transaction.date)
+                "date": str(transaction.date),
             },
         )
         assert response.status_code == HTTPStatus.OK
         assert response.json()["amount"] == transaction.amount
 
+        # Обновляем чужим пользователем, в том числе перенося в свой кошелек
+        other = next(
+            t for t in create_outgoing_transactions if t.user_id != transaction.user_id
+        )
+        for wallet_id in (transaction.wallet_id, other.wallet_id):
+            response = await client.patch(
+                self.endpoint + transaction_id,
+                headers=auth_header([], str(other.user_id)),
+                json={
+                    "amount": 1,
+                    "description": transaction.description,
+                    "category_id": str(transaction.category_id),
+                    "wallet_id": str(wallet_id),
+                },
+            )
+            assert response.status_code == HTTPStatus.FORBIDDEN
+
         # Обновляем неавторизованным
         response = await client.patch(
             self.endpoint + transaction_id,
@@ -234,7 +432,7 @@ class TestOutgoingTransactions:
                 "category_id": str(transaction.category_id),
                 "wallet_id": str(transaction.wallet_id),
                 "user_id": str(transaction.user_id),
-                "date": str(transaction.date)
+                "date": str(transaction.date),
             },
             params={"transaction_id": transaction_id},
         )
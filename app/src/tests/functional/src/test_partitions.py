@@ -0,0 +1,185 @@
+from datetime import datetime, timezone
+
+import pytest
+from models import LedgerEntry
+from schemas.transaction_filter import TransactionFilterSchema
+from services.partition_service import (PARTITIONED_MODELS, PartitionService,
+                                        partition_name)
+from services.transaction_service import OutgoingTransactionService
+from sqlalchemy import text
+from utils.dates import add_months, current_month
+
+
+def relation_names(plan: dict) -> set[str]:
+    names = {plan["Relation Name"]} if "Relation Name" in plan else set()
+    for subplan in plan.get("Plans", []):
+        names |= relation_names(subplan)
+    return names
+
+
+async def count_rows(session_factory, relation: str, where: str = "true") -> int:
+    async with session_factory() as session:
+        return await session.scalar(
+            text(f"SELECT count(*) FROM {relation} WHERE {where}")
+        )
+
+
+class TestPartitions:
+    @pytest.mark.asyncio
+    async def test_migrate_and_create(self, session_factory, seed_dataset):
+        """Строки из DEFAULT партиции переносятся по месяцам без потерь"""
+        service = PartitionService(session_factory)
+        tables = [model.__table__.name for model in PARTITIONED_MODELS]
+        totals = {table: await count_rows(session_factory, table) for table in tables}
+
+        await service.migrate_default_partition(limit=2)
+        assert await service.migrate_default_partition()
+
+        for table in tables:
+            assert await count_rows(session_factory, table) == totals[table]
+            assert await count_rows(session_factory, f"{table}_default") == 0
+
+            # Каждая партиция содержит только строки своего месяца
+            for month, name in (await service.get_partitions(table)).items():
+                assert not await count_rows(
+                    session_factory,
+                    name,
+                    f"date_trunc('month', timezone('UTC', date))::date "
+                    f"<> '{month.isoformat()}'",
+                )
+
+        await service.create_future_partitions(2)
+        for table in tables:
+            partitions = await service.get_partitions(table)
+            assert add_months(current_month(), 2) in partitions
+        assert await service.create_future_partitions(2) == []
+
+    @pytest.mark.asyncio
+    async def test_migrate_in_batches(self, session_factory, seed_dataset, monkeypatch):
+        """Строки, измененные во время копирования пачками, не теряются"""
+        service = PartitionService(session_factory)
+        table = LedgerEntry.__tablename__
+        default = f"{table}_default"
+        async with session_factory() as session:
+            month = await session.scalar(
+                text(
+                    f"SELECT max(date_trunc('month', timezone('UTC', date))::date) "
+                    f"FROM {default}"
+                )
+            )
+        in_month = (
+            f"date_trunc('month', timezone('UTC', date))::date = '{month.isoformat()}'"
+        )
+
+        copy_rows = service._copy_rows
+
+        async def copy_and_change(*args):
+            copied = await copy_rows(*args)
+            # Изменения после копирования, но до подключения партиции
+            async with session_factory() as session:
+                await session.execute(
+                    text(
+                        f"DELETE FROM {default} WHERE id = "
+                        f"(SELECT min(id::text)::uuid FROM {default} WHERE {in_month})"
+                    )
+                )
+                await session.execute(
+                    text(
+                        f"UPDATE {default} SET amount = amount + 1 WHERE id = "
+                        f"(SELECT max(id::text)::uuid FROM {default} WHERE {in_month})"
+                    )
+                )
+                await session.commit()
+            return copied
+
+        monkeypatch.setattr(service, "_copy_rows", copy_and_change)
+        async with session_factory() as session:
+            await session.execute(
+                text(
+                    f"UPDATE {default} SET amount = 1 WHERE id = "
+                    f"(SELECT max(id::text)::uuid FROM {default} WHERE {in_month})"
+                )
+            )
+            await session.commit()
+        rows = await count_rows(session_factory, default, in_month)
+        assert rows > 3
+
+        assert await service.create_partition(LedgerEntry, month, batch_size=3)
+        name = partition_name(table, month)
+        assert await count_rows(session_factory, name) == rows - 1
+        assert await count_rows(session_factory, name, "amount = 2") == 1
+        assert not await count_rows(session_factory, default, in_month)
+
+        # Будущая партиция подключается без скана DEFAULT, ограничения удаляются
+        assert await service.create_partition(
+            LedgerEntry, add_months(current_month(), 6)
+        )
+        assert not await count_rows(
+            session_factory,
+            "pg_constraint",
+            f"conname LIKE '{table}_p%_range' OR conname LIKE '{table}_p%_fence'",
+        )
+
+    @pytest.mark.asyncio
+    async def test_partition_pruning(
+        self, prepare_database, session_factory, seed_dataset, captured_statements
+    ):
+        """Запрос с фильтром по дате читает только нужные партиции"""
+        service = PartitionService(session_factory)
+        await service.migrate_default_partition()
+        month = add_months(current_month(), -5)
+        user_id = str(seed_dataset["users"][0]["id"])
+
+        await OutgoingTransactionService(session_factory, None).get_user_transactions(
+            user_id,
+            50,
+            filters=TransactionFilterSchema(
+                date_from=datetime.combine(month, datetime.min.time(), timezone.utc),
+                date_to=datetime.combine(
+                    add_months(month, 2), datetime.min.time(), timezone.utc
+                ),
+            ),
+        )
+
+        statement, parameters = captured_statements[-1]
+        async with prepare_database.connect() as conn:
+            result = await conn.exec_driver_sql(
+                f"EXPLAIN (FORMAT JSON) {statement}", parameters
+            )
+            plan = result.scalar()[0]["Plan"]
+
+        table = LedgerEntry.__tablename__
+        names = relation_names(plan)
+        # date_to is inclusive, so the first instant of the third month counts
+        assert names
+        assert names <= {
+            partition_name(table, add_months(month, offset)) for offset in range(3)
+        }
+
+    @pytest.mark.asyncio
+    async def test_detach(self, session_factory, seed_dataset):
+        """Старые партиции отсоединяются для архивации"""
+        service = PartitionService(session_factory)
+        await service.migrate_default_partition()
+        cutoff = datetime.combine(
+            add_months(current_month(), -24), datetime.min.time(), timezone.utc
+        )
+        recent = await count_rows(
+            session_factory, "ledgerentry", f"date >= '{cutoff.isoformat()}'"
+        )
+
+        detached = await service.detach_partitions(24)
+        try:
+            assert detached
+            assert await count_rows(session_factory, "ledgerentry") == recent
+            for model in PARTITIONED_MODELS:
+                partitions = await service.get_partitions(model.__table__.name)
+                assert min(partitions) >= cutoff.date()
+
+            # Отсоединенная партиция остается отдельной таблицей
+            assert await count_rows(session_factory, detached[0]) > 0
+        finally:
+            async with session_factory() as session:
+                for name in detached:
+                    await session.execute(text(f"DROP TABLE {name}"))
+                await session.commit()
@@ -0,0 +1,91 @@
+import asyncio
+import logging
+import time
+from http import HTTPStatus
+from statistics import quantiles
+
+import pytest
+from services.exceptions import ServiceBusyError
+from services.password_service import PasswordHasher
+from tests.functional.fixtures.auth import auth_header
+
+logger = logging.getLogger(__name__)
+
+STORM_LOGINS = 20
+PROBE_REQUESTS = 100
+
+
+async def probe(client, url, headers) -> float:
+    """p99 latency of sequential requests to `url`."""
+    latencies = []
+    for _ in range(PROBE_REQUESTS):
+        started = time.perf_counter()
+        response = await client.get(url, headers=headers)
+        latencies.append(time.perf_counter() - started)
+        assert response.status_code == HTTPStatus.OK
+    return quantiles(latencies, n=100)[98]
+
+
+class TestPasswordHashing:
+    @pytest.mark.asyncio
+    async def test_password_hasher(self):
+        """Хеширование в пуле процессов с ограничением очереди"""
+        hasher = PasswordHasher(workers=1, max_concurrency=1, queue_timeout=0.05)
+        try:
+            password_hash = await hasher.hash("secret")
+            assert await hasher.check(password_hash, "secret")
+            assert not await hasher.check(password_hash, "wrong")
+
+            results = await asyncio.gather(
+                *(hasher.hash("secret") for _ in range(3)), return_exceptions=True
+            )
+            assert any(isinstance(r, ServiceBusyError) for r in results)
+
+            stats = hasher.stats()
+            assert stats.timeouts >= 1
+            assert stats.waiting == stats.in_flight == 0
+        finally:
+            hasher.close()
+
+    @pytest.mark.asyncio
+    async def test_login_storm_latency(self, client, create_users):
+        """Задержка других эндпоинтов не растет во время волны логинов"""
+        user_id = str(create_users[0].id)
+        url = f"/api/v1/wallets/users/{user_id}"
+        headers = auth_header([], user_id)
+
+        async def login():
+            return await client.post(
+                "/api/v1/auth/login",
+                json={"login": "Login_0", "password": "password_0"},
+                timeout=30,
+            )
+
+        # Starts the pool processes
+        await login()
+        baseline = await probe(client, url, headers)
+
+        storm = asyncio.gather(*(login() for _ in range(STORM_LOGINS)))
+        during = await probe(client, url, headers)
+        responses = await storm
+
+        logger.info(
+            "p99 of %s: %.1f ms idle, %.1f ms during %s concurrent logins",
+            url,
+            baseline * 1000,
+            during * 1000,
+            STORM_LOGINS,
+        )
+
+        assert all(
+            r.status_code in (HTTPStatus.OK, HTTPStatus.SERVICE_UNAVAILABLE)
+            for r in responses
+        )
+        # Hashed on the event loop, the logins pushed p99 to about 2.8 s
+        assert during < baseline + 0.5
+
+        response = await client.get(
+            "/api/v1/auth/password-hashing/stats", headers=auth_header(["admin"])
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()["completed"] >= STORM_LOGINS + 1
@@ -0,0 +1,200 @@
+from uuid import uuid4
+
+import pytest
+from schemas.transaction_filter import TransactionFilterSchema
+from services.auth_service import AuthService
+from services.balance_history_service import (BalanceHistoryService,
+                                              balance_history_key)
+from services.reconciliation_service import ReconciliationService
+from services.transaction_service import (IncomingTransactionService,
+                                          OutgoingTransactionService)
+from services.wallet_service import WalletService
+from utils.pagination import decode_keyset_cursor
+
+INDEXED_TABLES = {
+    "ledgerentry",
+    "wallet",
+    "balancecheckpoint",
+    "refreshtoken",
+}
+
+
+def seq_scans(plan: dict) -> list[str]:
+    scans = []
+    # Partitions are named after their table, e.g. ledgerentry_p2025_01
+    if (
+        plan["Node Type"] == "Seq Scan"
+        and plan["Relation Name"].split("_")[0] in INDEXED_TABLES
+    ):
+        scans.append(plan["Relation Name"])
+    for subplan in plan.get("Plans", []):
+        scans.extend(seq_scans(subplan))
+    return scans
+
+
+async def explain(engine, statement: str, parameters) -> dict:
+    async with engine.connect() as conn:
+        # Планировщик выберет seq scan только если ни один индекс не подходит
+        await conn.exec_driver_sql("SET enable_seqscan = off")
+        result = await conn.exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {statement}", parameters
+        )
+        return result.scalar()[0]["Plan"]
+
+
+async def assert_no_seq_scans(engine, statements):
+    checked = 0
+    for statement, parameters in statements:
+        if not statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            continue
+        plan = await explain(engine, statement, parameters)
+        assert not seq_scans(plan), f"Seq scan in plan of:\n{statement}"
+        checked += 1
+    assert checked, "No statements were checked"
+
+
+class TestQueryPlans:
+    @pytest.mark.asyncio
+    async def test_user_transactions(
+        self, prepare_database, session_factory, seed_dataset, captured_statements
+    ):
+        """Листинг транзакций пользователя идет по индексу"""
+        user_id = str(seed_dataset["users"][0]["id"])
+
+        for service in (
+            IncomingTransactionService(session_factory, None),
+            OutgoingTransactionService(session_factory, None),
+        ):
+            page = await service.get_user_transactions(user_id, 50)
+            page = await service.get_user_transactions(
+                user_id, 50, decode_keyset_cursor(page.next_cursor)
+            )
+            await service.get_user_transactions(
+                user_id, 50, decode_keyset_cursor(page.previous_cursor)
+            )
+
+        await assert_no_seq_scans(prepare_database, captured_statements)
+
+    @pytest.mark.asyncio
+    async def test_filtered_user_transactions(
+        self, prepare_database, session_factory, seed_dataset, captured_statements
+    ):
+        """Фильтры листинга транзакций покрываются индексами"""
+        user_id = str(seed_dataset["users"][0]["id"])
+        wallet_ids = [
+            wallet["id"]
+            for wallet in seed_dataset["wallets"]
+            if str(wallet["user_id"]) == user_id
+        ]
+
+        for service, categories in (
+            (
+                IncomingTransactionService(session_factory, None),
+                seed_dataset["incoming_categories"],
+            ),
+            (
+                OutgoingTransactionService(session_factory, None),
+                seed_dataset["outgoing_categories"],
+            ),
+        ):
+            for filters in (
+                TransactionFilterSchema(order="desc", amount_min=10, amount_max=500),
+                TransactionFilterSchema(category_id=[c["id"] for c in categories[:2]]),
+                TransactionFilterSchema(wallet_id=wallet_ids[:2], order="desc"),
+            ):
+                page = await service.get_user_transactions(user_id, 20, filters=filters)
+                await service.get_user_transactions(
+                    user_id, 20, decode_keyset_cursor(page.next_cursor), filters
+                )
+
+        await assert_no_seq_scans(prepare_database, captured_statements)
+
+    @pytest.mark.asyncio
+    async def test_search_user_transactions(
+        self, prepare_database, session_factory, seed_dataset, captured_statements
+    ):
+        """Поиск по описанию идет по индексам"""
+        user_id = str(seed_dataset["users"][0]["id"])
+
+        for service in (
+            IncomingTransactionService(session_factory, None),
+            OutgoingTransactionService(session_factory, None),
+        ):
+            page = await service.search_user_transactions(user_id, "salary", 20)
+            await service.search_user_transactions(
+                user_id, "salary", 20, decode_keyset_cursor(page.next_cursor)
+            )
+
+        await assert_no_seq_scans(prepare_database, captured_statements)
+
+    @pytest.mark.asyncio
+    async def test_wallet_balance_history(
+        self,
+        prepare_database,
+        session_factory,
+        redis_client,
+        seed_dataset,
+        captured_statements,
+    ):
+        """История баланса читается одним проходом по индексу журнала"""
+        wallet_id = seed_dataset["wallets"][0]["id"]
+        wallet = await WalletService(session_factory).get_wallet_by_id(wallet_id)
+        await redis_client.delete(balance_history_key(wallet_id))
+
+        await BalanceHistoryService(session_factory, redis_client).get_balance_history(
+            wallet
+        )
+
+        statement = captured_statements[-1][0]
+        assert "UNION" not in statement.upper()
+        await assert_no_seq_scans(prepare_database, captured_statements)
+
+    @pytest.mark.asyncio
+    async def test_wallet_reconciliation(
+        self, prepare_database, session_factory, seed_dataset, captured_statements
+    ):
+        """Сверка читает только записи журнала после контрольной точки"""
+        wallet_ids = [wallet["id"] for wallet in seed_dataset["wallets"][:5]]
+        service = ReconciliationService(session_factory)
+
+        await service.reconcile_wallets(wallet_ids)
+        await service.check_wallet(wallet_ids[0])
+
+        await assert_no_seq_scans(prepare_database, captured_statements)
+
+    @pytest.mark.asyncio
+    async def test_user_wallets(
+        self, prepare_database, session_factory, seed_dataset, captured_statements
+    ):
+        """Кошельки пользователя ищутся по индексу"""
+        user_id = str(seed_dataset["users"][0]["id"])
+
+        await WalletService(session_factory).get_wallets_by_user_id(user_id)
+
+        await assert_no_seq_scans(prepare_database, captured_statements)
+
+    @pytest.mark.asyncio
+    async def test_refresh_tokens(
+        self, prepare_database, session_factory, seed_dataset, captured_statements
+    ):
+        """Refresh токены ищутся и удаляются по индексу"""
+        token = seed_dataset["refresh_token_values"][0]
+        auth_service = AuthService(session_factory, None)
+
+        await auth_service.is_refresh_token_valid(token)
+        await auth_service.invalidate_refresh_token(token)
+
+        await assert_no_seq_scans(prepare_database, captured_statements)
+
+    @pytest.mark.asyncio
+    async def test_foreign_key_set_null(self, prepare_database, seed_dataset):
+        """ON DELETE SET NULL находит ссылающиеся строки по индексу"""
+        statements = [
+            (
+                f"UPDATE ledgerentry SET {column} = NULL WHERE {column} = $1",
+                (uuid4(),),
+            )
+            for column in ("wallet_id", "incoming_category_id", "outgoing_category_id")
+        ]
+
+        await assert_no_seq_scans(prepare_database, statements)
@@ -0,0 +1,122 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from models import BalanceCheckpoint, Wallet
+from schemas.incoming_transaction import CreateIncomingTransactionSchema
+from schemas.outgoing_transaction import CreateOutgoingTransactionSchema
+from services.reconciliation_service import ReconciliationService
+from services.transaction_service import (IncomingTransactionService,
+                                          OutgoingTransactionService)
+from sqlalchemy import func, select, update
+
+
+async def checkpoint_count(session_factory, wallet_id) -> int:
+    async with session_factory() as session:
+        return await session.scalar(
+            select(func.count()).where(BalanceCheckpoint.wallet_id == wallet_id)
+        )
+
+
+class TestReconciliation:
+    @pytest.mark.asyncio
+    async def test_reconcile(
+        self,
+        session_factory,
+        redis_client,
+        create_wallets,
+        create_incoming_categories,
+        create_outgoing_categories,
+    ):
+        """Сверка по контрольным точкам находит и исправляет расхождения"""
+        wallet = create_wallets[0]
+        service = ReconciliationService(session_factory)
+        incoming_service = IncomingTransactionService(session_factory, redis_client)
+        outgoing_service = OutgoingTransactionService(session_factory, redis_client)
+
+        # Первый проход только записывает контрольные точки
+        result = await service.reconcile(chunk_size=2, concurrency=2)
+        assert result.wallets == len(create_wallets)
+        assert result.checked == 0
+        assert not result.drifts
+
+        await incoming_service.create_transaction(
+            CreateIncomingTransactionSchema(
+                amount=70,
+                description="",
+                category_id=create_incoming_categories[0].id,
+                wallet_id=wallet.id,
+                user_id=wallet.user_id,
+            )
+        )
+        await outgoing_service.create_transaction(
+            CreateOutgoingTransactionSchema(
+                amount=20,
+                description="",
+                category_id=create_outgoing_categories[0].id,
+                wallet_id=wallet.id,
+                user_id=wallet.user_id,
+            )
+        )
+        drift = await service.check_wallet(wallet.id)
+        assert drift.expected == drift.amount == wallet.amount + 50
+
+        result = await service.reconcile(chunk_size=2, concurrency=2)
+        assert result.checked == len(create_wallets)
+        assert not result.drifts
+        assert await checkpoint_count(session_factory, wallet.id) == 2
+
+        # Баланс, измененный в обход транзакций, считается расхождением
+        async with session_factory() as session:
+            await session.execute(
+                update(Wallet).filter_by(id=wallet.id).values(amount=Wallet.amount + 5)
+            )
+            await session.commit()
+
+        result = await service.reconcile()
+        assert [(d.wallet_id, d.amount - d.expected) for d in result.drifts] == [
+            (wallet.id, 5)
+        ]
+        result = await service.reconcile(repair=True)
+        assert [d.repaired for d in result.drifts] == [True]
+        assert not (await service.reconcile()).drifts
+
+        drift = await service.check_wallet(wallet.id)
+        assert drift.amount == drift.expected == wallet.amount + 50
+
+    @pytest.mark.asyncio
+    async def test_backdated_transaction(
+        self, session_factory, redis_client, create_wallets, create_outgoing_categories
+    ):
+        """Транзакция задним числом сбрасывает более поздние контрольные точки"""
+        wallet = create_wallets[0]
+        service = ReconciliationService(session_factory)
+        outgoing_service = OutgoingTransactionService(session_factory, redis_client)
+        now = datetime.now(timezone.utc)
+
+        def transaction(amount, date):
+            return CreateOutgoingTransactionSchema(
+                amount=amount,
+                description="",
+                category_id=create_outgoing_categories[0].id,
+                wallet_id=wallet.id,
+                user_id=wallet.user_id,
+                date=date,
+            )
+
+        await outgoing_service.create_transaction(transaction(10, now))
+        await service.reconcile_wallets([wallet.id])
+        assert await checkpoint_count(session_factory, wallet.id) == 1
+
+        created = await outgoing_service.create_transaction(
+            transaction(15, now - timedelta(days=30))
+        )
+        assert await checkpoint_count(session_factory, wallet.id) == 0
+        await service.reconcile_wallets([wallet.id])
+
+        await outgoing_service.delete_transaction(created.id)
+        assert await checkpoint_count(session_factory, wallet.id) == 0
+
+        checked, drifts = await service.reconcile_wallets([wallet.id])
+        assert (checked, drifts) == (0, [])
+        drift = await service.check_wallet(wallet.id)
+        assert drift.amount == drift.expected == wallet.amount - 10
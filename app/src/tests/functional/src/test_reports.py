@@ -0,0 +1,170 @@
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from http import HTTPStatus
+from uuid import uuid4
+from zoneinfo import ZoneInfo
+
+import pytest
+import pytest_asyncio
+from services.report_service import ReportService
+from services.rollup_service import TRANSACTION_MODELS, RollupService
+from sqlalchemy import select
+from tests.functional.fixtures.auth import auth_header
+
+
+async def load_transactions(session_factory, user_id) -> list:
+    rows = []
+    async with session_factory() as session:
+        for transaction_type, model in TRANSACTION_MODELS.items():
+            result = await session.execute(
+                select(
+                    model.category_id, model.wallet_id, model.date, model.amount
+                ).filter_by(user_id=user_id)
+            )
+            rows.extend((transaction_type.value, *row) for row in result.all())
+    return rows
+
+
+def expected_totals(rows, date_from, date_to, key) -> dict:
+    totals = defaultdict(lambda: [0, 0])
+    for row in rows:
+        transaction_type, category_id, wallet_id, date, amount = row
+        if date_from <= date < date_to:
+            total = totals[(transaction_type, key(row))]
+            total[0] += amount
+            total[1] += 1
+    return {k: tuple(v) for k, v in totals.items()}
+
+
+class TestReports:
+    def setup_method(self):
+        self.endpoint = "/api/v1/reports/users/"
+
+    @pytest_asyncio.fixture(loop_scope="function")
+    async def report_user(self, session_factory, seed_dataset):
+        user_id = seed_dataset["users"][0]["id"]
+        await RollupService(session_factory).rebuild_users([user_id])
+        return user_id, await load_transactions(session_factory, user_id)
+
+    async def get_report(self, client, user_id, report, **params):
+        response = await client.get(
+            f"{self.endpoint}{user_id}/{report}",
+            headers=auth_header([], str(user_id)),
+            params=params,
+        )
+        assert response.status_code == HTTPStatus.OK
+        return response.json()
+
+    @pytest.mark.asyncio
+    async def test_totals_by_category_and_wallet(self, client, report_user):
+        """Итоги по категориям и кошелькам совпадают с сырыми транзакциями"""
+        user_id, rows = report_user
+        date_to = datetime.now(timezone.utc)
+        date_from = date_to - timedelta(days=400, hours=5)
+        params = {"date_from": date_from.isoformat(), "date_to": date_to.isoformat()}
+
+        items = await self.get_report(client, user_id, "categories", **params)
+        assert all(item["category_name"] for item in items)
+        assert {
+            (item["transaction_type"], item["category_id"]): (
+                item["amount"],
+                item["count"],
+            )
+            for item in items
+        } == expected_totals(rows, date_from, date_to, lambda row: str(row[1]))
+
+        items = await self.get_report(
+            client, user_id, "wallets", type="outgoing", **params
+        )
+        assert all(item["wallet_name"] for item in items)
+        assert {
+            (item["transaction_type"], item["wallet_id"]): (
+                item["amount"],
+                item["count"],
+            )
+            for item in items
+        } == {
+            key: value
+            for key, value in expected_totals(
+                rows, date_from, date_to, lambda row: str(row[2])
+            ).items()
+            if key[0] == "outgoing"
+        }
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "period, tz",
+        [("month", "UTC"), ("month", "Asia/Tokyo"), ("week", "Europe/Berlin")],
+        ids=["month-utc", "month-tokyo", "week-berlin"],
+    )
+    async def test_totals_by_period(self, client, report_user, period, tz):
+        """Итоги по периодам считаются в часовом поясе пользователя"""
+        user_id, rows = report_user
+        zone = ZoneInfo(tz)
+        date_from = datetime(2024, 1, 15, 12, tzinfo=zone)
+        date_to = datetime.now(zone)
+
+        def bucket(row):
+            local = row[3].astimezone(zone)
+            if period == "month":
+                return local.date().replace(day=1).isoformat()
+            return (local.date() - timedelta(days=local.weekday())).isoformat()
+
+        items = await self.get_report(
+            client,
+            user_id,
+            "periods",
+            period=period,
+            tz=tz,
+            date_from=date_from.replace(tzinfo=None).isoformat(),
+        )
+        assert {
+            (item["transaction_type"], item["period_start"]): (
+                item["amount"],
+                item["count"],
+            )
+            for item in items
+        } == expected_totals(rows, date_from, date_to, bucket)
+
+    @pytest.mark.asyncio
+    async def test_whole_months_from_rollup(
+        self, session_factory, report_user, captured_statements
+    ):
+        """Целые месяцы читаются из агрегатов, сырые строки только по краям"""
+        user_id, _ = report_user
+        date_to = datetime.now(timezone.utc)
+
+        await ReportService(session_factory).get_totals_by_category(
+            user_id, date_to - timedelta(days=3650), date_to
+        )
+
+        statements = [statement for statement, _ in captured_statements]
+        assert all("categorymonthlytotal" in statement for statement in statements)
+
+    @pytest.mark.asyncio
+    async def test_report_errors(self, client, report_user):
+        """Некорректные параметры и чужой пользователь"""
+        user_id, _ = report_user
+        endpoint = f"{self.endpoint}{user_id}/categories"
+        headers = auth_header([], str(user_id))
+
+        response = await client.get(
+            endpoint,
+            headers=headers,
+            params={"date_from": "2024-01-01", "tz": "Mars/Olympus"},
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+        response = await client.get(
+            endpoint,
+            headers=headers,
+            params={"date_from": "2024-01-01", "date_to": "2023-01-01"},
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+        response = await client.get(
+            endpoint,
+            headers=auth_header([], str(uuid4())),
+            params={"date_from": "2024-01-01"},
+        )
+        assert response.status_code == HTTPStatus.FORBIDDEN
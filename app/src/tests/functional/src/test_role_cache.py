@@ -0,0 +1,90 @@
+from contextlib import asynccontextmanager
+
+import pytest
+from schemas.role import CreateRoleSchema, UpdateRoleSchema
+from services.auth_service import AuthService
+from services.password_service import PasswordHasher
+from services.role_service import RoleService, local_role_cache, user_roles_key
+from services.user_service import UserService
+
+
+class TestRoleCache:
+    @pytest.mark.asyncio
+    async def test_user_role_titles(
+        self, session_factory, redis_client, captured_statements, create_users
+    ):
+        """Роли пользователя кэшируются и сбрасываются при изменениях"""
+        service = RoleService(session_factory, redis_client)
+        user_id = str(create_users[0].id)
+        role = await service.create_role(CreateRoleSchema(title="editor"))
+        await service.assign_role_to_user(user_id, str(role.id))
+
+        # Холодный запрос - один JOIN
+        captured_statements.clear()
+        assert await service.get_user_role_titles(user_id) == ["editor"]
+        assert len(captured_statements) == 1
+        assert "JOIN" in captured_statements[0][0]
+
+        # Из локального кэша и из Redis - без запросов к Postgres
+        captured_statements.clear()
+        assert await service.get_user_role_titles(user_id) == ["editor"]
+        local_role_cache.invalidate([user_id])
+        assert await service.get_user_role_titles(user_id) == ["editor"]
+        assert captured_statements == []
+
+        await service.update_role(str(role.id), UpdateRoleSchema(title="viewer"))
+        assert await redis_client.get(user_roles_key(user_id)) is None
+        assert await service.get_user_role_titles(user_id) == ["viewer"]
+
+        await service.remove_role_from_user(user_id, str(role.id))
+        assert await service.get_user_role_titles(user_id) == []
+
+        await service.assign_role_to_user(user_id, str(role.id))
+        assert await service.get_user_role_titles(user_id) == ["viewer"]
+        await service.delete_role(str(role.id))
+        assert await service.get_user_role_titles(user_id) == []
+
+    @pytest.mark.asyncio
+    async def test_invalidation_during_read(
+        self, session_factory, redis_client, create_users
+    ):
+        """Смена ролей во время чтения из Postgres не оставляет в кэше старые роли"""
+        service = RoleService(session_factory, redis_client)
+        user_id = str(create_users[0].id)
+        role = await service.create_role(CreateRoleSchema(title="editor"))
+
+        @asynccontextmanager
+        async def racing_session():
+            async with session_factory() as session:
+                yield session
+            # Роль назначена после запроса, но до записи в кэш
+            await service.assign_role_to_user(user_id, str(role.id))
+
+        racing_service = RoleService(racing_session, redis_client)
+        assert await racing_service.get_user_role_titles(user_id) == []
+        assert await redis_client.get(user_roles_key(user_id)) is None
+        assert await service.get_user_role_titles(user_id) == ["editor"]
+
+    @pytest.mark.asyncio
+    async def test_login_round_trips(
+        self, session_factory, redis_client, captured_statements, create_users
+    ):
+        """Логин с прогретым кэшем ролей делает два запроса к Postgres"""
+        user = create_users[0]
+        hasher = PasswordHasher(workers=1, max_concurrency=1, queue_timeout=5)
+        user_service = UserService(session_factory, hasher)
+        role_service = RoleService(session_factory, redis_client)
+        auth_service = AuthService(session_factory, redis_client)
+        await role_service.get_user_role_titles(str(user.id))
+
+        captured_statements.clear()
+        try:
+            found = await user_service.get_user_by_login(user.login)
+            assert await user_service.check_password(found, "password_0")
+            roles = await role_service.get_user_role_titles(str(found.id))
+            await auth_service.generate_access_token(str(found.id), roles)
+            await auth_service.generate_refresh_token(str(found.id))
+        finally:
+            hasher.close()
+
+        assert len(captured_statements) == 2
@@ -0,0 +1,140 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from models import CategoryMonthlyTotal
+from schemas.outgoing_transaction import CreateOutgoingTransactionSchema
+from services.category_service import OutgoingCategoryService
+from services.rollup_service import (TRANSACTION_MODELS, RollupService,
+                                     month_column)
+from services.transaction_service import OutgoingTransactionService
+from sqlalchemy import func, select
+
+
+async def raw_totals(session_factory, user_ids) -> dict:
+    totals = {}
+    async with session_factory() as session:
+        for transaction_type, model in TRANSACTION_MODELS.items():
+            month = month_column(model)
+            result = await session.execute(
+                select(
+                    model.user_id,
+                    model.wallet_id,
+                    model.category_id,
+                    month,
+                    func.sum(model.amount),
+                    func.count(),
+                )
+                .where(model.user_id.in_(user_ids))
+                .group_by(model.user_id, model.wallet_id, model.category_id, month)
+            )
+            for *key, amount, count in result.all():
+                totals[(transaction_type, *key)] = (amount, count)
+    return totals
+
+
+async def rollup_totals(session_factory, user_ids) -> dict:
+    async with session_factory() as session:
+        stmt = await session.scalars(
+            select(CategoryMonthlyTotal).where(
+                CategoryMonthlyTotal.user_id.in_(user_ids),
+                CategoryMonthlyTotal.count != 0,
+            )
+        )
+        return {
+            (
+                row.transaction_type,
+                row.user_id,
+                row.wallet_id,
+                row.category_id,
+                row.month,
+            ): (row.amount, row.count)
+            for row in stmt.all()
+        }
+
+
+class TestRollup:
+    @pytest.mark.asyncio
+    async def test_rollup_follows_transactions(
+        self, session_factory, redis_client, create_wallets, create_outgoing_categories
+    ):
+        """Итоги по категориям меняются вместе с транзакциями"""
+        wallet_1, wallet_2 = create_wallets[0], create_wallets[1]
+        user_ids = [wallet_1.user_id, wallet_2.user_id]
+        service = OutgoingTransactionService(session_factory, redis_client)
+
+        data = CreateOutgoingTransactionSchema(
+            amount=10,
+            description="",
+            category_id=create_outgoing_categories[0].id,
+            wallet_id=wallet_1.id,
+            user_id=wallet_1.user_id,
+        )
+        transaction = await service.create_transaction(data)
+        await service.create_transaction(data)
+        assert await rollup_totals(session_factory, user_ids) == await raw_totals(
+            session_factory, user_ids
+        )
+
+        # Переносим в другой кошелек, категорию и месяц
+        data.amount = 25
+        data.wallet_id = wallet_2.id
+        data.category_id = create_outgoing_categories[1].id
+        data.date = datetime.now(timezone.utc) - timedelta(days=62)
+        await service.update_transaction(str(transaction.id), data)
+        assert await rollup_totals(session_factory, user_ids) == await raw_totals(
+            session_factory, user_ids
+        )
+
+        await service.delete_transaction(str(transaction.id))
+        assert await rollup_totals(session_factory, user_ids) == await raw_totals(
+            session_factory, user_ids
+        )
+
+    @pytest.mark.asyncio
+    async def test_rebuild(self, session_factory, seed_dataset):
+        """Пересчет заполняет итоги по сырым транзакциям"""
+        user_ids = [user["id"] for user in seed_dataset["users"]]
+        assert await rollup_totals(session_factory, user_ids) == {}
+
+        users = await RollupService(session_factory).rebuild(
+            chunk_size=3, concurrency=4
+        )
+        assert users >= len(user_ids)
+
+        rollup = await rollup_totals(session_factory, user_ids)
+        assert rollup
+        assert rollup == await raw_totals(session_factory, user_ids)
+
+    @pytest.mark.asyncio
+    async def test_rollup_after_category_delete(
+        self, session_factory, redis_client, create_wallets, create_outgoing_categories
+    ):
+        """Итоги сходятся после удаления категории"""
+        wallet = create_wallets[0]
+        user_ids = [wallet.user_id]
+        service = OutgoingTransactionService(session_factory, redis_client)
+
+        data = CreateOutgoingTransactionSchema(
+            amount=10,
+            description="",
+            category_id=create_outgoing_categories[0].id,
+            wallet_id=wallet.id,
+            user_id=wallet.user_id,
+        )
+        transaction = await service.create_transaction(data)
+        await service.create_transaction(data)
+        data.category_id = None
+        await service.create_transaction(data)
+
+        # Транзакции категории остаются без категории
+        await OutgoingCategoryService(session_factory).delete_category(
+            str(create_outgoing_categories[0].id)
+        )
+        assert await rollup_totals(session_factory, user_ids) == await raw_totals(
+            session_factory, user_ids
+        )
+
+        await service.delete_transaction(str(transaction.id))
+        assert await rollup_totals(session_factory, user_ids) == await raw_totals(
+            session_factory, user_ids
+        )
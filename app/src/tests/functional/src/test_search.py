@@ -0,0 +1,119 @@
+from http import HTTPStatus
+from uuid import uuid4
+
+import pytest
+from fastapi_pagination.cursor import encode_cursor
+from tests.functional.fixtures.auth import auth_header
+
+
+class TestTransactionSearch:
+    def setup_method(self):
+        self.endpoint = "/api/v1/transactions/outgoing/users/"
+
+    async def create_transactions(self, client, wallet, category, descriptions):
+        response = await client.post(
+            "/api/v1/transactions/outgoing/batch",
+            headers=auth_header([], str(wallet.user_id)),
+            json={
+                "transactions": [
+                    {
+                        "amount": 10,
+                        "description": description,
+                        "category_id": str(category.id),
+                        "wallet_id": str(wallet.id),
+                    }
+                    for description in descriptions
+                ]
+            },
+        )
+        assert response.status_code == HTTPStatus.OK
+
+    async def search(self, client, user_id, q, **params):
+        items, pages = [], []
+        cursor = None
+        while True:
+            if cursor:
+                params["cursor"] = cursor
+            response = await client.get(
+                f"{self.endpoint}{user_id}/search",
+                headers=auth_header([], str(user_id)),
+                params={"q": q, **params},
+            )
+            assert response.status_code == HTTPStatus.OK
+            pages.append(response.json())
+            items.extend(response.json()["items"])
+            cursor = response.json()["next_page"]
+            if not cursor:
+                return items, pages
+
+    @pytest.mark.asyncio
+    async def test_search(self, client, create_wallets, create_outgoing_categories):
+        """Ищем транзакции по словам, префиксу и подстроке описания"""
+        wallet = create_wallets[0]
+        word = f"coffee{uuid4().hex[:6]}"
+        await self.create_transactions(
+            client,
+            wallet,
+            create_outgoing_categories[0],
+            [
+                f"Morning {word}",
+                f"{word} and {word} beans",
+                f"Beans for {word}",
+                "Lunch",
+                f"Cake and {word}",
+            ],
+        )
+
+        # Больше совпадений в описании - выше в выдаче
+        items, pages = await self.search(client, wallet.user_id, word, size=2)
+        assert len(items) == 4
+        assert items[0]["description"] == f"{word} and {word} beans"
+        assert len({item["id"] for item in items}) == 4
+
+        # Предыдущая страница совпадает с первой
+        response = await client.get(
+            f"{self.endpoint}{wallet.user_id}/search",
+            headers=auth_header([], str(wallet.user_id)),
+            params={"q": word, "size": 2, "cursor": pages[1]["previous_page"]},
+        )
+        assert response.json()["items"] == pages[0]["items"]
+
+        # Все слова запроса должны встретиться в описании
+        items, _ = await self.search(client, wallet.user_id, f"{word} beans")
+        assert {item["description"] for item in items} == {
+            f"{word} and {word} beans",
+            f"Beans for {word}",
+        }
+
+        # Префикс слова и подстрока внутри слова
+        items, _ = await self.search(client, wallet.user_id, word[:4])
+        assert len(items) == 4
+        items, _ = await self.search(client, wallet.user_id, word[2:])
+        assert len(items) == 4
+
+        # Спецсимволы LIKE не работают как шаблоны
+        items, _ = await self.search(client, wallet.user_id, "%_%")
+        assert items == []
+
+    @pytest.mark.asyncio
+    async def test_search_errors(self, client, create_wallets):
+        """Поиск без запроса, с чужим токеном и некорректным курсором"""
+        user_id = create_wallets[0].user_id
+        endpoint = f"{self.endpoint}{user_id}/search"
+
+        response = await client.get(endpoint, headers=auth_header([], str(user_id)))
+        assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+        response = await client.get(
+            endpoint, headers=auth_header([], str(uuid4())), params={"q": "coffee"}
+        )
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+        # Курсор обычного листинга не содержит ранга
+        cursor = encode_cursor(f">2024-01-01T00:00:00+00:00|{uuid4()}", quoted=False)
+        response = await client.get(
+            endpoint,
+            headers=auth_header([], str(user_id)),
+            params={"q": "coffee", "cursor": cursor},
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
@@ -0,0 +1,167 @@
+from http import HTTPStatus
+
+import pytest
+from tests.functional.fixtures.auth import auth_header
+
+CSV_STATEMENT = """date,amount,description
+2025-01-05T10:00:00+00:00,1500.00,Salary
+2025-01-06,-12.50,"Coffee, milk"
+2025-01-07,0,Zero
+2025-01-08,-100,Groceries
+"""
+
+OFX_STATEMENT = """OFXHEADER:100
+DATA:OFXSGML
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN>
+<TRNTYPE>CREDIT
+<DTPOSTED>20250105120000[-5:EST]
+<TRNAMT>1500.00
+<NAME>Salary
+</STMTTRN>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20250106<TRNAMT>-12.50<MEMO>Coffee</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+QIF_STATEMENT = """!Type:Bank
+D01/05/2025
+T1,500.00
+PSalary
+^
+D01/06/2025
+T-12.50
+MCoffee
+^
+"""
+
+
+class TestStatementImport:
+    def setup_method(self):
+        self.endpoint = "/api/v1/transactions/import/"
+
+    async def import_statement(self, client, wallet, categories, content, **params):
+        incoming_categories, outgoing_categories = categories
+        return await client.post(
+            self.endpoint,
+            headers=auth_header([], str(wallet.user_id)),
+            params={
+                "wallet_id": str(wallet.id),
+                "incoming_category_id": str(incoming_categories[0].id),
+                "outgoing_category_id": str(outgoing_categories[0].id),
+                **params,
+            },
+            content=content,
+        )
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "statement_format, content, incoming, outgoing, delta",
+        [
+            ("csv", CSV_STATEMENT, 1, 2, 150000 - 1250 - 10000),
+            ("ofx", OFX_STATEMENT, 1, 1, 150000 - 1250),
+            ("qif", QIF_STATEMENT, 1, 1, 150000 - 1250),
+        ],
+        ids=["csv", "ofx", "qif"],
+    )
+    async def test_import_statement(
+        self,
+        client,
+        create_wallets,
+        create_incoming_categories,
+        create_outgoing_categories,
+        statement_format,
+        content,
+        incoming,
+        outgoing,
+        delta,
+    ):
+        """Импортируем выписку"""
+        wallet = create_wallets[0]
+        categories = (create_incoming_categories, create_outgoing_categories)
+
+        response = await client.get(
+            f"/api/v1/wallets/{wallet.id}", headers=auth_header(["admin"])
+        )
+        amount = response.json()["amount"]
+
+        response = await self.import_statement(
+            client, wallet, categories, content, format=statement_format
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()["incoming"] == incoming
+        assert response.json()["outgoing"] == outgoing
+        assert response.json()["wallet_amount"] == amount + delta
+
+    @pytest.mark.asyncio
+    async def test_import_large_statement(
+        self,
+        client,
+        create_wallets,
+        create_incoming_categories,
+        create_outgoing_categories,
+    ):
+        """Импортируем выписку больше одного чанка COPY"""
+        wallet = create_wallets[0]
+        categories = (create_incoming_categories, create_outgoing_categories)
+        rows = 25000
+
+        async def content():
+            yield b"date,amount,description\n"
+            for i in range(rows):
+                yield f"2025-01-01,{'-' if i % 2 else ''}1.00,row {i}\n".encode()
+
+        response = await self.import_statement(client, wallet, categories, content())
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()["incoming"] == rows // 2
+        assert response.json()["outgoing"] == rows // 2
+
+    @pytest.mark.asyncio
+    async def test_import_invalid_statement(
+        self,
+        client,
+        create_wallets,
+        create_incoming_categories,
+        create_outgoing_categories,
+    ):
+        """Некорректная выписка не импортируется целиком"""
+        wallet = create_wallets[0]
+        categories = (create_incoming_categories, create_outgoing_categories)
+
+        response = await client.get(
+            f"/api/v1/wallets/{wallet.id}", headers=auth_header(["admin"])
+        )
+        amount = response.json()["amount"]
+
+        content = CSV_STATEMENT + "2025-01-09,abc,Broken\n"
+        response = await self.import_statement(client, wallet, categories, content)
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+        # Строка с недостающими колонками
+        content = CSV_STATEMENT + "2025-01-09\n"
+        response = await self.import_statement(client, wallet, categories, content)
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert "Line 6" in response.json()["detail"]
+
+        # Бесконечные и не помещающиеся в BIGINT суммы
+        for value in ("Infinity", "-inf", "NaN", "1e400", "1e999999999"):
+            content = CSV_STATEMENT + f"2025-01-09,{value},Broken\n"
+            response = await self.import_statement(client, wallet, categories, content)
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+
+        response = await client.get(
+            f"/api/v1/wallets/{wallet.id}", headers=auth_header(["admin"])
+        )
+        assert response.json()["amount"] == amount
+
+        # Чужой кошелек
+        response = await client.post(
+            self.endpoint,
+            headers=auth_header([], "00000000-0000-0000-0000-000000000000"),
+            params={
+                "wallet_id": str(wallet.id),
+                "incoming_category_id": str(create_incoming_categories[0].id),
+                "outgoing_category_id": str(create_outgoing_categories[0].id),
+            },
+            content=CSV_STATEMENT,
+        )
+        assert response.status_code == HTTPStatus.FORBIDDEN
@@ -0,0 +1,141 @@
+import asyncio
+import logging
+import time
+from http import HTTPStatus
+from random import randint, sample
+
+import pytest
+from models import LedgerEntry, Wallet
+from schemas.transfer import CreateTransferSchema
+from services.transfer_service import TransferService
+from sqlalchemy import func, select, update
+from tests.functional.fixtures.auth import auth_header
+
+logger = logging.getLogger(__name__)
+
+CONCURRENT_TRANSFERS = 1000
+
+
+async def get_amounts(session_factory, wallets) -> dict:
+    async with session_factory() as session:
+        result = await session.execute(
+            select(Wallet.id, Wallet.amount).where(
+                Wallet.id.in_([wallet.id for wallet in wallets])
+            )
+        )
+        return dict(result.all())
+
+
+class TestTransfers:
+    def setup_method(self):
+        self.endpoint = "/api/v1/transactions/transfers/"
+
+    @pytest.mark.asyncio
+    async def test_create_transfer(
+        self,
+        client,
+        session_factory,
+        create_wallets,
+        create_incoming_categories,
+        create_outgoing_categories,
+    ):
+        """Перевод между кошельками пользователя"""
+        source, target = create_wallets[0], create_wallets[1]
+        headers = auth_header([], str(source.user_id))
+        data = {
+            "amount": 30,
+            "description": "transfer",
+            "from_wallet_id": str(source.id),
+            "to_wallet_id": str(target.id),
+            "outgoing_category_id": str(create_outgoing_categories[0].id),
+            "incoming_category_id": str(create_incoming_categories[0].id),
+        }
+
+        response = await client.post(self.endpoint, json=data, headers=headers)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()["outgoing"]["wallet_id"] == str(source.id)
+        assert response.json()["incoming"]["wallet_id"] == str(target.id)
+
+        amounts = await get_amounts(session_factory, [source, target])
+        assert amounts[source.id] == source.amount - 30
+        assert amounts[target.id] == target.amount + 30
+
+        # Перевод в тот же кошелек
+        response = await client.post(
+            self.endpoint, json=data | {"to_wallet_id": str(source.id)}, headers=headers
+        )
+        assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+        # Перевод в кошелек другого пользователя
+        other = next(w for w in create_wallets if w.user_id != source.user_id)
+        response = await client.post(
+            self.endpoint, json=data | {"to_wallet_id": str(other.id)}, headers=headers
+        )
+        assert response.status_code == HTTPStatus.FORBIDDEN
+
+        # Кошельки в разных валютах
+        async with session_factory() as session:
+            await session.execute(
+                update(Wallet).filter_by(id=target.id).values(currency="EUR")
+            )
+            await session.commit()
+        response = await client.post(self.endpoint, json=data, headers=headers)
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+        # Неудачные переводы ничего не записали
+        async with session_factory() as session:
+            count = await session.scalar(
+                select(func.count()).where(
+                    LedgerEntry.wallet_id.in_([source.id, target.id])
+                )
+            )
+        assert count == 2
+        assert await get_amounts(session_factory, [source, target]) == amounts
+
+    @pytest.mark.asyncio
+    async def test_concurrent_opposite_transfers(
+        self,
+        session_factory,
+        redis_client,
+        create_wallets,
+        create_incoming_categories,
+        create_outgoing_categories,
+    ):
+        """Параллельные встречные переводы между тремя кошельками без взаимных блокировок"""
+        wallets = create_wallets[:3]
+        service = TransferService(session_factory, redis_client)
+        transfers = [
+            (*sample(wallets, 2), randint(1, 100)) for _ in range(CONCURRENT_TRANSFERS)
+        ]
+
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(
+                service.create_transfer(
+                    CreateTransferSchema(
+                        amount=amount,
+                        description="",
+                        from_wallet_id=source.id,
+                        to_wallet_id=target.id,
+                        outgoing_category_id=create_outgoing_categories[0].id,
+                        incoming_category_id=create_incoming_categories[0].id,
+                    )
+                )
+                for source, target, amount in transfers
+            )
+        )
+        elapsed = time.perf_counter() - started
+
+        logger.info(
+            "%s concurrent transfers between %s wallets in %.2fs (%.0f transfers/s)",
+            CONCURRENT_TRANSFERS,
+            len(wallets),
+            elapsed,
+            CONCURRENT_TRANSFERS / elapsed,
+        )
+
+        amounts = await get_amounts(session_factory, wallets)
+        for wallet in wallets:
+            received = sum(a for _, target, a in transfers if target is wallet)
+            sent = sum(a for source, _, a in transfers if source is wallet)
+            assert amounts[wallet.id] == wallet.amount + received - sent
@@ -0,0 +1,213 @@
+import asyncio
+import logging
+import time
+from random import choice, randint
+
+import pytest
+from models import Wallet, WalletBalanceShard
+from schemas.incoming_transaction import CreateIncomingTransactionSchema
+from schemas.outgoing_transaction import CreateOutgoingTransactionSchema
+from services.reconciliation_service import ReconciliationService
+from services.transaction_service import (IncomingTransactionService,
+                                          OutgoingTransactionService)
+from services.wallet_service import WalletService
+from sqlalchemy import func, select
+
+logger = logging.getLogger(__name__)
+
+CONCURRENT_TRANSACTIONS = 2000
+
+
+class TestWalletBalance:
+    @pytest.mark.asyncio
+    async def test_concurrent_create_transactions(
+        self,
+        session_factory,
+        redis_client,
+        create_wallets,
+        create_incoming_categories,
+        create_outgoing_categories,
+    ):
+        """Параллельно создаем транзакции в одном кошельке"""
+        wallet = create_wallets[0]
+        incoming_service = IncomingTransactionService(session_factory, redis_client)
+        outgoing_service = OutgoingTransactionService(session_factory, redis_client)
+
+        incoming = [randint(1, 100) for _ in range(CONCURRENT_TRANSACTIONS // 2)]
+        outgoing = [randint(1, 100) for _ in range(CONCURRENT_TRANSACTIONS // 2)]
+
+        tasks = [
+            incoming_service.create_transaction(
+                CreateIncomingTransactionSchema(
+                    amount=amount,
+                    description="",
+                    category_id=choice(create_incoming_categories).id,
+                    wallet_id=wallet.id,
+                    user_id=wallet.user_id,
+                )
+            )
+            for amount in incoming
+        ] + [
+            outgoing_service.create_transaction(
+                CreateOutgoingTransactionSchema(
+                    amount=amount,
+                    description="",
+                    category_id=choice(create_outgoing_categories).id,
+                    wallet_id=wallet.id,
+                    user_id=wallet.user_id,
+                )
+            )
+            for amount in outgoing
+        ]
+
+        started = time.perf_counter()
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+
+        logger.info(
+            "%s concurrent transactions in %.2fs (%.0f tx/s)",
+            CONCURRENT_TRANSACTIONS,
+            elapsed,
+            CONCURRENT_TRANSACTIONS / elapsed,
+        )
+
+        async with session_factory() as session:
+            stmt = await session.scalars(select(Wallet).filter_by(id=wallet.id))
+            assert stmt.first().amount == wallet.amount + sum(incoming) - sum(outgoing)
+
+    @pytest.mark.asyncio
+    async def test_update_and_delete_transaction(
+        self, session_factory, redis_client, create_wallets, create_outgoing_categories
+    ):
+        """Баланс кошелька меняется при изменении и удалении транзакции"""
+        wallet_1, wallet_2 = create_wallets[0], create_wallets[1]
+        service = OutgoingTransactionService(session_factory, redis_client)
+
+        async def get_amount(wallet_id):
+            async with session_factory() as session:
+                stmt = await session.scalars(select(Wallet).filter_by(id=wallet_id))
+                return stmt.first().amount
+
+        amount_1 = await get_amount(wallet_1.id)
+        amount_2 = await get_amount(wallet_2.id)
+
+        data = CreateOutgoingTransactionSchema(
+            amount=10,
+            description="",
+            category_id=create_outgoing_categories[0].id,
+            wallet_id=wallet_1.id,
+            user_id=wallet_1.user_id,
+        )
+        transaction = await service.create_transaction(data)
+        assert await get_amount(wallet_1.id) == amount_1 - 10
+
+        # Меняем сумму
+        data.amount = 25
+        await service.update_transaction(str(transaction.id), data)
+        assert await get_amount(wallet_1.id) == amount_1 - 25
+
+        # Переносим в другой кошелек
+        data.wallet_id = wallet_2.id
+        await service.update_transaction(str(transaction.id), data)
+        assert await get_amount(wallet_1.id) == amount_1
+        assert await get_amount(wallet_2.id) == amount_2 - 25
+
+        # Удаляем
+        await service.delete_transaction(str(transaction.id))
+        assert await get_amount(wallet_2.id) == amount_2
+
+    @pytest.mark.asyncio
+    async def test_sharded_balance(
+        self,
+        session_factory,
+        redis_client,
+        create_wallets,
+        create_incoming_categories,
+        create_outgoing_categories,
+    ):
+        """Параллельные транзакции в кошелек с шардированным балансом"""
+        wallet = create_wallets[0]
+        wallet_service = WalletService(session_factory)
+        incoming_service = IncomingTransactionService(session_factory, redis_client)
+        outgoing_service = OutgoingTransactionService(session_factory, redis_client)
+
+        await ReconciliationService(session_factory).reconcile_wallets([wallet.id])
+        await wallet_service.set_balance_shards(str(wallet.id), 8)
+
+        incoming = [randint(1, 100) for _ in range(CONCURRENT_TRANSACTIONS // 2)]
+        outgoing = [randint(1, 100) for _ in range(CONCURRENT_TRANSACTIONS // 2)]
+
+        tasks = [
+            incoming_service.create_transaction(
+                CreateIncomingTransactionSchema(
+                    amount=amount,
+                    description="",
+                    category_id=choice(create_incoming_categories).id,
+                    wallet_id=wallet.id,
+                    user_id=wallet.user_id,
+                )
+            )
+            for amount in incoming
+        ] + [
+            outgoing_service.create_transaction(
+                CreateOutgoingTransactionSchema(
+                    amount=amount,
+                    description="",
+                    category_id=choice(create_outgoing_categories).id,
+                    wallet_id=wallet.id,
+                    user_id=wallet.user_id,
+                )
+            )
+            for amount in outgoing
+        ]
+
+        started = time.perf_counter()
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+
+        logger.info(
+            "%s concurrent transactions over 8 balance shards in %.2fs (%.0f tx/s)",
+            CONCURRENT_TRANSACTIONS,
+            elapsed,
+            CONCURRENT_TRANSACTIONS / elapsed,
+        )
+
+        expected = wallet.amount + sum(incoming) - sum(outgoing)
+        assert (
+            await wallet_service.get_wallet_by_id(str(wallet.id))
+        ).amount == expected
+
+        # Строка кошелька не менялась, суммы лежат в шардах
+        async with session_factory() as session:
+            stmt = await session.scalars(select(Wallet).filter_by(id=wallet.id))
+            assert stmt.first().amount == wallet.amount
+
+        drift = await ReconciliationService(session_factory).check_wallet(wallet.id)
+        assert drift.amount == drift.expected == expected
+
+        # Свертка переносит суммы шардов в кошелек
+        assert await wallet_service.fold_balance_shards() == 1
+        async with session_factory() as session:
+            stmt = await session.scalars(select(Wallet).filter_by(id=wallet.id))
+            assert stmt.first().amount == expected
+            shards = await session.scalar(
+                select(func.sum(WalletBalanceShard.amount)).filter_by(
+                    wallet_id=wallet.id
+                )
+            )
+            assert shards == 0
+
+        await outgoing_service.create_transaction(
+            CreateOutgoingTransactionSchema(
+                amount=5,
+                description="",
+                category_id=create_outgoing_categories[0].id,
+                wallet_id=wallet.id,
+                user_id=wallet.user_id,
+            )
+        )
+        disabled = await wallet_service.set_balance_shards(str(wallet.id), 0)
+        assert disabled.amount == expected - 5
+        assert (await wallet_service.get_wallet_by_id(str(wallet.id))).amount == (
+            expected - 5
+        )
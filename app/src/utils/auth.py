@@ -1,11 +1,18 @@
+import hashlib
+import time
+from collections import OrderedDict
 from http import HTTPStatus
-from typing import Any, List
+from typing import Annotated, Any, List
+from uuid import uuid4
 
 import jwt
 from core.config import settings
-from fastapi import HTTPException
+from db.redis import get_redis
+from fastapi import Depends, HTTPException, Request
 from fastapi.security import OAuth2PasswordBearer
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from redis.asyncio import Redis
+from utils.revocation import revoked_tokens
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token")
 
@@ -14,6 +21,7 @@ class AccessTokenPayload(BaseModel):
     user_id: str
     exp: int
     roles: List[str]
+    jti: str = Field(default_factory=lambda: uuid4().hex)
 
 
 def decode_token(token: str) -> dict[str, Any] | None:
@@ -27,6 +35,84 @@ def decode_token(token: str) -> dict[str, Any] | None:
     return payload
 
 
+def token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class VerifiedTokenCache:
+    """
+    Claims of verified tokens by token digest, so a token's signature is
+    checked once and not on every request.
+
+    Keeps at most `max_size` tokens, dropping the least recently used, each
+    for `ttl` seconds or until it expires, whichever comes first.
+    """
+
+    def __init__(self, max_size: int, ttl: int):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.tokens: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+
+    def get(self, digest: str) -> dict[str, Any] | None:
+        entry = self.tokens.get(digest)
+        if entry is None:
+            return None
+        if entry[0] <= time.time():
+            del self.tokens[digest]
+            return None
+        self.tokens.move_to_end(digest)
+        return entry[1]
+
+    def put(self, digest: str, payload: dict[str, Any]) -> None:
+        expires_at = min(payload.get("exp", 0), time.time() + self.ttl)
+        self.tokens[digest] = (expires_at, payload)
+        self.tokens.move_to_end(digest)
+        while len(self.tokens) > self.max_size:
+            self.tokens.popitem(last=False)
+
+
+verified_tokens = VerifiedTokenCache(
+    settings.auth_token_cache_size, settings.auth_token_cache_ttl
+)
+
+
+def verify_token(token: str) -> dict[str, Any] | None:
+    """Claims of the token, None if it is invalid."""
+    digest = token_digest(token)
+    payload = verified_tokens.get(digest)
+    if payload is None:
+        payload = decode_token(token)
+        if payload:
+            verified_tokens.put(digest, payload)
+    return payload
+
+
+async def get_auth_payload(
+    request: Request,
+    access_token: Annotated[str, Depends(oauth2_scheme)],
+    redis: Redis = Depends(get_redis),
+) -> dict[str, Any]:
+    """
+    Claims of the request's access token, also stored on `request.state.auth`.
+
+    The token must have a valid signature and must not have been revoked.
+    """
+    payload = verify_token(access_token)
+
+    if (
+        not payload
+        or "jti" not in payload
+        or await revoked_tokens.is_revoked(redis, payload["jti"])
+    ):
+        raise HTTPException(status_code=HTTPStatus.UNAUTHORIZED, detail="invalid token")
+
+    request.state.auth = payload
+    return payload
+
+
+AuthPayload = Annotated[dict[str, Any], Depends(get_auth_payload)]
+
+
 def get_user_id_from_token(access_token: str) -> str:
     payload = decode_token(access_token)
 
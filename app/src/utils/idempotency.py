@@ -0,0 +1,105 @@
+import hashlib
+from http import HTTPStatus
+from typing import Annotated, Any, Awaitable, Callable
+
+from core.config import settings
+from db.redis import RedisCache, get_redis
+from fastapi import Depends, Header, HTTPException, Request
+from pydantic import BaseModel
+from redis.asyncio import Redis
+from redis.exceptions import LockError
+
+
+def idempotency_key(user_id: str, path: str, key: str) -> str:
+    return f"idempotency:{user_id}:{path}:{key}"
+
+
+class Idempotency:
+    """
+    `Idempotency-Key` header support for create endpoints.
+
+    The first successful response for a key is kept in Redis for
+    IDEMPOTENCY_TTL seconds and returned to retries without running the
+    endpoint again. Concurrent requests with the same key wait on a Redis
+    lock for the first one to finish. Keys are scoped per user and path,
+    reusing a key with a different body is rejected. Failed requests are
+    not stored, so they can be retried with the same key.
+    """
+
+    def __init__(
+        self,
+        request: Request,
+        key: Annotated[
+            str | None, Header(alias="Idempotency-Key", min_length=1, max_length=255)
+        ] = None,
+        redis: Redis = Depends(get_redis),
+    ):
+        self.key = key
+        self.path = request.url.path
+        self.redis = redis
+        self.cache = RedisCache(redis)
+
+    async def run(
+        self,
+        user_id: str,
+        data: BaseModel,
+        create: Callable[[], Awaitable[Any]],
+        response_model: type[BaseModel],
+    ) -> BaseModel:
+        if self.key is None:
+            return response_model.model_validate(await create())
+
+        key = idempotency_key(user_id, self.path, self.key)
+        fingerprint = hashlib.sha256(data.model_dump_json().encode()).hexdigest()
+
+        cached = await self._cached(key, fingerprint, response_model)
+        if cached is not None:
+            return cached
+
+        lock = self.redis.lock(
+            f"{key}:lock",
+            timeout=settings.idempotency_lock_timeout,
+            blocking_timeout=settings.idempotency_lock_timeout,
+        )
+        if not await lock.acquire():
+            raise HTTPException(
+                status_code=HTTPStatus.CONFLICT,
+                detail="A request with this Idempotency-Key is in progress",
+            )
+
+        try:
+            # A concurrent duplicate may have finished while we waited
+            cached = await self._cached(key, fingerprint, response_model)
+            if cached is not None:
+                return cached
+
+            response = response_model.model_validate(await create())
+            await self.cache.put_to_cache(
+                key,
+                {
+                    "fingerprint": fingerprint,
+                    "response": response.model_dump(mode="json"),
+                },
+                settings.idempotency_ttl,
+            )
+            return response
+        finally:
+            try:
+                await lock.release()
+            except LockError:
+                # The lock expired, the response is stored all the same
+                pass
+
+    async def _cached(
+        self, key: str, fingerprint: str, response_model: type[BaseModel]
+    ) -> BaseModel | None:
+        cached = await self.cache.get_from_cache(key)
+        if cached is None:
+            return None
+
+        if cached["fingerprint"] != fingerprint:
+            raise HTTPException(
+                status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+                detail="Idempotency-Key was used with a different request body",
+            )
+        return response_model.model_validate(cached["response"])
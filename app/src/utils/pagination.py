@@ -0,0 +1,176 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from http import HTTPStatus
+from typing import Any
+from uuid import UUID
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+from sqlalchemy import Select, literal, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+FORWARD = ">"
+BACKWARD = "<"
+
+
+class KeysetCursor(BaseModel):
+    date: datetime
+    id: UUID
+    backwards: bool = False
+    rank: float | None = None
+
+
+@dataclass
+class KeysetPage:
+    items: list[Any] = field(default_factory=list)
+    next_cursor: str | None = None
+    previous_cursor: str | None = None
+
+
+def encode_keyset_cursor(
+    date: datetime, id: UUID, backwards: bool = False, rank: float | None = None
+) -> str:
+    direction = BACKWARD if backwards else FORWARD
+    if rank is not None:
+        return f"{direction}{rank!r}|{date.isoformat()}|{id}"
+    return f"{direction}{date.isoformat()}|{id}"
+
+
+def decode_keyset_cursor(cursor: str | None) -> KeysetCursor | None:
+    if not cursor:
+        return None
+
+    try:
+        direction, value = cursor[0], cursor[1:]
+        *rank, date, id = value.split("|")
+
+        if direction not in (FORWARD, BACKWARD) or len(rank) > 1:
+            raise ValueError(direction)
+
+        return KeysetCursor(
+            date=datetime.fromisoformat(date),
+            id=UUID(id),
+            backwards=direction == BACKWARD,
+            rank=float(rank[0]) if rank else None,
+        )
+    except ValueError:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST, detail="Invalid cursor value"
+        )
+
+
+async def paginate_by_keyset(
+    session: AsyncSession,
+    stmt: Select,
+    model: Any,
+    size: int,
+    cursor: KeysetCursor | None = None,
+    descending: bool = False,
+) -> KeysetPage:
+    """
+    Fetches one page of `stmt` ordered by (date, id) using keyset pagination.
+
+    The position is pushed into the WHERE clause as a row comparison, so every
+    page is a bounded index range scan regardless of how deep it is. With
+    `descending` the newest rows come first; cursors are relative to that order.
+    """
+    key = tuple_(model.date, model.id)
+    backwards = cursor is not None and cursor.backwards
+    reverse = backwards != descending
+
+    if cursor is not None:
+        bound = tuple_(
+            literal(cursor.date, model.date.type), literal(cursor.id, model.id.type)
+        )
+        stmt = stmt.where(key < bound if reverse else key > bound)
+
+    if reverse:
+        stmt = stmt.order_by(model.date.desc(), model.id.desc())
+    else:
+        stmt = stmt.order_by(model.date, model.id)
+
+    result = await session.scalars(stmt.limit(size + 1))
+    items = list(result.all())
+
+    has_more = len(items) > size
+    items = items[:size]
+
+    if backwards:
+        items.reverse()
+
+    page = KeysetPage(items=items)
+
+    if not items:
+        return page
+
+    first, last = items[0], items[-1]
+
+    if has_more or backwards:
+        page.next_cursor = encode_keyset_cursor(last.date, last.id)
+    if (has_more and backwards) or (cursor is not None and not backwards):
+        page.previous_cursor = encode_keyset_cursor(
+            first.date, first.id, backwards=True
+        )
+
+    return page
+
+
+async def paginate_by_rank(
+    session: AsyncSession,
+    stmt: Select,
+    model: Any,
+    rank: Any,
+    size: int,
+    cursor: KeysetCursor | None = None,
+) -> KeysetPage:
+    """
+    Fetches one page of `stmt` ordered by `rank`, then (date, id), best first.
+
+    Works like `paginate_by_keyset` with the rank value stored in the cursor,
+    so rows with equal rank are still paged deterministically.
+    """
+    if cursor is not None and cursor.rank is None:
+        raise HTTPException(
+            status_code=HTTPStatus.BAD_REQUEST, detail="Invalid cursor value"
+        )
+
+    key = tuple_(rank, model.date, model.id)
+    backwards = cursor is not None and cursor.backwards
+
+    if cursor is not None:
+        bound = tuple_(
+            literal(cursor.rank, rank.type),
+            literal(cursor.date, model.date.type),
+            literal(cursor.id, model.id.type),
+        )
+        stmt = stmt.where(key > bound if backwards else key < bound)
+
+    if backwards:
+        stmt = stmt.order_by(rank, model.date, model.id)
+    else:
+        stmt = stmt.order_by(rank.desc(), model.date.desc(), model.id.desc())
+
+    result = await session.execute(stmt.add_columns(rank).limit(size + 1))
+    rows = list(result.all())
+
+    has_more = len(rows) > size
+    rows = rows[:size]
+
+    if backwards:
+        rows.reverse()
+
+    page = KeysetPage(items=[item for item, _ in rows])
+
+    if not rows:
+        return page
+
+    (first, first_rank), (last, last_rank) = rows[0], rows[-1]
+
+    if has_more or backwards:
+        page.next_cursor = encode_keyset_cursor(last.date, last.id, rank=last_rank)
+    if (has_more and backwards) or (cursor is not None and not backwards):
+        page.previous_cursor = encode_keyset_cursor(
+            first.date, first.id, backwards=True, rank=first_rank
+        )
+
+    return page
@@ -0,0 +1,98 @@
+import asyncio
+import logging
+import time
+
+from core.config import settings
+from redis.asyncio import Redis
+from utils.bloom import BloomFilter
+
+logger = logging.getLogger(__name__)
+
+REVOKED_CHANNEL = "revoked_jti"
+
+
+def revoked_jti_key(jti: str) -> str:
+    return f"revoked_jti:{jti}"
+
+
+class RevokedTokens:
+    """
+    Revoked access tokens by their `jti` claim.
+
+    A revocation is a Redis key that expires together with the token, and a
+    message on REVOKED_CHANNEL. Every process keeps a Bloom filter of the
+    revoked jtis, filled from the keys when it subscribes and from the
+    messages after that, and rebuilt every `rebuild_interval` seconds to drop
+    expired ones. Only jtis the filter may contain are checked in Redis.
+    Until the filter is in sync, every jti is checked in Redis.
+    """
+
+    def __init__(self, capacity: int, error_rate: float, rebuild_interval: int):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.rebuild_interval = rebuild_interval
+        self.filter = BloomFilter(capacity, error_rate)
+        self.synced = False
+        self.task: asyncio.Task | None = None
+
+    def start(self, redis: Redis) -> None:
+        self.task = asyncio.create_task(self._sync(redis))
+
+    async def close(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+
+    async def revoke(self, redis: Redis, jti: str, exp: int) -> None:
+        if exp <= time.time():
+            return
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.set(revoked_jti_key(jti), 1, exat=exp)
+            pipe.publish(REVOKED_CHANNEL, jti)
+            await pipe.execute()
+        self.filter.add(jti)
+
+    async def is_revoked(self, redis: Redis, jti: str) -> bool:
+        if self.synced and jti not in self.filter:
+            return False
+        return bool(await redis.exists(revoked_jti_key(jti)))
+
+    async def _load(self, redis: Redis) -> BloomFilter:
+        revoked = BloomFilter(self.capacity, self.error_rate)
+        prefix = len(revoked_jti_key(""))
+        async for key in redis.scan_iter(match=revoked_jti_key("*"), count=1000):
+            revoked.add(key.decode()[prefix:])
+        return revoked
+
+    async def _sync(self, redis: Redis) -> None:
+        while True:
+            try:
+                async with redis.pubsub() as pubsub:
+                    # Subscribed before loading, so no revocation falls between
+                    await pubsub.subscribe(REVOKED_CHANNEL)
+                    rebuild_at = 0.0
+                    while True:
+                        if time.monotonic() >= rebuild_at:
+                            self.filter = await self._load(redis)
+                            self.synced = True
+                            rebuild_at = time.monotonic() + self.rebuild_interval
+                        message = await pubsub.get_message(
+                            ignore_subscribe_messages=True, timeout=1.0
+                        )
+                        if message is not None:
+                            self.filter.add(message["data"].decode())
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Revoked token sync failed, retrying")
+            finally:
+                self.synced = False
+            await asyncio.sleep(1)
+
+
+revoked_tokens = RevokedTokens(
+    settings.revocation_filter_capacity,
+    settings.revocation_filter_error_rate,
+    settings.revocation_filter_rebuild_seconds,
+)